@@ -0,0 +1,173 @@
+"""
+    Время полного цикла 'auto' (sell orders, продажа инвентаря с подтверждениями, buy orders,
+    баланс и, по флагу, сбор истории торговой площадки) без обращения к Steam: бот направляется
+    на локальный стенд StandinServer с заданной задержкой ответов и долей ответов 429.
+
+    Лимиты запросов по умолчанию сняты, чтобы измерять работу бота и сети, а не паузы корзин;
+    с флагом --steam-limits используются настоящие лимиты (подобранные скорости при этом не сохраняются).
+    Бот работает с отдельной игрой --app-id (по умолчанию 480 - тестовое приложение Steam): её файлы
+    предметов создаются на время прогона и удаляются после него.
+
+    python -m benchmarks.auto_cycle [--iterations N] [--items N] [--listings N] [--inventory N]
+        [--latency s] [--jitter s] [--too-many-requests-rate p] [--history] [--steam-limits] [--recorded dir]
+"""
+import os
+import time
+import shutil
+import random
+import argparse
+from pathlib import Path
+
+import requests
+
+from bot import TradeBot
+from bot.account import Account
+from benchmarks.steam_standin import StandinMarket, StandinServer
+from tools.file_store import FileStore, FileStoreType
+from tools.rate_limiter import RateLimiterRegistry
+from utils import handle_429_status_code
+from enums import Currency, Urls
+
+from _root import project_root
+
+# Подтверждения и адрес инвентаря строятся по этим переменным; стенд их не проверяет
+STANDIN_ENV = {
+    "STEAM_ID": "76561197960287930",
+    "IDENTITY_SECRET": "c3RhbmRpbi1pZGVudGl0eS1zZWNyZXQ="
+}
+
+
+def prepare_rate_limiter(work_dir: Path, steam_limits: bool, cooldown: float) -> None:
+    """
+        Подобранные на стенде скорости сохраняются в work_dir, а не в data/rate_limiter
+    """
+    registry = RateLimiterRegistry.get()
+    registry.learned_rates_file_path = work_dir / "learned_rates.json"
+    registry.learned_rates = {}
+    for host, endpoint_class in list(registry.limits):
+        if not steam_limits:
+            registry.configure(host, endpoint_class, 1000, 1000)
+        registry.bucket(host, endpoint_class).cooldown = cooldown
+
+
+def write_item_files(app_id: int, market: StandinMarket, seed: int) -> list[Path]:
+    """
+        item_nameid и 'trade items' игры стенда; часть предметов с нулевым количеством,
+        чтобы их 'buy order' снимались
+    """
+    paths = [project_root / f"data/items/{app_id}.json", project_root / f"data/trade_items/{app_id}.json"]
+    if existing := [str(path) for path in paths if path.exists()]:
+        raise SystemExit(f"Файлы уже существуют, выберите другой --app-id: {existing}")
+
+    rnd = random.Random(seed)
+    trade_items = {name: rnd.choice((0, 1, 2, 3, 5)) for name in market.item_nameids}
+    file_store = FileStore.from_type(FileStoreType.JSON)
+    file_store.save(paths[0], market.item_nameids)
+    file_store.save(paths[1], trade_items)
+    return paths
+
+
+def timed(timings: dict[str, float], title: str, func, *args, **kwargs) -> None:
+    start = time.perf_counter()
+    func(*args, **kwargs)
+    timings[title] = time.perf_counter() - start
+
+
+def run_cycle(
+        trade_bot: TradeBot, account: Account | None, session: requests.Session, work_dir: Path
+) -> dict[str, float]:
+    """
+        Одна итерация 'auto' с обновлением 'buy order' (как job -ub и summarize -noexcel)
+    """
+    timings = {}
+    timed(timings, "update sell orders", handle_429_status_code, trade_bot.update_sell_orders, session)
+    timed(timings, "sell inventory", handle_429_status_code, trade_bot.sell_inventory, session)
+    timed(timings, "update buy orders", handle_429_status_code, trade_bot.update_buy_orders, session)
+    if account:
+        timed(timings, "account balance", account.get_account_balance, session)
+        history_dir = work_dir / "market_history"
+        timed(
+            timings, "market history", account.summarize_market_history, session,
+            json_file_path=str(history_dir / "json/summarize.json"),
+            excel_file_path=str(history_dir / "excel/summarize.xlsx"),
+            monthly_json_file_path=str(history_dir / "json/monthly_summarize.json"),
+            monthly_excel_file_path=str(history_dir / "excel/monthly_summarize.xlsx"),
+            profit_json_file_path=str(history_dir / "json/profit_summarize.json"),
+            profit_excel_file_path=str(history_dir / "excel/profit_summarize.xlsx"),
+            checkpoint_file_path=str(history_dir / "checkpoint.pickle"),
+            ledger_file_path=str(history_dir / "ledger.sqlite3"),
+            columnar_dir_path=str(history_dir / "columnar"),
+            render_excel=False
+        )
+    timings["total"] = sum(timings.values())
+    return timings
+
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser(description="Время цикла 'auto' на локальном стенде Steam")
+    arg_parser.add_argument("--iterations", type=int, default=2, help="Количество циклов подряд")
+    arg_parser.add_argument("--app-id", type=int, default=480, help="ID игры стенда")
+    arg_parser.add_argument("--items", type=int, default=200, help="Количество предметов")
+    arg_parser.add_argument("--listings", type=int, default=300, help="Количество 'sell order'")
+    arg_parser.add_argument("--inventory", type=int, default=100, help="Количество предметов в инвентаре")
+    arg_parser.add_argument("--buy-orders", type=int, default=50, help="Количество 'buy order'")
+    arg_parser.add_argument("--history-size", type=int, default=2000, help="Количество записей истории")
+    arg_parser.add_argument("--latency", type=float, default=0.02, help="Задержка ответа стенда, с")
+    arg_parser.add_argument("--jitter", type=float, default=0.02, help="Случайная добавка к задержке, с")
+    arg_parser.add_argument("--too-many-requests-rate", type=float, default=0.0, help="Доля ответов 429")
+    arg_parser.add_argument("--cooldown", type=float, default=1.0, help="Пауза корзины после ответа 429, с")
+    arg_parser.add_argument("--history", action="store_true", help="Собирать историю торговой площадки")
+    arg_parser.add_argument("--steam-limits", action="store_true", help="Использовать настоящие лимиты запросов")
+    arg_parser.add_argument("--recorded", type=str, default=None, help="Каталог HistogramRecorder со стаканами")
+    arg_parser.add_argument("--seed", type=int, default=0)
+    arg_parser.add_argument("--dir", type=str, default="data/benchmarks/auto_cycle", help="Директория для файлов")
+    args = arg_parser.parse_args()
+
+    work_dir = Path(args.dir)
+    shutil.rmtree(work_dir, ignore_errors=True)
+    work_dir.mkdir(parents=True)
+    os.environ.update(STANDIN_ENV)
+
+    market = StandinMarket(
+        args.app_id, args.items, args.listings, args.inventory, args.buy_orders, args.history_size,
+        seed=args.seed, recorder_dir=args.recorded
+    )
+    item_files = write_item_files(args.app_id, market, args.seed)
+    try:
+        with StandinServer(
+                market, latency=args.latency, jitter=args.jitter,
+                too_many_requests_rate=args.too_many_requests_rate, seed=args.seed
+        ) as server:
+            Urls.configure(community=server.url, store=server.url, api=server.url, login=server.url)
+            market.market_url = Urls.MARKET
+            prepare_rate_limiter(work_dir, args.steam_limits, args.cooldown)
+
+            session = requests.Session()
+            trade_bot = TradeBot(args.app_id, StandinMarket.CONTEXT_ID, Currency.RUB)
+            account = Account() if args.history else None
+            if account:
+                account.dates_file_path = str(work_dir / "market_history/json/dates.json")
+
+            all_timings = []
+            for i in range(args.iterations):
+                print(f"--- Цикл {i + 1} ---")
+                all_timings.append(run_cycle(trade_bot, account, session, work_dir))
+                print(
+                    f"sell orders: {len(market.listings)}, inventory: {len(market.inventory)}, "
+                    f"buy orders: {len(market.buy_orders)}, confirmations: {len(market.confirmations)}"
+                )
+    finally:
+        for path in item_files:
+            path.unlink(missing_ok=True)
+
+    print()
+    print(f"{'':>20}" + "".join(f"{f'cycle {i + 1}':>10}" for i in range(len(all_timings))))
+    for title in all_timings[0]:
+        print(f"{title:>20}" + "".join(f"{timings[title]:9.2f}s" for timings in all_timings))
+    print()
+    for (endpoint, status), count in sorted(server.stats.items()):
+        print(f"{endpoint:>20} {status}: {count}")
+
+
+if __name__ == "__main__":
+    main()
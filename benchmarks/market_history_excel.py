@@ -0,0 +1,135 @@
+"""
+    Время построения Excel по сводкам истории торговой площадки:
+    полная сборка, повторный запуск без изменений, изменение одной игры
+    и построение всех трёх книг последовательно и в пуле процессов (с проверкой, что результат совпадает).
+
+    python -m benchmarks.market_history_excel [--games N] [--items N] [--workers N] [--dir path]
+"""
+import json
+import time
+import random
+import zipfile
+import argparse
+from pathlib import Path
+
+from bot.account.summarize_to_excel import SummarizeToExcel
+
+# Время создания и изменения книги - единственное, что отличается между запусками
+VOLATILE_PARTS = {"docProps/core.xml"}
+
+
+def generate_history_jsons(games: int, items: int, months: int = 36, seed: int = 0) -> (dict, dict, dict):
+    """
+        Синтетические summarize.json, monthly_summarize.json и profit_summarize.json:
+        в первой игре items предметов, в каждой следующей - меньше
+    """
+    rnd = random.Random(seed)
+    app_id_to_game_name = {}
+    summarize, monthly, profit = {}, {}, {}
+    for game_idx in range(games):
+        app_id = str(400 + game_idx)
+        app_id_to_game_name[app_id] = f"Game {game_idx}"
+        summarize[app_id], monthly[app_id], profit[app_id] = {}, {}, {}
+
+        for item_idx in range(items // (game_idx + 1)):
+            item_hash_name = f"item {game_idx}-{item_idx}"
+            total_bought, total_sold = rnd.randint(0, 50), rnd.randint(0, 50)
+            sum_bought, sum_sold = round(rnd.uniform(0, 500), 2), round(rnd.uniform(0, 500), 2)
+            summarize[app_id][item_hash_name] = {
+                "item_name": f"Item {game_idx}-{item_idx}",
+                "total_bought": total_bought,
+                "total_sold": total_sold,
+                "sum_bought": sum_bought,
+                "sum_sold": sum_sold,
+                "quantity_difference": total_bought - total_sold,
+                "sum_difference": round(sum_sold - sum_bought, 2)
+            }
+
+            total_profitable, total_unprofitable = rnd.randint(0, 20), rnd.randint(0, 20)
+            sum_profitable, sum_unprofitable = round(rnd.uniform(0, 50), 2), -round(rnd.uniform(0, 50), 2)
+            profit[app_id][item_hash_name] = {
+                "item_name": f"Item {game_idx}-{item_idx}",
+                "total_profitable": total_profitable,
+                "total_unprofitable": total_unprofitable,
+                "sum_profitable": sum_profitable,
+                "sum_unprofitable": sum_unprofitable,
+                "quantity_difference": total_profitable - total_unprofitable,
+                "sum_difference": round(sum_profitable + sum_unprofitable, 2),
+                "bought_queue": []
+            }
+
+        for month_idx in range(months):
+            total_bought, total_sold = rnd.randint(0, 500), rnd.randint(0, 500)
+            sum_bought, sum_sold = round(rnd.uniform(0, 5000), 2), round(rnd.uniform(0, 5000), 2)
+            monthly[app_id][f"{2022 + month_idx // 12}.{month_idx % 12 + 1:02d}"] = {
+                "total_bought": total_bought,
+                "total_sold": total_sold,
+                "sum_bought": sum_bought,
+                "sum_sold": sum_sold,
+                "quantity_difference": total_bought - total_sold,
+                "sum_difference": round(sum_sold - sum_bought, 2)
+            }
+
+    return tuple(
+        {"processed_count": 0, "app_id_to_game_name": app_id_to_game_name, "aggregated_data": aggregated_data}
+        for aggregated_data in (summarize, monthly, profit)
+    )
+
+
+def workbook_parts(path: Path) -> dict[str, bytes]:
+    with zipfile.ZipFile(path) as archive:
+        return {name: archive.read(name) for name in archive.namelist() if name not in VOLATILE_PARTS}
+
+
+def timed(title: str, func, *args, **kwargs) -> None:
+    start = time.perf_counter()
+    func(*args, **kwargs)
+    print(f"{title:>24}: {time.perf_counter() - start:7.2f} s")
+
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser(description="Время построения Excel по сводкам истории")
+    arg_parser.add_argument("--games", type=int, default=6, help="Количество игр (листов)")
+    arg_parser.add_argument("--items", type=int, default=3000, help="Количество предметов в самой большой игре")
+    arg_parser.add_argument("--workers", type=int, default=3, help="Количество процессов для построения книг")
+    arg_parser.add_argument("--dir", type=str, default="data/benchmarks", help="Директория для файлов")
+    args = arg_parser.parse_args()
+
+    dir_path = Path(args.dir)
+    dir_path.mkdir(parents=True, exist_ok=True)
+    names = ("summarize", "monthly_summarize", "profit_summarize")
+    saved = dict(zip(names, generate_history_jsons(args.games, args.items)))
+    json_paths = {name: dir_path / f"{name}.json" for name in names}
+    for name in names:
+        json_paths[name].write_text(json.dumps(saved[name], ensure_ascii=False), encoding="utf-8")
+
+    def excel_paths(suffix: str) -> dict[str, Path]:
+        paths = {name: dir_path / f"{name}{suffix}.xlsx" for name in names}
+        for path in paths.values():
+            path.unlink(missing_ok=True)
+        return paths
+
+    def summarize_all(paths: dict[str, Path], workers: int) -> None:
+        SummarizeToExcel(workers=workers).summarize_all_to_excel(
+            *(str(path) for name in names for path in (json_paths[name], paths[name])), workers=workers)
+
+    sequential_paths = excel_paths("_sequential")
+    timed("all, sequential", summarize_all, sequential_paths, 1)
+    parallel_paths = excel_paths("_parallel")
+    timed(f"all, {args.workers} processes", summarize_all, parallel_paths, args.workers)
+    for name in names:
+        same = workbook_parts(sequential_paths[name]) == workbook_parts(parallel_paths[name])
+        print(f"{name:>24}: {'identical' if same else 'MISMATCH'}")
+
+    excel_maker = SummarizeToExcel()
+    json_path, excel_path = str(json_paths["summarize"]), str(sequential_paths["summarize"])
+    timed("no changes", excel_maker.summarize_json_to_excel, json_path, excel_path)
+
+    last_game = saved["summarize"]["aggregated_data"][str(400 + args.games - 1)]
+    next(iter(last_game.values()))["total_bought"] += 1
+    json_paths["summarize"].write_text(json.dumps(saved["summarize"], ensure_ascii=False), encoding="utf-8")
+    timed("one game changed", excel_maker.summarize_json_to_excel, json_path, excel_path)
+
+
+if __name__ == "__main__":
+    main()
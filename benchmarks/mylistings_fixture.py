@@ -0,0 +1,87 @@
+import random
+
+ROW_TEMPLATE = """
+<div class="market_listing_row market_recent_listing_row listing_{order_id}" id="mylisting_{order_id}">
+    <div class="market_listing_right_cell market_listing_edit_buttons placeholder"></div>
+    <div class="market_listing_right_cell market_listing_edit_buttons actual_content">
+        <div class="market_listing_cancel_button">
+            <a href="javascript:RemoveMarketListing('mylisting', '{order_id}', {app_id}, '2', '{asset_id}')" class="item_market_action_button item_market_action_button_edit nodisable">
+                <span class="item_market_action_button_edge item_market_action_button_left"></span>
+                <span class="item_market_action_button_contents">Remove</span>
+                <span class="item_market_action_button_edge item_market_action_button_right"></span>
+                <span class="item_market_action_button_preload"></span>
+            </a>
+        </div>
+    </div>
+    <div class="market_listing_right_cell market_listing_my_price">
+        <span class="market_table_value">
+            <span class="market_listing_price">
+                <span style="display: inline-block">
+                    <span title="This is the price the buyer pays.">
+                        {buyer_price}&nbsp;pуб.
+                    </span>
+                    <br>
+                    <span title="This is how much you will receive." style="color: #AFAFAF">
+                        ({seller_price}&nbsp;pуб.)
+                    </span>
+                </span>
+            </span>
+        </span>
+    </div>
+    <div class="market_listing_right_cell market_listing_listed_date can_combine">
+        {listed_date}
+    </div>
+    <img id="mylisting_{order_id}_image" src="https://community.fastly.steamstatic.com/economy/image/x/38fx38f" srcset="https://community.fastly.steamstatic.com/economy/image/x/38fx38f 1x, https://community.fastly.steamstatic.com/economy/image/x/38fx38fdpx2x 2x" style="border-color: #D2D2D2;" class="market_listing_item_img economy_item_hoverable" alt="" />
+    <div class="market_listing_item_name_block">
+        <span id="mylisting_{order_id}_name" class="market_listing_item_name economy_item_hoverable" style="color: #D2D2D2;">
+            <a class="market_listing_item_name_link" href="https://steamcommunity.com/market/listings/{app_id}/{hash_name}">{name}</a>
+        </span>
+        <br/>
+        <span class="market_listing_game_name">Game {app_id}</span>
+    </div>
+    <div style="clear: both"></div>
+</div>
+"""
+
+HEADER = """
+<div class="my_listing_section market_content_block market_home_listing_table">
+    <h3 class="my_market_header">
+        <span class="my_market_header_active">My listings</span>
+    </h3>
+    <div class="market_listing_table_header">
+        <span class="market_listing_right_cell market_listing_my_price"><span class="market_listing_header_namespacer"></span>Price</span>
+        <span class="market_listing_right_cell market_listing_listed_date">Listed on</span>
+        <span class="market_listing_right_cell market_listing_edit_buttons"></span>
+        <span><span class="market_listing_header_namespacer"></span>Name</span>
+    </div>
+"""
+
+FOOTER = """
+</div>
+"""
+
+
+def generate_mylistings_html(
+        rows: int = 2000, app_ids: tuple[int, ...] = (322330, 753, 440), seed: int = 0
+) -> str:
+    """
+        Синтетическая страница mylistings/render (results_html) с разметкой, повторяющей разметку Steam
+    """
+    rng = random.Random(seed)
+    parts = [HEADER]
+    for i in range(rows):
+        price = rng.randint(3, 50000) / 100
+        count = rng.choice([1, 1, 1, 1, 2, 5])
+        name = f"Item {i} {rng.choice(['Red', 'Blue', 'Green'])} &amp; Co"
+        parts.append(ROW_TEMPLATE.format(
+            order_id=5000000000000000000 + i,
+            asset_id=30000000000 + i,
+            app_id=rng.choice(app_ids),
+            buyer_price=f"{price:.2f}".replace(".", ","),
+            seller_price=f"{price * 0.8696:.2f}".replace(".", ","),
+            listed_date=f"{rng.randint(1, 28)} Oct",
+            hash_name=f"Item%20{i}",
+            name=f"{count} {name}" if count > 1 else name
+        ))
+    parts.append(FOOTER)
+    return "".join(parts)
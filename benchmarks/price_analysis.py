@@ -0,0 +1,96 @@
+"""
+    Время расчёта цен для набора предметов: по одному предмету (как раньше в TradeBot)
+    и одним вызовом PriceAnalysis.price_items, с проверкой, что результаты совпадают.
+
+    python -m benchmarks.price_analysis [--items N] [--levels N] [--orders N] [--repeat N]
+"""
+import time
+import random
+import argparse
+
+from bot.marketplace import SellOrderItem, BuyOrderItem
+from bot.price_analysis import PriceAnalysis, OrderBook, ItemPricingInput, ItemPricing
+
+
+def generate_graph(rnd: random.Random, levels: int, start: float, step: float) -> list[list]:
+    """
+        График в формате 'itemordershistogram': [цена, накопительное количество, подпись]
+    """
+    graph = []
+    depth = 0
+    for level in range(levels):
+        depth += rnd.randint(1, 20)
+        graph.append([round(start + step * level, 2), depth, ""])
+    return graph
+
+
+def generate_items(count: int, levels: int, orders: int, seed: int = 0) -> dict[str, ItemPricingInput]:
+    rnd = random.Random(seed)
+    items = {}
+    for item_idx in range(count):
+        start = round(rnd.uniform(0.1, 50), 2)
+        market_data = {
+            "sell_order_graph": generate_graph(rnd, levels, start, 0.01),
+            "buy_order_graph": generate_graph(rnd, levels, round(start * 0.9, 2), -0.01)
+        }
+        sell_prices = [level[0] for level in market_data["sell_order_graph"]]
+        items[f"item {item_idx}"] = ItemPricingInput(
+            OrderBook.from_market_data(market_data),
+            sales_per_day=rnd.randint(1, 60),
+            my_sell_orders=[SellOrderItem(buyer_price=rnd.choice(sell_prices)) for _ in range(orders)],
+            my_buy_order=BuyOrderItem(price=round(start * rnd.uniform(0.7, 1.0), 2))
+        )
+    return items
+
+
+def price_one_by_one(price_analysis: PriceAnalysis, items: dict[str, ItemPricingInput]) -> dict[str, ItemPricing]:
+    result = {}
+    for item_name, item in items.items():
+        max_number_prices_used = item.number_prices_used
+        actual_sell_price = price_analysis.get_actual_sell_order_price(
+            item.market_data, item.my_sell_orders, max_number_prices_used)
+        try:
+            recommended_buy_price = price_analysis.recommend_buy_price(
+                item.market_data, item.sales_per_day, max_number_prices_used)
+        except (IndexError, ZeroDivisionError):
+            recommended_buy_price = None
+        result[item_name] = ItemPricing(
+            actual_sell_price=actual_sell_price,
+            recommended_sell_price=round(actual_sell_price - price_analysis.reduction, 2),
+            recommended_buy_price=recommended_buy_price,
+            is_buy_order_relevant=price_analysis.is_buy_order_relevant(
+                item.market_data, item.sales_per_day, item.my_buy_order, max_number_prices_used,
+                item.allow_check_max_profit)
+        )
+    return result
+
+
+def timed(title: str, repeat: int, func, *args):
+    timings = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args)
+        timings.append(time.perf_counter() - start)
+    print(f"{title:>12}: {min(timings) * 1000:9.2f} ms")
+    return result
+
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser(description="Время расчёта цен для набора предметов")
+    arg_parser.add_argument("--items", type=int, default=2000, help="Количество предметов")
+    arg_parser.add_argument("--levels", type=int, default=50, help="Количество уровней в каждом графике")
+    arg_parser.add_argument("--orders", type=int, default=10, help="Собственных 'sell order' на предмет")
+    arg_parser.add_argument("--repeat", type=int, default=5, help="Количество повторов (берётся лучшее время)")
+    args = arg_parser.parse_args()
+
+    items = generate_items(args.items, args.levels, args.orders)
+    price_analysis = PriceAnalysis()
+
+    one_by_one = timed("one by one", args.repeat, price_one_by_one, price_analysis, items)
+    batch = timed("batch", args.repeat, price_analysis.price_items, items)
+    print("results", "identical" if one_by_one == batch else "MISMATCH")
+
+
+if __name__ == "__main__":
+    main()
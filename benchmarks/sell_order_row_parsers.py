@@ -0,0 +1,62 @@
+"""
+    Сравнение способов разбора страницы 'sell order' (mylistings/render).
+
+    python -m benchmarks.sell_order_row_parsers [--rows N] [--repeat N] [--app-id ID] [--fixture path]
+
+    --fixture принимает сохранённый ответ mylistings/render (JSON с полем results_html) или HTML;
+    без него используется синтетическая страница из benchmarks.mylistings_fixture
+"""
+import json
+import time
+import argparse
+from pathlib import Path
+
+from bot.marketplace.marketplace_item_parser.sell_order_row_parser import SellOrderRowParser, SellOrderRowParserType
+from benchmarks.mylistings_fixture import generate_mylistings_html
+
+
+def load_fixture(path: str | Path) -> str:
+    text = Path(path).read_text(encoding="utf-8")
+    try:
+        return json.loads(text)["results_html"]
+    except (ValueError, KeyError, TypeError):
+        return text
+
+
+def benchmark(html_content: str, app_id: int | None, repeat: int) -> None:
+    reference = None
+    for parser_type in SellOrderRowParserType:
+        parser = SellOrderRowParser.from_type(parser_type)
+        rows_count = len(parser.split_rows(html_content))
+
+        timings = []
+        rows = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            rows = parser.parse_rows(html_content, app_id)
+            timings.append(time.perf_counter() - start)
+
+        best = min(timings)
+        if reference is None:
+            reference = rows
+        matches = "ok" if rows == reference else "MISMATCH"
+        print(
+            f"{parser_type.value:>12}: {best * 1000:9.1f} ms, "
+            f"{rows_count / best:10.0f} rows/s ({rows_count} rows, {len(rows)} parsed) {matches}"
+        )
+
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser(description="Сравнение способов разбора страницы 'sell order'")
+    arg_parser.add_argument("--rows", type=int, default=2000, help="Количество строк синтетической страницы")
+    arg_parser.add_argument("--repeat", type=int, default=5, help="Количество повторов (берётся лучшее время)")
+    arg_parser.add_argument("--app-id", type=int, default=None, help="Разбирать только строки этой игры")
+    arg_parser.add_argument("--fixture", type=str, default=None, help="Сохранённый ответ mylistings/render")
+    args = arg_parser.parse_args()
+
+    html_content = load_fixture(args.fixture) if args.fixture else generate_mylistings_html(args.rows)
+    benchmark(html_content, args.app_id, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
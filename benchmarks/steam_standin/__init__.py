@@ -0,0 +1,9 @@
+from .standin_market import StandinMarket
+from .standin_request_handler import StandinRequestHandler
+from .standin_server import StandinServer
+
+__all__ = [
+    "StandinMarket",
+    "StandinRequestHandler",
+    "StandinServer"
+]
@@ -0,0 +1,60 @@
+"""
+    Запуск локального стенда Steam отдельным процессом.
+    Бот направляется на стенд переменной окружения STEAM_BASE_URL (например, в .env);
+    item_nameid предметов стенда можно выгрузить в data/items/<app_id>.json флагом --items-file.
+
+    python -m benchmarks.steam_standin [--port N] [--app-id N] [--items N] [--latency s] [--jitter s]
+        [--too-many-requests-rate p] [--recorded dir] [--items-file path]
+"""
+import json
+import argparse
+from pathlib import Path
+
+from benchmarks.steam_standin import StandinMarket, StandinServer
+
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser(description="Локальный стенд Steam")
+    arg_parser.add_argument("--host", type=str, default="127.0.0.1")
+    arg_parser.add_argument("--port", type=int, default=8080)
+    arg_parser.add_argument("--app-id", type=int, default=480, help="ID игры предметов стенда")
+    arg_parser.add_argument("--items", type=int, default=200, help="Количество синтетических предметов")
+    arg_parser.add_argument("--listings", type=int, default=300, help="Количество 'sell order'")
+    arg_parser.add_argument("--inventory", type=int, default=100, help="Количество предметов в инвентаре")
+    arg_parser.add_argument("--buy-orders", type=int, default=50, help="Количество 'buy order'")
+    arg_parser.add_argument("--history", type=int, default=2000, help="Количество записей истории")
+    arg_parser.add_argument("--latency", type=float, default=0.05, help="Задержка ответа, с")
+    arg_parser.add_argument("--jitter", type=float, default=0.05, help="Случайная добавка к задержке, с")
+    arg_parser.add_argument("--too-many-requests-rate", type=float, default=0.0, help="Доля ответов 429")
+    arg_parser.add_argument("--recorded", type=str, default=None, help="Каталог HistogramRecorder со стаканами")
+    arg_parser.add_argument("--items-file", type=str, default=None, help="Куда выгрузить item_nameid предметов")
+    arg_parser.add_argument("--seed", type=int, default=0)
+    args = arg_parser.parse_args()
+
+    market = StandinMarket(
+        args.app_id, args.items, args.listings, args.inventory, args.buy_orders, args.history,
+        seed=args.seed, recorder_dir=args.recorded
+    )
+    server = StandinServer(
+        market, args.host, args.port, args.latency, args.jitter, args.too_many_requests_rate, seed=args.seed)
+    market.market_url = f"{server.url}/market"
+
+    if args.items_file:
+        path = Path(args.items_file)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(market.item_nameids, ensure_ascii=False, indent=4), encoding="utf-8")
+        print(f"item_nameid предметов: {path}")
+
+    print(f"STEAM_BASE_URL={server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        for (endpoint, status), count in sorted(server.stats.items()):
+            print(f"{endpoint:>24} {status}: {count}")
+
+
+if __name__ == "__main__":
+    main()
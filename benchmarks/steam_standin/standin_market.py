@@ -0,0 +1,575 @@
+import random
+import threading
+from datetime import date, timedelta
+from html import escape
+from pathlib import Path
+from typing import Any
+from urllib.parse import quote
+
+from bot.marketplace.histogram_recorder import HistogramRecorder
+from benchmarks.mylistings_fixture import ROW_TEMPLATE as LISTING_ROW_TEMPLATE
+from enums import Config
+
+BUY_ORDER_ROW_TEMPLATE = """
+<div class="market_listing_row market_recent_listing_row" id="mybuyorder_{order_id}">
+    <div class="market_listing_right_cell market_listing_edit_buttons actual_content">
+        <div class="market_listing_cancel_button">
+            <a href="javascript:CancelMarketBuyOrder('{order_id}')" class="item_market_action_button item_market_action_button_edit nodisable">
+                <span class="item_market_action_button_contents">Cancel</span>
+            </a>
+        </div>
+    </div>
+    <div class="market_listing_right_cell market_listing_my_price market_listing_buyorder_qty">
+        <span class="market_table_value">
+            <span class="market_listing_price">
+                <span class="market_listing_inline_buyorder_qty">{quantity} @</span>
+                {price}&nbsp;pуб.
+            </span>
+        </span>
+    </div>
+    <div class="market_listing_item_name_block">
+        <span class="market_listing_item_name" style="color: #D2D2D2;">
+            <a class="market_listing_item_name_link" href="{market_url}/listings/{app_id}/{hash_name}">{name}</a>
+        </span>
+        <br/>
+        <span class="market_listing_game_name">Game {app_id}</span>
+    </div>
+    <div style="clear: both"></div>
+</div>
+"""
+
+HISTORY_ROW_TEMPLATE = """
+<div class="market_listing_row market_recent_listing_row" id="{row_id}">
+    <div class="market_listing_left_cell market_listing_gainorloss">
+        {sign}
+    </div>
+    <div class="market_listing_right_cell market_listing_their_price">
+        <span class="market_table_value">
+            <span class="market_listing_price">
+                {price}&nbsp;pуб.
+            </span>
+        </span>
+    </div>
+    <div class="market_listing_right_cell market_listing_listed_date can_combine">
+        {acted_date}
+    </div>
+    <div class="market_listing_right_cell market_listing_listed_date can_combine">
+        {listed_date}
+    </div>
+    <div class="market_listing_item_name_block">
+        <span id="{row_id}_name" class="market_listing_item_name" style="color: #D2D2D2;">{name}</span>
+        <br/>
+        <span class="market_listing_game_name">Game {app_id}</span>
+    </div>
+    <div style="clear: both"></div>
+</div>
+"""
+
+WALLET_ROW_TEMPLATE = """
+<tr class="wallet_table_row wallet_table_row_amt_change">
+    <td class="wht_date">{date}</td>
+    <td class="wht_items">Steam Community Market</td>
+    <td class="wht_type"><div>{transaction}</div><div class="wth_payment">Wallet</div></td>
+    <td class="wht_total">{total}&nbsp;pуб.</td>
+    <td class="wht_wallet_change wallet_column">{sign}{total}&nbsp;pуб.</td>
+</tr>
+"""
+
+
+class StandinMarket:
+    """
+        Состояние торговой площадки для локального стенда StandinServer: предметы со стаканами,
+        собственные 'sell order' и 'buy order', инвентарь, история торговой площадки и кошелька, подтверждения.
+
+        Состояние синтетическое и задаётся seed, поэтому одинаковые параметры дают одинаковые ответы.
+        Стаканы можно взять из записи HistogramRecorder: тогда предметы - записанные предметы,
+        а их снимки отдаются по кругу в порядке записи.
+        Выставление, снятие и подтверждение ордеров изменяют состояние так же, как на Steam
+        (собственные ордера видны и в стакане). Цены хранятся в копейках.
+    """
+    CONTEXT_ID: int = 2
+    BOOK_LEVELS: int = 30
+    WALLET_PAGE_SIZE: int = 50
+
+    def __init__(
+            self,
+            app_id: int = 480,
+            items: int = 200,
+            listings: int = 300,
+            inventory: int = 100,
+            buy_orders: int = 50,
+            history: int = 2000,
+            seed: int = 0,
+            recorder_dir: str | Path | None = None,
+            market_url: str = "https://steamcommunity.com/market"
+    ) -> None:
+        """
+        :param app_id: ID игры, от имени которой отдаются все предметы
+        :param items: Количество синтетических предметов (не используется, если задан recorder_dir)
+        :param listings: Количество собственных 'sell order'
+        :param inventory: Количество предметов в инвентаре
+        :param buy_orders: Количество собственных 'buy order' (не больше количества предметов)
+        :param history: Количество записей истории торговой площадки
+        :param recorder_dir: Каталог HistogramRecorder со стаканами предметов
+        :param market_url: Адрес торговой площадки для ссылок на страницах
+        """
+        self.app_id = app_id
+        self.market_url = market_url
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+        # Предмет -> item_nameid, базовая цена, продажи в день и стаканы остальных участников
+        self.item_nameids: dict[str, int] = {}
+        self._names_by_nameid: dict[int, str] = {}
+        self._base_prices: dict[str, int] = {}
+        self._sales_per_day: dict[str, int] = {}
+        self._sell_books: dict[str, dict[int, int]] = {}
+        self._buy_books: dict[str, dict[int, int]] = {}
+        self._recorded: dict[str, list[dict[str, Any]]] = {}
+        self._recorded_positions: dict[str, int] = {}
+
+        if recorder_dir is not None:
+            self._load_recorded_items(HistogramRecorder(recorder_dir))
+        else:
+            self._generate_items(items)
+
+        self._next_id = 4000000000000000000
+        # asset_id -> предмет
+        self.inventory: dict[str, str] = {}
+        # order_id -> (предмет, asset_id, цена для покупателя, дата выставления)
+        self.listings: dict[str, tuple[str, str, int, date]] = {}
+        # order_id -> (предмет, цена, количество)
+        self.buy_orders: dict[str, tuple[str, int, int]] = {}
+        # id подтверждения -> (тип, описание)
+        self.confirmations: dict[str, tuple[int, str]] = {}
+
+        names = list(self.item_nameids)
+        for _ in range(inventory):
+            self.inventory[self._new_id()] = self._rng.choice(names)
+        today = date.today()
+        for _ in range(listings):
+            item_name = self._rng.choice(names)
+            price = round(self._base_prices[item_name] * self._rng.uniform(0.97, 1.15))
+            listed_date = today - timedelta(days=self._rng.randint(0, 60))
+            self.listings[self._new_id()] = (item_name, self._new_id(), price, listed_date)
+        for item_name in self._rng.sample(names, min(buy_orders, len(names))):
+            price = round(self._base_prices[item_name] * self._rng.uniform(0.75, 0.9))
+            self.buy_orders[self._new_id()] = (item_name, price, self._rng.randint(1, 5))
+
+        self.balance = 150000
+        # Записи истории от новых к старым: (id строки, предмет, знак, цена, количество, дата)
+        self.history: list[tuple[str, str, str, int, int, date]] = self._generate_history(history, names, today)
+
+    def _new_id(self) -> str:
+        self._next_id += 1
+        return str(self._next_id)
+
+    # region Предметы
+    def _add_item(self, item_name: str, item_nameid: int, base_price: int, sales_per_day: int) -> None:
+        self.item_nameids[item_name] = item_nameid
+        self._names_by_nameid[item_nameid] = item_name
+        self._base_prices[item_name] = max(base_price, 3)
+        self._sales_per_day[item_name] = max(sales_per_day, 1)
+
+    def _generate_items(self, count: int) -> None:
+        for i in range(count):
+            item_name = f"Standin Item {i:04d}"
+            base_price = round(10 ** self._rng.uniform(1.5, 4.5))
+            sales_per_day = self._rng.randint(1, 300)
+            self._add_item(item_name, 100000 + i, base_price, sales_per_day)
+
+            # Как на Steam, глубина стакана растёт с ликвидностью предмета
+            max_level_count = max(2, sales_per_day // 5)
+            sell_book, buy_book = {}, {}
+            price = self._base_prices[item_name]
+            for _ in range(self.BOOK_LEVELS):
+                sell_book[price] = self._rng.randint(1, max_level_count)
+                price += max(1, round(price * self._rng.uniform(0.005, 0.03)))
+            price = round(self._base_prices[item_name] * self._rng.uniform(0.8, 0.9))
+            for _ in range(self.BOOK_LEVELS):
+                if price < 3:
+                    break
+                buy_book[price] = self._rng.randint(1, 2 * max_level_count)
+                price -= max(1, round(price * self._rng.uniform(0.005, 0.03)))
+            # Стакан покупки глубже дневного объёма продаж (иначе бот не находит доступную цену покупки)
+            buy_book[min(buy_book)] += max(0, sales_per_day - sum(buy_book.values()) + 1)
+            self._sell_books[item_name] = sell_book
+            self._buy_books[item_name] = buy_book
+
+    def _load_recorded_items(self, recorder: HistogramRecorder) -> None:
+        for i, item_name in enumerate(recorder.item_names):
+            snapshots = [s for s in recorder.read(item_name) if s["sell_order_graph"] and s["buy_order_graph"]]
+            if not snapshots:
+                continue
+            sales_per_day = next((s["sales_per_day"] for s in reversed(snapshots) if s["sales_per_day"]), None)
+            self._add_item(
+                item_name,
+                recorder.item_nameid(item_name) or 100000 + i,
+                round(snapshots[0]["sell_order_graph"][0][0] * 100),
+                sales_per_day or self._rng.randint(1, 300)
+            )
+            self._recorded[item_name] = snapshots
+            self._recorded_positions[item_name] = 0
+        if not self.item_nameids:
+            raise ValueError("В записи HistogramRecorder нет снимков со стаканами")
+
+    def _generate_history(
+            self, count: int, names: list[str], today: date) -> list[tuple[str, str, str, int, int, date]]:
+        records = []
+        record_date = today
+        for i in range(count):
+            if self._rng.random() < 0.3:
+                record_date -= timedelta(days=self._rng.randint(1, 3))
+            item_name = self._rng.choice(names)
+            price = round(self._base_prices[item_name] * self._rng.uniform(0.8, 1.1))
+            quantity = self._rng.choice((1, 1, 1, 2, 3))
+            row_id = f"history_row_{count - i}_{count - i + 1}"
+            records.append((row_id, item_name, self._rng.choice("+-"), price * quantity, quantity, record_date))
+        return records
+    # endregion
+
+    @staticmethod
+    def format_price(kopecks: int) -> str:
+        return f"{kopecks / 100:.2f}".replace(".", ",")
+
+    @staticmethod
+    def format_day_month(d: date) -> str:
+        return f"{d.day} {d.strftime('%b')}"
+
+    # region Торговая площадка
+    @staticmethod
+    def _graph(book: dict[int, int], reverse: bool) -> list[list]:
+        graph = []
+        total = 0
+        for price in sorted(book, reverse=reverse):
+            total += book[price]
+            graph.append([price / 100, total, f"{total} по {price / 100:.2f} pуб. или {'выше' if reverse else 'ниже'}"])
+        return graph
+
+    def histogram(self, item_nameid: int) -> dict[str, Any] | None:
+        """
+            Ответ 'itemordershistogram' (None - неизвестный item_nameid)
+        """
+        with self._lock:
+            item_name = self._names_by_nameid.get(item_nameid)
+            if item_name is None:
+                return None
+
+            if item_name in self._recorded:
+                snapshots = self._recorded[item_name]
+                position = self._recorded_positions[item_name]
+                self._recorded_positions[item_name] = (position + 1) % len(snapshots)
+                snapshot = snapshots[position]
+                sell_book = self._book_from_graph(snapshot["sell_order_graph"])
+                buy_book = self._book_from_graph(snapshot["buy_order_graph"])
+            else:
+                sell_book = dict(self._sell_books[item_name])
+                buy_book = dict(self._buy_books[item_name])
+
+            for listing_item_name, _, price, _ in self.listings.values():
+                if listing_item_name == item_name:
+                    sell_book[price] = sell_book.get(price, 0) + 1
+            for buy_order_item_name, price, quantity in self.buy_orders.values():
+                if buy_order_item_name == item_name:
+                    buy_book[price] = buy_book.get(price, 0) + quantity
+
+        sell_graph = self._graph(sell_book, reverse=False)
+        buy_graph = self._graph(buy_book, reverse=True)
+        return {
+            "success": 1,
+            "sell_order_count": str(sell_graph[-1][1] if sell_graph else 0),
+            "buy_order_count": str(buy_graph[-1][1] if buy_graph else 0),
+            "lowest_sell_order": str(min(sell_book)) if sell_book else None,
+            "highest_buy_order": str(max(buy_book)) if buy_book else None,
+            "sell_order_graph": sell_graph,
+            "buy_order_graph": buy_graph,
+            "price_prefix": "",
+            "price_suffix": "pуб."
+        }
+
+    @staticmethod
+    def _book_from_graph(graph: list[list]) -> dict[int, int]:
+        """
+            Уровни стакана из накопительного графика
+        """
+        book = {}
+        previous_total = 0
+        for price, total, *_ in graph:
+            book[round(price * 100)] = total - previous_total
+            previous_total = total
+        return book
+
+    def price_overview(self, item_name: str) -> dict[str, Any] | None:
+        with self._lock:
+            if item_name not in self.item_nameids:
+                return None
+            price = self.format_price(self._base_prices[item_name])
+            return {
+                "success": True,
+                "lowest_price": f"{price} pуб.",
+                "volume": f"{self._sales_per_day[item_name]:,}",
+                "median_price": f"{price} pуб."
+            }
+
+    def mylistings_page(self, start: int, count: int) -> dict[str, Any]:
+        """
+            Ответ mylistings/render: 'sell order' от новых к старым (count < 0 - все)
+        """
+        with self._lock:
+            listings = list(reversed(self.listings.items()))
+            total_count = len(listings)
+            page = listings[start:] if count < 0 else listings[start:start + count]
+
+            rows = []
+            assets = {}
+            for order_id, (item_name, asset_id, price, listed_date) in page:
+                rows.append(LISTING_ROW_TEMPLATE.format(
+                    order_id=order_id,
+                    asset_id=asset_id,
+                    app_id=self.app_id,
+                    buyer_price=self.format_price(price),
+                    seller_price=self.format_price(round(price * Config.WITH_COMMISSION)),
+                    listed_date=self.format_day_month(listed_date),
+                    hash_name=quote(item_name),
+                    name=escape(item_name)
+                ))
+                assets[asset_id] = {"market_hash_name": item_name, "market_name": item_name}
+
+        return {
+            "success": True,
+            "start": start,
+            "pagesize": count,
+            "total_count": total_count,
+            # Если 'sell order' нет, Steam присылает пустой список вместо словаря
+            "assets": {str(self.app_id): {str(self.CONTEXT_ID): assets}} if assets else [],
+            "results_html": "".join(rows)
+        }
+
+    def market_page(self) -> str:
+        """
+            Страница торговой площадки с собственными 'buy order'
+        """
+        with self._lock:
+            rows = [
+                BUY_ORDER_ROW_TEMPLATE.format(
+                    order_id=order_id,
+                    quantity=quantity,
+                    price=self.format_price(price),
+                    market_url=self.market_url,
+                    app_id=self.app_id,
+                    hash_name=quote(item_name),
+                    name=escape(item_name)
+                )
+                for order_id, (item_name, price, quantity) in self.buy_orders.items()
+            ]
+        return (
+            "<html><body><div id=\"tabContentsMyListings\">"
+            "<div class=\"my_listing_section market_content_block market_home_listing_table\">"
+            f"{''.join(rows)}</div></div></body></html>"
+        )
+
+    def sell_item(self, asset_id: str, seller_price: int) -> dict[str, Any] | None:
+        """
+            Выставить предмет из инвентаря (None - такого предмета в инвентаре нет).
+            Создание лота требует мобильного подтверждения
+        """
+        with self._lock:
+            item_name = self.inventory.pop(asset_id, None)
+            if item_name is None:
+                return None
+            buyer_price = max(round(seller_price / Config.WITH_COMMISSION), seller_price + 1)
+            self.listings[self._new_id()] = (item_name, asset_id, buyer_price, date.today())
+            self.confirmations[self._new_id()] = (3, f"{item_name} - {self.format_price(buyer_price)} pуб.")
+        return {"success": True, "requires_confirmation": 1, "needs_mobile_confirmation": True}
+
+    def remove_listing(self, order_id: str) -> bool:
+        with self._lock:
+            listing = self.listings.pop(order_id, None)
+            if listing is None:
+                return False
+            item_name, asset_id, _, _ = listing
+            self.inventory[asset_id] = item_name
+        return True
+
+    def create_buy_order(self, item_name: str, price_total: int, quantity: int) -> dict[str, Any]:
+        with self._lock:
+            if item_name not in self.item_nameids or quantity <= 0:
+                return {"success": 8}
+            if any(buy_order[0] == item_name for buy_order in self.buy_orders.values()):
+                return {"success": 29, "message": "You already have an active buy order for this item."}
+            order_id = self._new_id()
+            self.buy_orders[order_id] = (item_name, price_total // quantity, quantity)
+        return {"success": 1, "buy_orderid": order_id}
+
+    def cancel_buy_order(self, order_id: str) -> bool:
+        with self._lock:
+            return self.buy_orders.pop(order_id, None) is not None
+
+    def history_page(self, start: int, count: int) -> dict[str, Any]:
+        """
+            Ответ myhistory/render: записи от новых к старым
+        """
+        with self._lock:
+            page = self.history[start:start + count]
+            total_count = len(self.history)
+
+        rows, hovers = [], []
+        assets: dict[str, dict] = {}
+        for row_id, item_name, sign, price, quantity, record_date in page:
+            item_id = row_id.split("_")[2]
+            rows.append(HISTORY_ROW_TEMPLATE.format(
+                row_id=row_id,
+                sign=sign,
+                price=self.format_price(price),
+                acted_date=self.format_day_month(record_date),
+                listed_date=self.format_day_month(record_date),
+                name=escape(f"{quantity} {item_name}" if quantity > 1 else item_name),
+                app_id=self.app_id
+            ))
+            for suffix in ("name", "image"):
+                hovers.append(
+                    f"CreateItemHoverFromContainer( g_rgAssets, '{row_id}_{suffix}', "
+                    f"{self.app_id}, '{self.CONTEXT_ID}', '{item_id}', 0 );\n"
+                )
+            assets[item_id] = {"market_hash_name": item_name, "market_name": item_name}
+
+        return {
+            "success": True,
+            "pagesize": count,
+            "total_count": total_count,
+            "start": start,
+            "assets": {str(self.app_id): {str(self.CONTEXT_ID): assets}} if assets else [],
+            "hovers": "".join(hovers),
+            "results_html": "".join(rows)
+        }
+    # endregion
+
+    # region Инвентарь
+    def inventory_page(self, count: int, start_asset_id: str | None = None) -> dict[str, Any]:
+        """
+            Страница инвентаря: предметы по возрастанию asset_id после start_asset_id
+        """
+        with self._lock:
+            asset_ids = sorted(self.inventory, key=int)
+            if start_asset_id:
+                asset_ids = [asset_id for asset_id in asset_ids if int(asset_id) > int(start_asset_id)]
+            page = asset_ids[:count]
+            more_items = len(asset_ids) > count
+
+            assets, descriptions = [], {}
+            for asset_id in page:
+                item_name = self.inventory[asset_id]
+                class_id = str(self.item_nameids[item_name])
+                assets.append({
+                    "appid": self.app_id,
+                    "contextid": str(self.CONTEXT_ID),
+                    "assetid": asset_id,
+                    "classid": class_id,
+                    "instanceid": "0",
+                    "amount": "1"
+                })
+                descriptions[class_id] = {
+                    "appid": self.app_id,
+                    "classid": class_id,
+                    "instanceid": "0",
+                    "name": item_name,
+                    "market_name": item_name,
+                    "market_hash_name": item_name,
+                    "tradable": 1,
+                    "marketable": 1
+                }
+            total_count = len(self.inventory)
+
+        result = {
+            "assets": assets,
+            "descriptions": list(descriptions.values()),
+            "total_inventory_count": total_count,
+            "success": 1,
+            "rwgrsn": -2
+        }
+        if more_items:
+            result["more_items"] = 1
+            result["last_assetid"] = page[-1]
+        return result
+    # endregion
+
+    # region Аккаунт
+    def account_page(self) -> str:
+        with self._lock:
+            balance = self.format_price(self.balance)
+        return (
+            "<html><body><div class=\"accountInfoBlock\">"
+            f"<div class=\"accountRow accountBalance\"><div class=\"accountData price\">{balance} pуб.</div></div>"
+            "</div></body></html>"
+        )
+
+    def _wallet_rows(self, start: int, count: int) -> str:
+        rows = []
+        for _, _, sign, price, _, record_date in self.history[start:start + count]:
+            rows.append(WALLET_ROW_TEMPLATE.format(
+                date=f"{record_date.day} {record_date.strftime('%b')}, {record_date.year}",
+                transaction="Market Transaction" if sign == "+" else "Market Transactions",
+                total=self.format_price(price),
+                sign="-" if sign == "+" else "+"
+            ))
+        return "".join(rows)
+
+    def _wallet_cursor(self, start: int) -> dict[str, Any] | None:
+        if start >= len(self.history):
+            return None
+        return {"wallet_txnid": str(start), "timestamp_newest": 0, "balance": str(self.balance), "currency": 5}
+
+    def wallet_history_page(self) -> str:
+        """
+            Страница account/history: первая порция транзакций кошелька и курсор следующей
+        """
+        with self._lock:
+            rows = self._wallet_rows(0, self.WALLET_PAGE_SIZE)
+            cursor = self._wallet_cursor(self.WALLET_PAGE_SIZE)
+        script = ""
+        if cursor:
+            cursor_json = ", ".join(f"\"{key}\": \"{value}\"" for key, value in cursor.items())
+            script = f"<script>var g_historyCursor = {{{cursor_json}}};</script>"
+        return (
+            "<html><body><table class=\"wallet_history_table\"><tbody>"
+            f"{rows}</tbody></table>{script}</body></html>"
+        )
+
+    def load_more_wallet_history(self, cursor: dict[str, str]) -> dict[str, Any]:
+        start = int(cursor.get("wallet_txnid", 0))
+        with self._lock:
+            result = {"success": 1, "html": self._wallet_rows(start, self.WALLET_PAGE_SIZE)}
+            if next_cursor := self._wallet_cursor(start + self.WALLET_PAGE_SIZE):
+                result["cursor"] = next_cursor
+        return result
+    # endregion
+
+    # region Подтверждения
+    def confirmations_list(self) -> dict[str, Any]:
+        with self._lock:
+            conf = [
+                {
+                    "type": conf_type,
+                    "type_name": "Market Listing" if conf_type == 3 else "Confirmation",
+                    "id": conf_id,
+                    "creator_id": conf_id,
+                    "nonce": f"nonce{conf_id}",
+                    "creation_time": 0,
+                    "cancel": "Cancel",
+                    "accept": "Create Listing",
+                    "icon": "",
+                    "multi": False,
+                    "headline": description,
+                    "summary": [description],
+                    "warn": None
+                }
+                for conf_id, (conf_type, description) in self.confirmations.items()
+            ]
+        return {"success": True, "needauth": False, "conf": conf}
+
+    def respond_to_confirmations(self, conf_ids: list[str]) -> bool:
+        with self._lock:
+            for conf_id in conf_ids:
+                self.confirmations.pop(conf_id, None)
+        return True
+    # endregion
@@ -0,0 +1,184 @@
+import re
+import json
+import hashlib
+from http.server import BaseHTTPRequestHandler
+from urllib.parse import urlsplit, parse_qs
+
+
+class StandinRequestHandler(BaseHTTPRequestHandler):
+    """
+        Обработчик запросов StandinServer: эндпоинты Steam, к которым обращается бот, отвечают
+        по состоянию StandinMarket. Перед ответом выдерживается задержка сервера, часть запросов
+        получает 429 (действие при этом не выполняется), а на повторный GET с тем же ETag приходит 304
+    """
+    # Соединения keep-alive, как у Steam: сессия requests переиспользует их
+    protocol_version = "HTTP/1.1"
+    # Заголовки и тело пишутся отдельно: без TCP_NODELAY тело ждёт подтверждения заголовков (Nagle)
+    disable_nagle_algorithm = True
+
+    # (метод, путь, имя эндпоинта для статистики, метод-обработчик)
+    ROUTES: list[tuple[str, re.Pattern, str, str]] = [
+        ("GET", re.compile(r"/market/itemordershistogram/?"), "itemordershistogram", "_histogram"),
+        ("GET", re.compile(r"/market/priceoverview/?"), "priceoverview", "_price_overview"),
+        ("GET", re.compile(r"/market/mylistings/render/?"), "mylistings", "_mylistings"),
+        ("GET", re.compile(r"/market/myhistory/render/?"), "myhistory", "_history"),
+        ("GET", re.compile(r"/market/?"), "market", "_market_page"),
+        ("POST", re.compile(r"/market/sellitem/?"), "sellitem", "_sell_item"),
+        ("POST", re.compile(r"/market/removelisting/(?P<order_id>\d+)/?"), "removelisting", "_remove_listing"),
+        ("POST", re.compile(r"/market/createbuyorder/?"), "createbuyorder", "_create_buy_order"),
+        ("POST", re.compile(r"/market/cancelbuyorder/?"), "cancelbuyorder", "_cancel_buy_order"),
+        ("GET", re.compile(r"/inventory/\d+/\d+/\d+/?"), "inventory", "_inventory"),
+        ("GET", re.compile(r"/mobileconf/getlist/?"), "mobileconf", "_confirmations"),
+        ("GET", re.compile(r"/mobileconf/ajaxop/?"), "mobileconf", "_respond_to_confirmation"),
+        ("POST", re.compile(r"/mobileconf/multiajaxop/?"), "mobileconf", "_respond_to_confirmation"),
+        ("GET", re.compile(r"/account/?"), "account", "_account_page"),
+        ("GET", re.compile(r"/account/history/?"), "account_history", "_wallet_history_page"),
+        ("POST", re.compile(r"/account/AjaxLoadMoreHistory/?"), "account_history", "_load_more_wallet_history"),
+    ]
+
+    def do_GET(self) -> None:
+        self._dispatch("GET")
+
+    def do_POST(self) -> None:
+        self._dispatch("POST")
+
+    def log_message(self, format: str, *args) -> None:
+        pass
+
+    def _dispatch(self, method: str) -> None:
+        split_url = urlsplit(self.path)
+        # Адрес priceoverview в Urls содержит двойной слэш, Steam его допускает
+        path = re.sub(r"/{2,}", "/", split_url.path)
+        self.params = {key: values[-1] for key, values in parse_qs(split_url.query).items()}
+        self.form = {}
+        if length := int(self.headers.get("Content-Length") or 0):
+            self.form = parse_qs(self.rfile.read(length).decode("utf-8"))
+
+        for route_method, pattern, endpoint, handler_name in self.ROUTES:
+            if route_method == method and (match := pattern.fullmatch(path)):
+                break
+        else:
+            self.server.count(path, 404)
+            self._send(404, b"Not Found", "text/plain")
+            return
+
+        self.server.delay()
+        if self.server.is_too_many_requests(path):
+            self.server.count(endpoint, 429)
+            self._send(429, b"Too Many Requests", "text/plain")
+            return
+
+        status, body, content_type = getattr(self, handler_name)(**match.groupdict())
+        if method == "GET" and status == 200 and self.server.etags:
+            etag = f"\"{hashlib.sha1(body).hexdigest()}\""
+            if self.headers.get("If-None-Match") == etag:
+                self.server.count(endpoint, 304)
+                self._send(304, b"", content_type, {"ETag": etag})
+                return
+            self.server.count(endpoint, status)
+            self._send(status, body, content_type, {"ETag": etag})
+            return
+        self.server.count(endpoint, status)
+        self._send(status, body, content_type)
+
+    def _send(self, status: int, body: bytes, content_type: str, headers: dict[str, str] | None = None) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        if body:
+            self.wfile.write(body)
+
+    @staticmethod
+    def _json(data: dict, status: int = 200) -> tuple[int, bytes, str]:
+        return status, json.dumps(data, ensure_ascii=False).encode("utf-8"), "application/json; charset=utf-8"
+
+    @staticmethod
+    def _html(page: str, status: int = 200) -> tuple[int, bytes, str]:
+        return status, page.encode("utf-8"), "text/html; charset=utf-8"
+
+    def _form_value(self, key: str, default: str = "") -> str:
+        return self.form.get(key, [default])[-1]
+
+    # region Торговая площадка
+    def _histogram(self) -> tuple[int, bytes, str]:
+        try:
+            item_nameid = int(self.params.get("item_nameid", ""))
+        except ValueError:
+            return self._json({"success": 8}, 400)
+        # На неизвестный item_nameid Steam отвечает без графиков
+        return self._json(self.server.market.histogram(item_nameid) or {"success": 1})
+
+    def _price_overview(self) -> tuple[int, bytes, str]:
+        if price_overview := self.server.market.price_overview(self.params.get("market_hash_name", "")):
+            return self._json(price_overview)
+        return self._json({"success": False}, 500)
+
+    def _mylistings(self) -> tuple[int, bytes, str]:
+        start = int(self.params.get("start", 0))
+        count = int(self.params.get("count", 10))
+        return self._json(self.server.market.mylistings_page(start, count))
+
+    def _history(self) -> tuple[int, bytes, str]:
+        start = int(self.params.get("start", 0))
+        count = min(int(self.params.get("count", 10)), 500)
+        return self._json(self.server.market.history_page(start, count))
+
+    def _market_page(self) -> tuple[int, bytes, str]:
+        return self._html(self.server.market.market_page())
+
+    def _sell_item(self) -> tuple[int, bytes, str]:
+        result = self.server.market.sell_item(self._form_value("assetid"), int(self._form_value("price", "0")))
+        if result is None:
+            return self._json({"success": False, "message": "The item specified is no longer in your inventory."}, 502)
+        return self._json(result)
+
+    def _remove_listing(self, order_id: str) -> tuple[int, bytes, str]:
+        if self.server.market.remove_listing(order_id):
+            return self._json({"success": True})
+        return self._json({"success": False}, 502)
+
+    def _create_buy_order(self) -> tuple[int, bytes, str]:
+        result = self.server.market.create_buy_order(
+            self._form_value("market_hash_name"),
+            int(self._form_value("price_total", "0")),
+            int(self._form_value("quantity", "0"))
+        )
+        return self._json(result, 200 if result["success"] == 1 else 502)
+
+    def _cancel_buy_order(self) -> tuple[int, bytes, str]:
+        return self._json({"success": 1 if self.server.market.cancel_buy_order(self._form_value("buy_orderid")) else 8})
+    # endregion
+
+    def _inventory(self) -> tuple[int, bytes, str]:
+        count = min(int(self.params.get("count", 75)), 2000)
+        return self._json(self.server.market.inventory_page(count, self.params.get("start_assetid")))
+
+    # region Подтверждения
+    def _confirmations(self) -> tuple[int, bytes, str]:
+        return self._json(self.server.market.confirmations_list())
+
+    def _respond_to_confirmation(self) -> tuple[int, bytes, str]:
+        if self.command == "GET":
+            conf_ids = [self.params.get("cid", "")]
+        else:
+            conf_ids = self.form.get("cid[]", [])
+        return self._json({"success": self.server.market.respond_to_confirmations(conf_ids)})
+    # endregion
+
+    # region Аккаунт
+    def _account_page(self) -> tuple[int, bytes, str]:
+        return self._html(self.server.market.account_page())
+
+    def _wallet_history_page(self) -> tuple[int, bytes, str]:
+        return self._html(self.server.market.wallet_history_page())
+
+    def _load_more_wallet_history(self) -> tuple[int, bytes, str]:
+        cursor = {
+            key[len("cursor["):-1]: values[-1]
+            for key, values in self.form.items() if key.startswith("cursor[") and key.endswith("]")
+        }
+        return self._json(self.server.market.load_more_wallet_history(cursor))
+    # endregion
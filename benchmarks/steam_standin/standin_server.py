@@ -0,0 +1,105 @@
+import time
+import random
+import threading
+from collections import Counter
+from http.server import ThreadingHTTPServer
+
+from benchmarks.steam_standin.standin_market import StandinMarket
+from benchmarks.steam_standin.standin_request_handler import StandinRequestHandler
+
+
+class StandinServer(ThreadingHTTPServer):
+    """
+        Локальный HTTP-сервер, заменяющий Steam для нагрузочных и регрессионных прогонов бота.
+        Один адрес обслуживает все хосты (steamcommunity.com, store.steampowered.com), поэтому бот
+        направляется на стенд переменной окружения STEAM_BASE_URL или вызовом Urls.configure.
+
+        Задержка ответа - latency плюс равномерно распределённая добавка до jitter секунд;
+        доля too_many_requests_rate запросов к путям с префиксами too_many_requests_prefixes получает 429.
+        Случайность задаётся seed, поэтому одинаковые прогоны в одном потоке повторяются.
+
+        with StandinServer(StandinMarket()) as server:
+            Urls.configure(community=server.url, store=server.url)
+    """
+    daemon_threads = True
+
+    def __init__(
+            self,
+            market: StandinMarket,
+            host: str = "127.0.0.1",
+            port: int = 0,
+            latency: float = 0.0,
+            jitter: float = 0.0,
+            too_many_requests_rate: float = 0.0,
+            too_many_requests_prefixes: tuple[str, ...] = ("/market/", "/inventory/"),
+            etags: bool = True,
+            seed: int = 0
+    ) -> None:
+        """
+        :param port: Порт (0 - любой свободный, см. url)
+        :param latency: Задержка каждого ответа в секундах
+        :param jitter: Верхняя граница случайной добавки к задержке в секундах
+        :param too_many_requests_rate: Доля запросов, получающих 429
+        :param too_many_requests_prefixes: Префиксы путей, на которые может прийти 429 (подтверждения
+            запрашиваются в обход api_request и 429 не обрабатывают)
+        :param etags: Отдавать ETag и отвечать 304 на условные запросы
+        """
+        super().__init__((host, port), StandinRequestHandler)
+        self.market = market
+        self.latency = latency
+        self.jitter = jitter
+        self.too_many_requests_rate = too_many_requests_rate
+        self.too_many_requests_prefixes = too_many_requests_prefixes
+        self.etags = etags
+
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        # (эндпоинт, статус) -> количество ответов
+        self.stats: Counter[tuple[str, int]] = Counter()
+        self._thread: threading.Thread | None = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def delay(self) -> None:
+        with self._lock:
+            delay = self.latency + (self._rng.uniform(0, self.jitter) if self.jitter else 0)
+        if delay > 0:
+            time.sleep(delay)
+
+    def is_too_many_requests(self, path: str) -> bool:
+        if self.too_many_requests_rate <= 0 or not path.startswith(self.too_many_requests_prefixes):
+            return False
+        with self._lock:
+            return self._rng.random() < self.too_many_requests_rate
+
+    def count(self, endpoint: str, status: int) -> None:
+        with self._lock:
+            self.stats[(endpoint, status)] += 1
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self.stats.clear()
+
+    def start(self) -> 'StandinServer':
+        """
+            Обслуживать запросы в фоновом потоке
+        """
+        self._thread = threading.Thread(target=self.serve_forever, name="StandinServer", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self) -> 'StandinServer':
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
@@ -3,7 +3,15 @@ from .item_asset import ItemAsset
 from .market_item_stats import MarketItemStats
 from .market_month_stats import MarketMonthStats
 from .market_item_profit_stats import MarketItemProfitStats
+from .fifo_lot_queue import FifoLotQueue
 from .summarize_to_excel import SummarizeToExcel
+from .summarize_to_columnar import SummarizeToColumnar
+from .columnar_format import ColumnarFormat
+from .history_record import HistoryRecord
+from .market_history_parser import MarketHistoryParser
+from .market_history_ledger import MarketHistoryLedger
+from .wallet_history_client import WalletHistoryClient
+from .date_index import DateIndex
 
 __all__ = [
     "Account",
@@ -11,5 +19,13 @@ __all__ = [
     "MarketItemStats",
     "MarketMonthStats",
     "MarketItemProfitStats",
-    "SummarizeToExcel"
+    "FifoLotQueue",
+    "SummarizeToExcel",
+    "SummarizeToColumnar",
+    "ColumnarFormat",
+    "HistoryRecord",
+    "MarketHistoryParser",
+    "MarketHistoryLedger",
+    "WalletHistoryClient",
+    "DateIndex"
 ]
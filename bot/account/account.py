@@ -1,9 +1,11 @@
 import os
-import re
 import json
 import time
+import threading
 import subprocess
-from datetime import datetime, date
+from pathlib import Path
+from urllib.parse import urlparse
+from datetime import date
 
 import requests
 from tqdm import tqdm
@@ -18,18 +20,25 @@ from selenium.webdriver.support.wait import WebDriverWait
 from selenium.webdriver.support import expected_conditions
 
 from tools.rate_limiter import rate_limited
-from tools import BasicLogger
+from tools import BasicLogger, OrderedPrefetcher
 from tools.file_store import FileStore, FileStoreType
 
-from enums import Urls
+from enums import Urls, Host, EndpointClass
 from enums import Config
-from bot.account.item_asset import ItemAsset
+from bot.account.history_record import HistoryRecord
+from bot.account.market_history_parser import MarketHistoryParser
+from bot.account.market_history_ledger import MarketHistoryLedger
+from bot.account.wallet_history_client import WalletHistoryClient
+from bot.account.date_index import DateIndex
 from bot.account.market_item_stats import MarketItemStats
 from bot.account.market_month_stats import MarketMonthStats
 from bot.account.market_item_profit_stats import MarketItemProfitStats
+from bot.account.fifo_lot_queue import FifoLotQueue
 from bot.account.summarize_to_excel import SummarizeToExcel
+from bot.account.summarize_to_columnar import SummarizeToColumnar
+from bot.account.columnar_format import ColumnarFormat
 from utils.web_utils import api_request
-from utils.exceptions import TooManyRequestsError
+from utils import parse_steam_date
 
 
 class Account(BasicLogger):
@@ -43,11 +52,18 @@ class Account(BasicLogger):
             dir_specify="account",
             file_name=f"{self.__class__.__name__}"
         )
-        self.excel_maker = SummarizeToExcel()
+        # Три книги строятся параллельно, оставшиеся процессы делятся между ними для подготовки листов
+        self.excel_maker = SummarizeToExcel(workers=max(1, Config.REPORT_WORKERS // 3))
+        self.columnar_maker = SummarizeToColumnar(ColumnarFormat(Config.HISTORY_COLUMNAR_FORMAT))
+        self.history_parser = MarketHistoryParser()
+        self.wallet_history_client = WalletHistoryClient(self.logger)
+        # Сколько записей появилось в истории с начала её обработки (см. _fetch_history_page_records)
+        self._history_shift = 0
+        self._history_shift_lock = threading.Lock()
 
         self.dates_file_path = "data/market_history/json/dates.json"
 
-    @rate_limited(1)
+    @rate_limited(Host.STORE, EndpointClass.ACCOUNT)
     def get_account_page(self, session: requests.Session) -> requests.Response:
         return api_request(
             session,
@@ -81,276 +97,133 @@ class Account(BasicLogger):
         return result
 
     # region Market History
-    @rate_limited(3)
+    @rate_limited(Host.COMMUNITY, EndpointClass.MARKET_HISTORY)
+    def _get_history_page(self, session: requests.Session, count: int, start: int) -> dict:
+        page = api_request(
+            session,
+            "GET",
+            f"{Urls.HISTORY}/render/?count={count}&start={start}",
+            logger=self.logger
+        )
+        return json.loads(page.content)
+
     def _get_history_page_content(
             self, session: requests.Session, count: int, start: int, max_attempts: int = 4) -> dict:
+        # Ответы 429 повторяет rate_limited у _get_history_page, здесь - только пустые страницы
         for _ in range(max_attempts):
-            try:
-                page = api_request(
-                    session,
-                    "GET",
-                    f"{Urls.HISTORY}/render/?count={count}&start={start}",
-                    logger=self.logger
-                )
-                result = json.loads(page.content)
-                if not result.get("total_count", 0):
-                    time.sleep(5)
-                else:
-                    return result
-            except TooManyRequestsError:
-                time.sleep(20)
+            result = self._get_history_page(session, count, start)
+            if result.get("total_count", 0):
+                return result
+            time.sleep(5)
 
         raise RuntimeError("Не удалось получить страницу market history")
 
     @staticmethod
-    def _build_hover_map(hovers: str) -> dict[str, ItemAsset]:
-        hover_map: dict[str, ItemAsset] = {}
-
-        re_call = re.compile(
-            r"CreateItemHoverFromContainer\(\s*g_rgAssets\s*,\s*"
-            r"(?P<quote1>['\"])(?P<container>.+?)(?P=quote1)\s*,\s*"
-            r"(?P<app_id>\d+)\s*,\s*"
-            r"(?P<quote2>['\"])(?P<context_id>.+?)(?P=quote2)\s*,\s*"
-            r"(?P<quote3>['\"])(?P<item_id>\d+)(?P=quote3)\s*,\s*"
-            r"(?P<rest>\d+)\s*\)",
-            flags=re.IGNORECASE
-        )
-
-        for m in re_call.finditer(hovers):
-            container = m.group("container")
-            app_id = m.group("app_id")
-            context_id = m.group("context_id")
-            item_id = m.group("item_id")
-
-            key = re.sub(r"_(name|image|icon|link|price|count)$", "", container, flags=re.IGNORECASE)
-
-            if not hover_map.get(key):
-                hover_map[key] = ItemAsset(app_id, context_id, item_id)
-
-        return hover_map
+    def _resolve_record_dates(
+            records: list[HistoryRecord], date_index: DateIndex, date_cursor: date) -> (list[date], date):
+        """
+            Восстановить год записей по датам транзакций кошелька
+        """
+        record_dates = []
+        for record in records:
+            date_cursor = date_index.align(date_cursor, record.partial_date)
+            record_dates.append(date_cursor)
+        return record_dates, date_cursor
 
     @staticmethod
-    def _get_split_name_count(item_name: str) -> (str, int):
-        parts = item_name.strip().split(maxsplit=1)
-        if parts and parts[0].isdigit():
-            count = int(parts[0])
-            base_name = parts[1].strip() if len(parts) > 1 else ""
-            return base_name, count
-        return item_name, 1
-
-    def _aggregate_data(
-            self,
-            page_content: dict,
-            aggregated_data: dict,
-            app_id_to_game_name: dict,
-            unknown_prefix: str
-    ) -> None:
-        html_content: str = page_content.get("results_html", "")
-        assets: dict = page_content.get("assets", "")
-        hovers: str = page_content.get("hovers", "")
-
-        if not (html_content and assets and hovers):
-            raise Exception("Не получены элементы страницы истории")
-
-        hover_map = self._build_hover_map(hovers)
-
-        document = BeautifulSoup(html_content, 'html.parser')
-        rows = document.find_all("div", class_="market_listing_row")
-        if not rows:
-            raise Exception("Не получены элементы market history")
-
-        for row in reversed(rows):
-            game_element = row.find("span", class_="market_listing_game_name")
-            item_element = row.find("span", class_="market_listing_item_name")
-            price_element = row.find("span", class_="market_listing_price")
-            gain_or_loss_element = row.find("div", class_="market_listing_gainorloss")
-            date_element = row.find("div", class_="market_listing_listed_date")
-            history_row_id = row.get("id")
-
-            if not (game_element and item_element and price_element and gain_or_loss_element and date_element):
-                raise Exception("Не все элементы получены")
-
-            asset: ItemAsset = hover_map.get(history_row_id)
-            item: dict = assets[asset.AppID][asset.ContextID][asset.ItemID]
-
-            game_name = game_element.text.strip()
-            gain_or_loss = gain_or_loss_element.text.strip()
-            price_text = price_element.text.strip()
-            price = float(price_text.replace(",", ".").split()[0])
-
-            item_hash_name = item.get("market_hash_name")
-            if not item_hash_name or item_hash_name == "":
-                item_hash_name = f"unknown_{unknown_prefix}_id={asset.ItemID}"
-            _, count = self._get_split_name_count(item_element.text.strip())
-
-            item_stats: MarketItemStats = aggregated_data[asset.AppID][item_hash_name]
-            item_stats.item_name = item.get("market_name")
-            if not item_stats.item_name:
-                item_stats.item_name = item_hash_name
-            if gain_or_loss == "+":
-                item_stats.total_bought += count
-                item_stats.sum_bought = round(item_stats.sum_bought + price, 2)
-            elif gain_or_loss == "-":
-                item_stats.total_sold += count
-                item_stats.sum_sold = round(item_stats.sum_sold + price, 2)
-            else:
-                raise Exception(f"Не найдено gain_or_loss")
+    def _aggregate_profit_data(records: list[HistoryRecord], profit_aggregated_data: dict) -> None:
+        """
+            Продажа сопоставляется с самыми старыми купленными лотами (FIFO), при необходимости с несколькими.
+            Проданное сверх купленного (например, полученное не через торговую площадку) не учитывается
+        """
+        for record in records:
+            item_profit_stats: MarketItemProfitStats = profit_aggregated_data[record.app_id][record.item_hash_name]
+            item_profit_stats.item_name = record.item_name
+            if record.is_purchase:
+                item_profit_stats.bought_queue.push(record.price, record.count)
+                continue
 
-            if not app_id_to_game_name.get(asset.AppID):
-                if asset.AppID == "753":
-                    app_id_to_game_name[asset.AppID] = "Steam"
-                else:
-                    app_id_to_game_name[asset.AppID] = game_name
+            bought_price, matched_count = item_profit_stats.bought_queue.consume(record.count)
+            if not matched_count:
+                continue
 
-    def _aggregate_monthly_data(
-            self,
-            page_content: dict,
-            monthly_aggregated_data: dict,
-            app_id_to_game_name: dict,
-            full_dates: list[date],
-            date_cursor: int
-    ) -> int:
-        html_content: str = page_content.get("results_html", "")
-        assets: dict = page_content.get("assets", "")
-        hovers: str = page_content.get("hovers", "")
-
-        if not (html_content and assets and hovers):
-            raise Exception("Не получены элементы страницы истории")
-
-        hover_map = self._build_hover_map(hovers)
-
-        document = BeautifulSoup(html_content, 'html.parser')
-        rows = document.find_all("div", class_="market_listing_row")
-        if not rows:
-            raise Exception("Не получены элементы market history")
-
-        for row in reversed(rows):
-            game_element = row.find("span", class_="market_listing_game_name")
-            item_element = row.find("span", class_="market_listing_item_name")
-            price_element = row.find("span", class_="market_listing_price")
-            gain_or_loss_element = row.find("div", class_="market_listing_gainorloss")
-            date_element = row.find("div", class_="market_listing_listed_date")
-            history_row_id = row.get("id")
-
-            if not (game_element and item_element and price_element and gain_or_loss_element and date_element):
-                raise Exception("Не все элементы получены")
-
-            asset: ItemAsset = hover_map.get(history_row_id)
-
-            game_name = game_element.text.strip()
-            gain_or_loss = gain_or_loss_element.text.strip()
-            price_text = price_element.text.strip()
-            price = float(price_text.replace(",", ".").split()[0])
-
-            _, count = self._get_split_name_count(item_element.text.strip())
-
-            history_date = self._parse_partial_date(date_element.text.strip())
-            actual_date, date_cursor = self._get_actual_month_year(full_dates, date_cursor, history_date)
-
-            month_stats: MarketMonthStats = monthly_aggregated_data[asset.AppID][actual_date]
-            if gain_or_loss == "+":
-                month_stats.total_bought += count
-                month_stats.sum_bought = round(month_stats.sum_bought + price, 2)
-            elif gain_or_loss == "-":
-                month_stats.total_sold += count
-                month_stats.sum_sold = round(month_stats.sum_sold + price, 2)
+            sold_price = record.price
+            if matched_count != record.count:
+                sold_price = record.price * matched_count / record.count
+            price_dif = round(sold_price - bought_price, 2)
+            if price_dif > 0:
+                item_profit_stats.sum_profitable = round(item_profit_stats.sum_profitable + price_dif, 2)
+                item_profit_stats.total_profitable += matched_count
             else:
-                raise Exception(f"Не найдено gain_or_loss")
-
-            if not app_id_to_game_name.get(asset.AppID):
-                if asset.AppID == "753":
-                    app_id_to_game_name[asset.AppID] = "Steam"
-                else:
-                    app_id_to_game_name[asset.AppID] = game_name
-
-        return date_cursor
+                item_profit_stats.sum_unprofitable = round(item_profit_stats.sum_unprofitable + price_dif, 2)
+                item_profit_stats.total_unprofitable += matched_count
 
-    def _aggregate_profit_data(
-            self,
-            page_content: dict,
-            profit_aggregated_data: dict,
-            app_id_to_game_name: dict,
-            unknown_prefix: str
-    ) -> None:
-        html_content: str = page_content.get("results_html", "")
-        assets: dict = page_content.get("assets", "")
-        hovers: str = page_content.get("hovers", "")
-
-        if not (html_content and assets and hovers):
-            raise Exception("Не получены элементы страницы истории")
-
-        hover_map = self._build_hover_map(hovers)
-
-        document = BeautifulSoup(html_content, 'html.parser')
-        rows = document.find_all("div", class_="market_listing_row")
-        if not rows:
-            raise Exception("Не получены элементы market history")
-
-        for row in reversed(rows):
-            game_element = row.find("span", class_="market_listing_game_name")
-            item_element = row.find("span", class_="market_listing_item_name")
-            price_element = row.find("span", class_="market_listing_price")
-            gain_or_loss_element = row.find("div", class_="market_listing_gainorloss")
-            date_element = row.find("div", class_="market_listing_listed_date")
-            history_row_id = row.get("id")
-
-            if not (game_element and item_element and price_element and gain_or_loss_element and date_element):
-                raise Exception("Не все элементы получены")
-
-            asset: ItemAsset = hover_map.get(history_row_id)
-            item: dict = assets[asset.AppID][asset.ContextID][asset.ItemID]
-
-            game_name = game_element.text.strip()
-            gain_or_loss = gain_or_loss_element.text.strip()
-            price_text = price_element.text.strip()
-            price = float(price_text.replace(",", ".").split()[0])
-
-            item_hash_name = item.get("market_hash_name")
-            if not item_hash_name or item_hash_name == "":
-                item_hash_name = f"unknown_{unknown_prefix}_id={asset.ItemID}"
-            _, count = self._get_split_name_count(item_element.text.strip())
-
-            item_profit_stats: MarketItemProfitStats = profit_aggregated_data[asset.AppID][item_hash_name]
-            item_profit_stats.item_name = item.get("market_name")
-            if not item_profit_stats.item_name:
-                item_profit_stats.item_name = item_hash_name
-            if gain_or_loss == "+":
-                item_profit_stats.bought_queue.append((price, count))
-            elif gain_or_loss == "-":
-                if len(item_profit_stats.bought_queue) > 0:
-                    bought_price, bought_count = item_profit_stats.bought_queue.pop(0)
-                    price_dif = round(price - bought_price, 2)
-                    if bought_count != count:
-                        new_bought_price = round(bought_price * (bought_count - count) / bought_count, 2)
-                        new_bought_count = bought_count - count
-                        item_profit_stats.bought_queue.insert(0, (new_bought_price, new_bought_count))
-                        price_dif = round(price - bought_price * count / bought_count, 2)
-                    if price_dif > 0:
-                        item_profit_stats.sum_profitable = round(item_profit_stats.sum_profitable + price_dif, 2)
-                        item_profit_stats.total_profitable += count
-                    else:
-                        item_profit_stats.sum_unprofitable = round(item_profit_stats.sum_unprofitable + price_dif, 2)
-                        item_profit_stats.total_unprofitable += count
-            else:
-                raise Exception(f"Не найдено gain_or_loss")
-
-            if not app_id_to_game_name.get(asset.AppID):
-                if asset.AppID == "753":
-                    app_id_to_game_name[asset.AppID] = "Steam"
-                else:
-                    app_id_to_game_name[asset.AppID] = game_name
-
-    def _collect_aggregated_market_history(
+    @staticmethod
+    def _plan_history_pages(total_new_count: int, count_per_request: int) -> list[tuple[int, int]]:
+        """
+            Страницы (start, count) в координатах снимка истории на момент начала обработки,
+            от самых старых необработанных записей к самым новым
+        """
+        pages = []
+        start = total_new_count
+        while start > 0:
+            count = min(count_per_request, start)
+            start -= count
+            pages.append((start, count))
+        return pages
+
+    def _fetch_history_page_records(
+            self, session: requests.Session, snapshot_start: int, count: int, start_total_count: int,
+            max_shift_attempts: int = 5
+    ) -> list[HistoryRecord]:
+        """
+            Получить и разобрать страницу истории, заданную в координатах снимка.
+            Новые записи появляются в начале истории и сдвигают старые, поэтому страница запрашивается
+            со сдвигом на количество появившихся записей; если за время запроса сдвиг изменился,
+            страница запрашивается заново
+        """
+        for _ in range(max_shift_attempts):
+            with self._history_shift_lock:
+                shift = self._history_shift
+            start = snapshot_start + shift
+
+            page_content = self._get_history_page_content(session, count, start)
+            total_count = page_content.get("total_count", 0)
+            if total_count - start_total_count == shift:
+                unknown_prefix = f"start={start}_count={count}_total={total_count}"
+                return self.history_parser.parse_page(page_content, unknown_prefix)
+
+            with self._history_shift_lock:
+                self._history_shift = total_count - start_total_count
+
+        raise RuntimeError("Не удалось получить страницу market history: история постоянно изменяется")
+
+    def _collect_market_history(
             self, session: requests.Session,
-            aggregated_data: dict,
-            app_id_to_game_name: dict,
-            monthly_aggregated_data: dict,
-            profit_aggregated_data: dict,
-            full_dates: list[date],
-            date_cursor: int,
+            ledger: MarketHistoryLedger,
+            date_index: DateIndex,
+            date_cursor: date,
             processed_count: int = 0,
-            count_per_request: int = 500
+            count_per_request: int = 500,
+            download_workers: int = Config.HISTORY_DOWNLOAD_WORKERS,
+            checkpoint_file_path: str | None = None,
+            base_processed_count: int | None = None,
+            checkpoint_every: int = Config.HISTORY_CHECKPOINT_PAGES
     ) -> int:
+        """
+        Записать новые записи истории в журнал.
+        Страницы загружаются наперёд в download_workers потоках (в пределах лимита запросов к истории),
+        но записываются строго от старых записей к новым: от этого порядка зависят курсор дат
+        и порядок записей в журнале (по нему идёт очередь покупок в profit-сводке).
+
+        Если задан checkpoint_file_path, каждые checkpoint_every страниц (а также при ошибке получения страницы)
+        количество обработанных записей и курсор дат сохраняются в контрольную точку,
+        с которой можно продолжить при следующем запуске; сами записи к этому моменту уже в журнале.
+
+        :param base_processed_count: processed_count сохранённых json
+            (отличается от processed_count, если обработка продолжается с контрольной точки)
+        :return: Количество записей истории на момент начала обработки
+        """
         page_content = self._get_history_page_content(session, 1, 0)
         total_count = page_content.get("total_count", 0)
         start_total_count = total_count
@@ -359,42 +232,55 @@ class Account(BasicLogger):
             print("Нет новых записей для обработки")
             return start_total_count
 
-        start = total_new_count
+        self._history_shift = 0
+        pages = OrderedPrefetcher(
+            lambda page: self._fetch_history_page_records(session, page[0], page[1], start_total_count),
+            self._plan_history_pages(total_new_count, count_per_request),
+            max_workers=download_workers
+        )
+        if base_processed_count is None:
+            base_processed_count = processed_count
+
+        def save_checkpoint() -> None:
+            if checkpoint_file_path:
+                self._save_history_checkpoint(
+                    checkpoint_file_path, base_processed_count, processed_count, date_index, date_cursor)
+
         with tqdm(
                 total=total_new_count, unit="order", ncols=Config.TQDM_CONSOLE_WIDTH, desc="Processing market history"
         ) as pbar:
+            pages_iterator = iter(pages)
+            page_number = 0
             while True:
-                new_count = min(count_per_request, start + start_total_count - total_count)
-                if new_count <= 0:
+                try:
+                    (_, count), records = next(pages_iterator)
+                except StopIteration:
                     break
-                start = max(start - new_count, 0)
-
-                page_content = self._get_history_page_content(session, new_count, start)
-                total_count_now = page_content.get("total_count", 0)
-                total_count_difference = total_count_now - total_count
-                if total_count_difference:
-                    total_count = total_count_now
-                    start += total_count_difference
-                    page_content = self._get_history_page_content(session, new_count, start)
-
-                unknown_prefix = f"start={start}_count={new_count}_total={total_count}"
-                self._aggregate_data(
-                    page_content, aggregated_data, app_id_to_game_name, unknown_prefix
-                )
-                date_cursor = self._aggregate_monthly_data(
-                    page_content, monthly_aggregated_data, app_id_to_game_name, full_dates, date_cursor
-                )
-                self._aggregate_profit_data(
-                    page_content, profit_aggregated_data, app_id_to_game_name, unknown_prefix
-                )
+                except Exception:
+                    # Все предыдущие страницы уже в журнале: следующий запуск продолжит с этой страницы
+                    save_checkpoint()
+                    raise
+
+                record_dates, date_cursor = self._resolve_record_dates(records, date_index, date_cursor)
+                ledger.add_records(records, record_dates)
+
+                processed_count += count
+                page_number += 1
+                if page_number % checkpoint_every == 0:
+                    save_checkpoint()
 
-                pbar.update(new_count)
+                pbar.update(count)
 
         return start_total_count
 
     @staticmethod
-    def _load_summarize_market_history(file_path: str) -> (int, dict, dict):
+    def _load_summarize_market_history(file_path: str) -> (int, dict, dict, int | None):
+        """
+        :return: processed_count, сводка, названия игр и seq последней учтённой записи журнала
+            (None для json, сохранённого без журнала)
+        """
         processed_count = 0
+        ledger_seq = None
         aggregated_data = defaultdict(lambda: defaultdict(MarketItemStats))
         app_id_to_game_name = {}
 
@@ -403,6 +289,7 @@ class Account(BasicLogger):
 
         if saved:
             processed_count = saved.get("processed_count", 0)
+            ledger_seq = saved.get("ledger_seq")
             old_data = saved.get("aggregated_data", {})
             app_id_to_game_name = saved.get("app_id_to_game_name", {})
 
@@ -415,17 +302,19 @@ class Account(BasicLogger):
                     item_stats.sum_bought = stats.get("sum_bought", 0.0)
                     item_stats.sum_sold = stats.get("sum_sold", 0.0)
 
-        return processed_count, aggregated_data, app_id_to_game_name
+        return processed_count, aggregated_data, app_id_to_game_name, ledger_seq
 
     @staticmethod
-    def _load_profit_summarize_market_history(file_path: str) -> (dict, dict):
+    def _load_profit_summarize_market_history(file_path: str) -> (dict, dict, int | None):
         aggregated_data = defaultdict(lambda: defaultdict(MarketItemProfitStats))
         app_id_to_game_name = {}
+        ledger_seq = None
 
         file_store = FileStore.from_type(FileStoreType.JSON)
         saved = file_store.load(file_path, default=None)
 
         if saved:
+            ledger_seq = saved.get("ledger_seq")
             old_data = saved.get("aggregated_data", {})
             app_id_to_game_name = saved.get("app_id_to_game_name", {})
 
@@ -437,19 +326,21 @@ class Account(BasicLogger):
                     item_stats.total_unprofitable = stats.get("total_unprofitable", 0)
                     item_stats.sum_profitable = stats.get("sum_profitable", 0.0)
                     item_stats.sum_unprofitable = stats.get("sum_unprofitable", 0.0)
-                    item_stats.bought_queue = stats.get("bought_queue", [])
+                    item_stats.bought_queue = FifoLotQueue(stats.get("bought_queue", []))
 
-        return aggregated_data, app_id_to_game_name
+        return aggregated_data, app_id_to_game_name, ledger_seq
 
     @staticmethod
-    def _load_monthly_summarize_market_history(file_path: str) -> (dict, dict):
+    def _load_monthly_summarize_market_history(file_path: str) -> (dict, dict, int | None):
         aggregated_data = defaultdict(lambda: defaultdict(MarketMonthStats))
         app_id_to_game_name = {}
+        ledger_seq = None
 
         file_store = FileStore.from_type(FileStoreType.JSON)
         saved = file_store.load(file_path, default=None)
 
         if saved:
+            ledger_seq = saved.get("ledger_seq")
             old_data = saved.get("aggregated_data", {})
             app_id_to_game_name = saved.get("app_id_to_game_name", {})
 
@@ -461,14 +352,15 @@ class Account(BasicLogger):
                     month_stats.sum_bought = stats.get("sum_bought", 0.0)
                     month_stats.sum_sold = stats.get("sum_sold", 0.0)
 
-        return aggregated_data, app_id_to_game_name
+        return aggregated_data, app_id_to_game_name, ledger_seq
 
     @staticmethod
     def _save_summarize_market_history(
             file_path: str,
             aggregated_data: dict,
             app_id_to_game_name: dict,
-            processed_count: int
+            processed_count: int,
+            ledger_seq: int
     ) -> None:
         serializable_data = {}
         for game_name, items in aggregated_data.items():
@@ -486,6 +378,7 @@ class Account(BasicLogger):
 
         save_object = {
             "processed_count": processed_count,
+            "ledger_seq": ledger_seq,
             "app_id_to_game_name": app_id_to_game_name,
             "aggregated_data": serializable_data
         }
@@ -498,7 +391,8 @@ class Account(BasicLogger):
     def _save_monthly_summarize_market_history(
             file_path: str,
             aggregated_data: dict,
-            app_id_to_game_name: dict
+            app_id_to_game_name: dict,
+            ledger_seq: int
     ) -> None:
         serializable_data = {}
         for game_name, items in aggregated_data.items():
@@ -514,6 +408,7 @@ class Account(BasicLogger):
                 }
 
         save_object = {
+            "ledger_seq": ledger_seq,
             "app_id_to_game_name": app_id_to_game_name,
             "aggregated_data": serializable_data
         }
@@ -526,7 +421,8 @@ class Account(BasicLogger):
     def _save_profit_summarize_market_history(
             file_path: str,
             aggregated_data: dict,
-            app_id_to_game_name: dict
+            app_id_to_game_name: dict,
+            ledger_seq: int
     ) -> None:
         serializable_data = {}
         for game_name, items in aggregated_data.items():
@@ -540,10 +436,11 @@ class Account(BasicLogger):
                     "sum_unprofitable": stats.sum_unprofitable,
                     "quantity_difference": stats.quantity_difference,
                     "sum_difference": stats.sum_difference,
-                    "bought_queue": stats.bought_queue
+                    "bought_queue": stats.bought_queue.to_list()
                 }
 
         save_object = {
+            "ledger_seq": ledger_seq,
             "app_id_to_game_name": app_id_to_game_name,
             "aggregated_data": serializable_data
         }
@@ -552,6 +449,59 @@ class Account(BasicLogger):
         file_store.save(file_path, save_object)
         print(f"Json сохранён: {file_path}")
 
+    @staticmethod
+    def _save_history_checkpoint(
+            file_path: str,
+            base_processed_count: int,
+            processed_count: int,
+            date_index: DateIndex,
+            date_cursor: date
+    ) -> None:
+        """
+            Сводки в контрольную точку не входят: загруженные записи уже в журнале,
+            и сводки дополняются по нему после загрузки
+        """
+        checkpoint = {
+            "base_processed_count": base_processed_count,
+            "processed_count": processed_count,
+            "dates": list(date_index),
+            "date_cursor": date_cursor
+        }
+        FileStore.from_type(FileStoreType.PICKLE).save(file_path, checkpoint)
+
+    @staticmethod
+    def _load_history_checkpoint(file_path: str, base_processed_count: int) -> dict | None:
+        """
+            Контрольная точка подходит, только если построена поверх тех же сохранённых json
+        """
+        checkpoint = FileStore.from_type(FileStoreType.PICKLE).load(file_path, default=None)
+        if not checkpoint or checkpoint.get("base_processed_count") != base_processed_count:
+            return None
+        return checkpoint
+
+    @staticmethod
+    def _resume_history_dates(date_index: DateIndex, checkpoint: dict) -> date:
+        """
+            Добавить в индекс даты контрольной точки (в том числе созданные при агрегации)
+        :return: Курсор дат контрольной точки
+        """
+        if "dates" in checkpoint:
+            date_index.update(checkpoint["dates"])
+            return checkpoint["date_cursor"]
+
+        # Контрольная точка прежнего формата: список дат от новых к старым и индекс курсора в нём
+        date_index.update(checkpoint["full_dates"])
+        return checkpoint["full_dates"][checkpoint["date_cursor"]]
+
+    @staticmethod
+    def _initial_date_cursor(date_index: DateIndex, new_dates_count: int) -> date:
+        """
+            Новые записи истории начинаются не раньше самой старой из новых дат кошелька
+        """
+        if new_dates_count > 0:
+            return date_index.newest_dates(new_dates_count)[-1]
+        return date_index.newest() or date.today()
+
     def summarize_market_history(
             self, session: requests.Session,
             json_file_path: str = "data/market_history/json/summarize.json",
@@ -560,91 +510,280 @@ class Account(BasicLogger):
             monthly_excel_file_path: str = "data/market_history/excel/monthly_summarize.xlsx",
             profit_json_file_path: str = "data/market_history/json/profit_summarize.json",
             profit_excel_file_path: str = "data/market_history/excel/profit_summarize.xlsx",
+            checkpoint_file_path: str = "data/market_history/checkpoint.pickle",
+            ledger_file_path: str = "data/market_history/ledger.sqlite3",
+            columnar_dir_path: str = "data/market_history/columnar",
+            render_excel: bool = True
     ) -> None:
-        full_dates, date_cursor = self._collect_history_dates(session)
-        if date_cursor > 0:
-            date_cursor -= 1
-        processed_count, aggregated_data, app_id_to_game_name = self._load_summarize_market_history(json_file_path)
-        monthly_aggregated_data, _ = self._load_monthly_summarize_market_history(monthly_json_file_path)
-        profit_aggregated_data, _ = self._load_profit_summarize_market_history(profit_json_file_path)
+        """
+            Новые записи истории записываются в журнал, после чего каждая сводка дополняется
+            только записями журнала после своего ledger_seq
+        :param render_excel: Строить Excel по json; колоночные файлы выгружаются всегда
+        """
+        date_index, new_dates_count = self._collect_history_dates(session)
+        date_cursor = self._initial_date_cursor(date_index, new_dates_count)
+        processed_count, aggregated_data, app_id_to_game_name, ledger_seq = \
+            self._load_summarize_market_history(json_file_path)
+        monthly_aggregated_data, _, monthly_ledger_seq = \
+            self._load_monthly_summarize_market_history(monthly_json_file_path)
+        profit_aggregated_data, _, profit_ledger_seq = \
+            self._load_profit_summarize_market_history(profit_json_file_path)
+
+        saved_processed_count = processed_count
+        if checkpoint := self._load_history_checkpoint(checkpoint_file_path, saved_processed_count):
+            processed_count = checkpoint["processed_count"]
+            date_cursor = self._resume_history_dates(date_index, checkpoint)
+            print(f"Продолжение с контрольной точки: обработано записей {processed_count}")
 
         try:
-            new_processed_count = self._collect_aggregated_market_history(
-                session, aggregated_data, app_id_to_game_name, monthly_aggregated_data, profit_aggregated_data,
-                full_dates, date_cursor, processed_count
-            )
+            with MarketHistoryLedger(ledger_file_path) as ledger:
+                # json, сохранённые до появления ledger_seq, учитывают весь журнал,
+                # кроме записей, загруженных после них (до контрольной точки)
+                legacy_ledger_seq = ledger.max_seq(skip_newest=processed_count - saved_processed_count)
+                ledger_seq = legacy_ledger_seq if ledger_seq is None else ledger_seq
+                monthly_ledger_seq = legacy_ledger_seq if monthly_ledger_seq is None else monthly_ledger_seq
+                profit_ledger_seq = legacy_ledger_seq if profit_ledger_seq is None else profit_ledger_seq
+
+                new_processed_count = self._collect_market_history(
+                    session, ledger, date_index, date_cursor, processed_count,
+                    checkpoint_file_path=checkpoint_file_path, base_processed_count=saved_processed_count
+                )
+
+                new_ledger_seq = ledger.max_seq()
+                if new_processed_count == saved_processed_count and \
+                        new_ledger_seq == ledger_seq == monthly_ledger_seq == profit_ledger_seq:
+                    has_changes = False
+                else:
+                    has_changes = True
+                    self._merge_game_names(ledger, app_id_to_game_name)
+                    self._aggregate_item_summary(ledger, aggregated_data, ledger_seq)
+                    self._aggregate_monthly_summary(ledger, monthly_aggregated_data, monthly_ledger_seq)
+                    self._aggregate_profit_summary(ledger, profit_aggregated_data, profit_ledger_seq)
         except RuntimeError as e:
             print("Ошибка:", e)
             return
 
-        if new_processed_count - processed_count > 0:
-            self._save_summarize_market_history(
-                json_file_path, aggregated_data, app_id_to_game_name, new_processed_count)
+        if has_changes:
+            # Каждый json хранит свой ledger_seq, поэтому сбой между записями файлов не приведёт к двойному учёту;
+            # processed_count записывается последним, после чего контрольная точка больше не подходит
             self._save_monthly_summarize_market_history(
-                monthly_json_file_path, monthly_aggregated_data, app_id_to_game_name)
+                monthly_json_file_path, monthly_aggregated_data, app_id_to_game_name, new_ledger_seq)
             self._save_profit_summarize_market_history(
-                profit_json_file_path, profit_aggregated_data, app_id_to_game_name)
-        try:
-            self.excel_maker.summarize_json_to_excel(json_file_path, excel_file_path)
-            self.excel_maker.monthly_summarize_json_to_excel(monthly_json_file_path, monthly_excel_file_path)
-            self.excel_maker.profit_summarize_json_to_excel(profit_json_file_path, profit_excel_file_path)
-        except Exception as e:
-            print("Ошибка:", e)
-    # endregion
+                profit_json_file_path, profit_aggregated_data, app_id_to_game_name, new_ledger_seq)
+            self._save_summarize_market_history(
+                json_file_path, aggregated_data, app_id_to_game_name, new_processed_count, new_ledger_seq)
+        Path(checkpoint_file_path).unlink(missing_ok=True)
+        self.columnar_maker.export(
+            columnar_dir_path, aggregated_data, monthly_aggregated_data, profit_aggregated_data, app_id_to_game_name)
+        if render_excel:
+            self._export_market_history_excel(
+                json_file_path, excel_file_path,
+                monthly_json_file_path, monthly_excel_file_path,
+                profit_json_file_path, profit_excel_file_path
+            )
+
+    def _export_market_history_excel(
+            self,
+            json_file_path: str, excel_file_path: str,
+            monthly_json_file_path: str, monthly_excel_file_path: str,
+            profit_json_file_path: str, profit_excel_file_path: str
+    ) -> None:
+        self.excel_maker.summarize_all_to_excel(
+            json_file_path, excel_file_path,
+            monthly_json_file_path, monthly_excel_file_path,
+            profit_json_file_path, profit_excel_file_path,
+            workers=Config.REPORT_WORKERS
+        )
+
+    @staticmethod
+    def _merge_game_names(ledger: MarketHistoryLedger, app_id_to_game_name: dict) -> None:
+        """
+            Добавить названия игр, впервые встретившихся в журнале
+        """
+        for app_id, game_name in ledger.game_names().items():
+            app_id_to_game_name.setdefault(app_id, game_name)
+
+    @staticmethod
+    def _aggregate_item_summary(ledger: MarketHistoryLedger, aggregated_data: dict, after_seq: int) -> None:
+        """
+            Дополнить сводку по предметам записями журнала с seq больше after_seq
+        """
+        for row in ledger.item_summary(after_seq):
+            item_stats: MarketItemStats = aggregated_data[row["app_id"]][row["item_hash_name"]]
+            item_stats.item_name = row["item_name"]
+            item_stats.total_bought += row["total_bought"]
+            item_stats.total_sold += row["total_sold"]
+            item_stats.sum_bought = round(item_stats.sum_bought + row["sum_bought"], 2)
+            item_stats.sum_sold = round(item_stats.sum_sold + row["sum_sold"], 2)
+
+    @staticmethod
+    def _aggregate_monthly_summary(ledger: MarketHistoryLedger, aggregated_data: dict, after_seq: int) -> None:
+        """
+            Дополнить помесячную сводку записями журнала с seq больше after_seq
+        """
+        for row in ledger.monthly_summary(after_seq):
+            month_stats: MarketMonthStats = aggregated_data[row["app_id"]][row["period"]]
+            month_stats.total_bought += row["total_bought"]
+            month_stats.total_sold += row["total_sold"]
+            month_stats.sum_bought = round(month_stats.sum_bought + row["sum_bought"], 2)
+            month_stats.sum_sold = round(month_stats.sum_sold + row["sum_sold"], 2)
+
+    def _aggregate_profit_summary(
+            self, ledger: MarketHistoryLedger, aggregated_data: dict, after_seq: int, batch_size: int = 1000
+    ) -> None:
+        """
+            Дополнить сводку прибыли записями журнала с seq больше after_seq.
+            Прибыль зависит от порядка покупок и продаж, поэтому считается проходом по записям
+        """
+        batch = []
+        for record, _ in ledger.iter_records(after_seq=after_seq):
+            batch.append(record)
+            if len(batch) >= batch_size:
+                self._aggregate_profit_data(batch, aggregated_data)
+                batch = []
+        self._aggregate_profit_data(batch, aggregated_data)
+
+    def _aggregate_ledger(self, ledger: MarketHistoryLedger, batch_size: int = 1000) -> (dict, dict, dict, dict):
+        """
+            Сводки по всем записям журнала
+        :return: Сводка по предметам, помесячная сводка, сводка прибыли и названия игр по app_id
+        """
+        app_id_to_game_name = {}
+        aggregated_data = defaultdict(lambda: defaultdict(MarketItemStats))
+        monthly_aggregated_data = defaultdict(lambda: defaultdict(MarketMonthStats))
+        profit_aggregated_data = defaultdict(lambda: defaultdict(MarketItemProfitStats))
+
+        self._merge_game_names(ledger, app_id_to_game_name)
+        self._aggregate_item_summary(ledger, aggregated_data, 0)
+        self._aggregate_monthly_summary(ledger, monthly_aggregated_data, 0)
+        self._aggregate_profit_summary(ledger, profit_aggregated_data, 0, batch_size)
+
+        return aggregated_data, monthly_aggregated_data, profit_aggregated_data, app_id_to_game_name
+
+    def rebuild_market_history_from_ledger(
+            self,
+            json_file_path: str = "data/market_history/json/summarize.json",
+            excel_file_path: str = "data/market_history/excel/summarize.xlsx",
+            monthly_json_file_path: str = "data/market_history/json/monthly_summarize.json",
+            monthly_excel_file_path: str = "data/market_history/excel/monthly_summarize.xlsx",
+            profit_json_file_path: str = "data/market_history/json/profit_summarize.json",
+            profit_excel_file_path: str = "data/market_history/excel/profit_summarize.xlsx",
+            ledger_file_path: str = "data/market_history/ledger.sqlite3",
+            columnar_dir_path: str = "data/market_history/columnar",
+            render_excel: bool = True,
+            batch_size: int = 1000
+    ) -> bool:
+        """
+            Пересобрать json и Excel сводок по локальному журналу, без запросов к Steam
+            (например, после изменения правил агрегации)
+        """
+        processed_count, _, _, _ = self._load_summarize_market_history(json_file_path)
+
+        with MarketHistoryLedger(ledger_file_path) as ledger:
+            ledger_count = len(ledger)
+            if ledger_count < processed_count:
+                print(f"В журнале {ledger_count} записей из {processed_count} обработанных, "
+                      f"пересборка потеряет данные. Для заполнения журнала удалите {json_file_path} "
+                      f"и соберите историю заново")
+                return False
+
+            aggregated_data, monthly_aggregated_data, profit_aggregated_data, app_id_to_game_name = \
+                self._aggregate_ledger(ledger, batch_size)
+            ledger_seq = ledger.max_seq()
+
+        self._save_monthly_summarize_market_history(
+            monthly_json_file_path, monthly_aggregated_data, app_id_to_game_name, ledger_seq)
+        self._save_profit_summarize_market_history(
+            profit_json_file_path, profit_aggregated_data, app_id_to_game_name, ledger_seq)
+        self._save_summarize_market_history(
+            json_file_path, aggregated_data, app_id_to_game_name, processed_count or ledger_count, ledger_seq)
+        self.columnar_maker.export(
+            columnar_dir_path, aggregated_data, monthly_aggregated_data, profit_aggregated_data, app_id_to_game_name)
+        if render_excel:
+            self._export_market_history_excel(
+                json_file_path, excel_file_path,
+                monthly_json_file_path, monthly_excel_file_path,
+                profit_json_file_path, profit_excel_file_path
+            )
+        return True
 
-    # region dates
     @staticmethod
-    def _parse_partial_date(partial: str) -> date:
-        day, month_str = partial.split()
-        month = datetime.strptime(month_str, "%b").month
-        return date(1904, month, int(day))
+    def get_ledger_period_summary(
+            weekly: bool = False, ledger_file_path: str = "data/market_history/ledger.sqlite3"
+    ) -> (dict[str, str], list):
+        """
+            Сводка журнала по месяцам или неделям
+        :return: Названия игр по app_id и строки сводки
+        """
+        with MarketHistoryLedger(ledger_file_path) as ledger:
+            rows = ledger.weekly_summary() if weekly else ledger.monthly_summary()
+            return ledger.game_names(), rows
+    # endregion
 
+    # region dates
     @staticmethod
     def _month_key(d: date) -> str:
         return d.strftime("%Y.%m")
 
-    def _get_actual_month_year(self, full_dates: list[date], date_cursor: int, history_date: date) -> (date, int):
-        picked_date = full_dates[date_cursor]
-        if history_date.month == picked_date.month and history_date.day == picked_date.day:
-            return self._month_key(picked_date), date_cursor
-
-        date_cursor -= 1
-        next_picked_date = full_dates[date_cursor]
-        if history_date.month != next_picked_date.month or history_date.day != next_picked_date.day:
-            date_cursor += 1
-            next_picked_date = date(picked_date.year, history_date.month, history_date.day)
-            full_dates.insert(date_cursor, next_picked_date)
-            # print(f"\nДобавлена дата {next_picked_date}")
-            # raise RuntimeError(f"Не совпали даты: {history_date} != {picked_date}")
-        return self._month_key(next_picked_date), date_cursor
-
-    def _collect_history_dates(self, session: requests.Session) -> (list[date], int):
-        all_dates = self._load_dates_from_file()
-        if all_dates is None:
+    def _collect_history_dates(self, session: requests.Session) -> (DateIndex, int):
+        """
+            Индекс дат транзакций кошелька и количество новых дат.
+            Даты запрашиваются напрямую по HTTP, браузер используется, только если это не удалось
+        """
+        date_index = self._load_dates_from_file()
+        try:
+            date_index, new_dates_count = self._collect_wallet_dates(session, date_index)
+        except RuntimeError as e:
+            print(f"Не удалось получить историю кошелька без браузера ({e}), используется браузер")
+            return self._collect_history_dates_with_browser(session, date_index)
+
+        self._save_dates_to_file(date_index)
+        return date_index, new_dates_count
+
+    def _collect_wallet_dates(self, session: requests.Session, date_index: DateIndex | None) -> (DateIndex, int):
+        """
+            Новые даты берутся, пока не встретится уже известная; более старые порции истории не запрашиваются
+        """
+        if date_index is None:
+            print("Сбор дат всех транзакций")
+            date_index = DateIndex()
+
+        new_dates = []
+        for wallet_date in self.wallet_history_client.iter_wallet_dates(session):
+            if wallet_date in date_index:
+                break
+            if new_dates and new_dates[-1] == wallet_date:
+                continue
+            new_dates.append(wallet_date)
+
+        return date_index, date_index.update(new_dates)
+
+    def _collect_history_dates_with_browser(
+            self, session: requests.Session, date_index: DateIndex | None) -> (DateIndex, int):
+        if date_index is None:
             return self._get_full_wallet_history(session)
 
         response = api_request(
             session,
             "GET",
-            "https://store.steampowered.com/account/history/",
+            Urls.ACCOUNT_HISTORY,
             headers={
-                "Host": "store.steampowered.com",
                 "Referer": Urls.ACCOUNT
             },
             logger=self.logger
         )
 
-        if not self._is_able_to_continue_dates(all_dates, response.text):
-            return self._get_full_wallet_history(session, all_dates)
+        if not self._is_able_to_continue_dates(date_index, response.text):
+            return self._get_full_wallet_history(session, date_index)
 
-        all_dates, new_dates_count = self._parse_dates(response.text, all_dates)
+        date_index, new_dates_count = self._parse_dates(response.text, date_index)
 
-        self._save_dates_to_file(all_dates)
+        self._save_dates_to_file(date_index)
 
-        return all_dates, new_dates_count
+        return date_index, new_dates_count
 
-    def _is_able_to_continue_dates(self, all_dates: list[date], response_html: str) -> bool:
-        last_date = all_dates[0]
+    def _is_able_to_continue_dates(self, date_index: DateIndex, response_html: str) -> bool:
+        last_date = date_index.newest()
 
         soup = BeautifulSoup(response_html, "html.parser")
         rows = soup.select("tr.wallet_table_row")
@@ -660,20 +799,16 @@ class Account(BasicLogger):
             if not ("TransactionWallet" in type_ or "TransactionsWallet" in type_):
                 continue
 
-            parsed_date = self._parse_steam_date(date_str)
+            parsed_date = parse_steam_date(date_str)
             if parsed_date == last_date:
                 return True
 
         return False
 
-    @staticmethod
-    def _parse_steam_date(date_str: str) -> date:
-        return datetime.strptime(date_str, "%d %b, %Y").date()
-
-    def _parse_dates(self, response_html: str, dates: list = None) -> (list[date], int):
-        if not dates:
-            dates = []
-        new_dates = []
+    def _parse_dates(self, response_html: str, date_index: DateIndex = None) -> (DateIndex, int):
+        if date_index is None:
+            date_index = DateIndex()
+        new_dates = set()
 
         soup = BeautifulSoup(response_html, "html.parser")
         rows = soup.select("tr.wallet_table_row")
@@ -689,32 +824,27 @@ class Account(BasicLogger):
             if not ("TransactionWallet" in type_ or "TransactionsWallet" in type_):
                 continue
 
-            if (parsed_date := self._parse_steam_date(date_str)) not in dates:
-                if parsed_date in new_dates:
-                    continue
-                new_dates.append(parsed_date)
-            else:
+            if (parsed_date := parse_steam_date(date_str)) in date_index:
                 break
+            new_dates.add(parsed_date)
 
-        new_dates_count = len(new_dates)
-        new_dates.extend(dates)
-        return new_dates, new_dates_count
+        return date_index, date_index.update(new_dates)
 
-    def _save_dates_to_file(self, dates: list[date]) -> None:
+    def _save_dates_to_file(self, date_index: DateIndex) -> None:
         file_store = FileStore.from_type(FileStoreType.JSON)
-        file_store.save(self.dates_file_path, [d.isoformat() for d in dates])
+        file_store.save(self.dates_file_path, date_index.to_json())
 
-    def _load_dates_from_file(self) -> list[date] | None:
+    def _load_dates_from_file(self) -> DateIndex | None:
         try:
             with open(self.dates_file_path, "r", encoding="utf-8") as f:
-                return [date.fromisoformat(d) for d in json.load(f)]
+                return DateIndex.from_json(json.load(f))
         except FileNotFoundError:
             return None
 
     @staticmethod
     def _load_cookies_into_selenium(driver: webdriver.Chrome, session: requests.Session):
-        domain = "store.steampowered.com"
-        driver.get(f"https://{domain}")
+        domain = urlparse(Urls.STORE).hostname
+        driver.get(Urls.STORE)
         for cookie in session.cookies:
             if cookie.domain == domain:
                 cookie_dict = {
@@ -733,8 +863,9 @@ class Account(BasicLogger):
 
         driver.refresh()
 
-    def _get_full_wallet_history(self, session: requests.Session, all_dates: list[date] = None) -> (list[date], int):
-        if all_dates is None:
+    def _get_full_wallet_history(
+            self, session: requests.Session, date_index: DateIndex = None) -> (DateIndex, int):
+        if date_index is None:
             print("Сбор дат всех транзакций, может потребоваться много времени")
         options = Options()
         options.add_argument("--headless=new")
@@ -760,7 +891,7 @@ class Account(BasicLogger):
         with webdriver.Chrome(service=service, options=options) as driver:
             self._load_cookies_into_selenium(driver, session)
 
-            driver.get("https://store.steampowered.com/account/history/")
+            driver.get(Urls.ACCOUNT_HISTORY)
 
             while True:
                 WebDriverWait(driver, 10).until(
@@ -775,15 +906,15 @@ class Account(BasicLogger):
                         WebDriverWait(driver, 30).until(
                             expected_conditions.visibility_of_element_located((By.ID, "load_more_button"))
                         )
-                        if all_dates is not None:
-                            if self._is_able_to_continue_dates(all_dates, driver.page_source):
+                        if date_index is not None:
+                            if self._is_able_to_continue_dates(date_index, driver.page_source):
                                 break
                 except:
                     break
 
-            all_dates, new_dates_count = self._parse_dates(driver.page_source, all_dates)
+            date_index, new_dates_count = self._parse_dates(driver.page_source, date_index)
 
-        self._save_dates_to_file(all_dates)
+        self._save_dates_to_file(date_index)
 
-        return all_dates, new_dates_count
+        return date_index, new_dates_count
     # endregion
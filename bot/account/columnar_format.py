@@ -0,0 +1,10 @@
+from enum import Enum
+
+
+class ColumnarFormat(Enum):
+    FEATHER = "feather"
+    PARQUET = "parquet"
+
+    @property
+    def suffix(self) -> str:
+        return ".feather" if self is ColumnarFormat.FEATHER else ".parquet"
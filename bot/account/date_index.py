@@ -0,0 +1,138 @@
+from bisect import bisect_right, insort
+from datetime import date
+from typing import Iterable, Iterator
+
+
+class DateIndex:
+    """
+        Отсортированный набор дат транзакций кошелька, по которому восстанавливается год записей market history
+        (в истории торговой площадки указаны только день и месяц).
+        Проверка наличия даты - по множеству, поиск соседней даты - двоичным поиском.
+
+        Сохраняется компактно: порядковый номер самой старой даты и разности между соседними датами в днях.
+        Прежний формат (список дат ISO от новых к старым) тоже читается.
+    """
+    FORMAT_VERSION: int = 2
+
+    __slots__ = ("_dates", "_dates_set")
+
+    def __init__(self, dates: Iterable[date] = ()) -> None:
+        self._dates_set: set[date] = set(dates)
+        self._dates: list[date] = sorted(self._dates_set)
+
+    def __len__(self) -> int:
+        return len(self._dates)
+
+    def __contains__(self, d: date) -> bool:
+        return d in self._dates_set
+
+    def __iter__(self) -> Iterator[date]:
+        """
+            Даты от старых к новым
+        """
+        return iter(self._dates)
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, DateIndex) and self._dates == other._dates
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({len(self)} dates)"
+
+    def add(self, d: date) -> bool:
+        """
+        :return: Была ли дата добавлена (False, если она уже есть)
+        """
+        if d in self._dates_set:
+            return False
+        self._dates_set.add(d)
+        insort(self._dates, d)
+        return True
+
+    def update(self, dates: Iterable[date]) -> int:
+        """
+        :return: Количество добавленных дат
+        """
+        new_dates = set(dates) - self._dates_set
+        if new_dates:
+            self._dates_set |= new_dates
+            self._dates = sorted(self._dates_set)
+        return len(new_dates)
+
+    def newest(self) -> date | None:
+        return self._dates[-1] if self._dates else None
+
+    def newer_than(self, d: date) -> date | None:
+        """
+            Ближайшая дата, более новая, чем d
+        """
+        idx = bisect_right(self._dates, d)
+        return self._dates[idx] if idx < len(self._dates) else None
+
+    def newest_dates(self, count: int) -> list[date]:
+        """
+            count самых новых дат, от новых к старым
+        """
+        if count <= 0:
+            return []
+        return self._dates[:-count - 1:-1]
+
+    @staticmethod
+    def _same_day(a: date, b: date) -> bool:
+        return a.month == b.month and a.day == b.day
+
+    def align(self, cursor: date, history_date: date) -> date:
+        """
+            Полная дата записи истории. Записи обрабатываются от старых к новым, а курсор - полная дата
+            предыдущей записи: запись относится либо к дате курсора, либо к следующей за ней дате кошелька.
+            Если ни одна не совпала по дню и месяцу (транзакции без движения по кошельку),
+            создаётся ближайшая дата с этим днём и месяцем не раньше курсора (после декабрьского курсора
+            январская запись относится к следующему году); она добавляется в индекс
+        :param cursor: Полная дата предыдущей записи
+        :param history_date: Дата записи (значим только день и месяц)
+        :return: Полная дата записи, она же новый курсор
+        """
+        if self._same_day(history_date, cursor):
+            return cursor
+
+        next_date = self.newer_than(cursor)
+        if next_date is not None and self._same_day(history_date, next_date):
+            return next_date
+
+        year = cursor.year
+        if (history_date.month, history_date.day) < (cursor.month, cursor.day):
+            year += 1
+        # 29 февраля есть только в високосном году
+        while True:
+            try:
+                actual_date = date(year, history_date.month, history_date.day)
+                break
+            except ValueError:
+                year += 1
+        self.add(actual_date)
+        return actual_date
+
+    def to_json(self) -> dict:
+        if not self._dates:
+            return {"version": self.FORMAT_VERSION, "start": None, "deltas": []}
+
+        ordinals = [d.toordinal() for d in self._dates]
+        return {
+            "version": self.FORMAT_VERSION,
+            "start": ordinals[0],
+            "deltas": [current - previous for previous, current in zip(ordinals, ordinals[1:])]
+        }
+
+    @classmethod
+    def from_json(cls, saved: dict | list) -> 'DateIndex':
+        # Прежний формат dates.json: список дат ISO от новых к старым
+        if isinstance(saved, list):
+            return cls(date.fromisoformat(d) for d in saved)
+
+        if saved.get("start") is None:
+            return cls()
+        ordinal = saved["start"]
+        ordinals = [ordinal]
+        for delta in saved["deltas"]:
+            ordinal += delta
+            ordinals.append(ordinal)
+        return cls(date.fromordinal(o) for o in ordinals)
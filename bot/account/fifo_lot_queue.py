@@ -0,0 +1,88 @@
+from collections import deque
+from typing import Iterator
+
+
+class FifoLotQueue:
+    """
+        Очередь купленных лотов предмета для расчёта прибыли по FIFO.
+        Лот - (цена всей покупки, количество). Цены хранятся в копейках, чтобы частичное
+        списание лотов не накапливало ошибку округления.
+        Идущие подряд лоты с одинаковой ценой за штуку объединяются, поэтому очередь
+        часто покупаемого по одной цене предмета остаётся короткой.
+    """
+    __slots__ = ("_lots",)
+
+    def __init__(self, lots: list[tuple[float, int]] | None = None) -> None:
+        """
+        :param lots: Лоты в сериализованном виде [[цена, количество], ...] от старых к новым
+        """
+        self._lots: deque[list[int]] = deque()
+        for price, count in lots or ():
+            self.push(price, count)
+
+    @staticmethod
+    def _to_kopecks(price: float) -> int:
+        return round(price * 100)
+
+    def push(self, price: float, count: int) -> None:
+        """
+            Добавить покупку count штук общей стоимостью price
+        """
+        if count <= 0:
+            return
+        kopecks = self._to_kopecks(price)
+        if self._lots:
+            last_lot = self._lots[-1]
+            if last_lot[0] * count == kopecks * last_lot[1]:
+                last_lot[0] += kopecks
+                last_lot[1] += count
+                return
+        self._lots.append([kopecks, count])
+
+    def consume(self, count: int) -> (float, int):
+        """
+            Списать count штук с самых старых лотов, при необходимости с нескольких
+        :return: Себестоимость списанного и количество списанных штук
+            (меньше count, если купленных лотов не хватило)
+        """
+        cost = 0
+        matched = 0
+        while matched < count and self._lots:
+            lot = self._lots[0]
+            needed = count - matched
+            if lot[1] <= needed:
+                cost += lot[0]
+                matched += lot[1]
+                self._lots.popleft()
+            else:
+                remaining_price = round(lot[0] * (lot[1] - needed) / lot[1])
+                cost += lot[0] - remaining_price
+                matched += needed
+                lot[0] = remaining_price
+                lot[1] -= needed
+        return cost / 100, matched
+
+    def to_list(self) -> list[list[float | int]]:
+        return [[kopecks / 100, count] for kopecks, count in self._lots]
+
+    @property
+    def total_count(self) -> int:
+        return sum(count for _, count in self._lots)
+
+    def __len__(self) -> int:
+        return len(self._lots)
+
+    def __iter__(self) -> Iterator[tuple[float, int]]:
+        return ((kopecks / 100, count) for kopecks, count in self._lots)
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, FifoLotQueue) and self._lots == other._lots
+
+    def __getstate__(self) -> list[list[int]]:
+        return list(self._lots)
+
+    def __setstate__(self, state: list[list[int]]) -> None:
+        self._lots = deque(state)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self.to_list()})"
@@ -0,0 +1,24 @@
+from dataclasses import dataclass
+from datetime import date
+
+
+@dataclass(slots=True)
+class HistoryRecord:
+    """
+        Одна запись market history (покупка или продажа)
+    """
+    row_id: str
+    app_id: str
+    context_id: str
+    item_id: str
+    item_hash_name: str
+    item_name: str
+    game_name: str
+    price: float
+    count: int
+    sign: str  # "+" - покупка, "-" - продажа
+    partial_date: date  # день и месяц записи (год неизвестен, см. MarketHistoryParser.parse_partial_date)
+
+    @property
+    def is_purchase(self) -> bool:
+        return self.sign == "+"
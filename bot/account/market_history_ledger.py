@@ -0,0 +1,184 @@
+import sqlite3
+from pathlib import Path
+from datetime import date
+from typing import Iterator
+
+from bot.account.history_record import HistoryRecord
+
+
+class MarketHistoryLedger:
+    """
+        Локальный журнал всех разобранных записей market history (SQLite).
+        Записи хранятся в порядке обработки (от старых к новым) и не дублируются по ID строки истории,
+        поэтому повторная обработка страниц (например, после продолжения с контрольной точки) безопасна.
+        Сводки по журналу строятся SQL-запросами без обращения к Steam; порядковый номер записи (seq)
+        растёт вместе с журналом, поэтому сводки можно дополнять только записями после уже учтённого seq.
+    """
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS history (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            row_id TEXT NOT NULL UNIQUE,
+            app_id TEXT NOT NULL,
+            context_id TEXT NOT NULL,
+            item_id TEXT NOT NULL,
+            item_hash_name TEXT NOT NULL,
+            item_name TEXT NOT NULL,
+            game_name TEXT NOT NULL,
+            price REAL NOT NULL,
+            count INTEGER NOT NULL,
+            sign TEXT NOT NULL CHECK (sign IN ('+', '-')),
+            partial_date TEXT NOT NULL,
+            full_date TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS history_item ON history (app_id, item_hash_name);
+        CREATE INDEX IF NOT EXISTS history_date ON history (full_date);
+    """
+
+    # Суммы считаются в копейках, чтобы не накапливать ошибку округления
+    _TOTALS = """
+        SUM(CASE WHEN sign = '+' THEN count ELSE 0 END) AS total_bought,
+        SUM(CASE WHEN sign = '-' THEN count ELSE 0 END) AS total_sold,
+        ROUND(SUM(CASE WHEN sign = '+' THEN ROUND(price * 100) ELSE 0 END) / 100.0, 2) AS sum_bought,
+        ROUND(SUM(CASE WHEN sign = '-' THEN ROUND(price * 100) ELSE 0 END) / 100.0, 2) AS sum_sold
+    """
+
+    def __init__(self, db_path: str | Path = "data/market_history/ledger.sqlite3") -> None:
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.connection = sqlite3.connect(self.db_path)
+        self.connection.row_factory = sqlite3.Row
+        self.connection.executescript(self.SCHEMA)
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def __enter__(self) -> 'MarketHistoryLedger':
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self.connection.execute("SELECT COUNT(*) FROM history").fetchone()[0]
+
+    def max_seq(self, skip_newest: int = 0) -> int:
+        """
+            seq самой новой записи (0, если записей нет)
+        :param skip_newest: Не считать столько самых новых записей
+        """
+        row = self.connection.execute(
+            "SELECT seq FROM history ORDER BY seq DESC LIMIT 1 OFFSET ?", (max(skip_newest, 0),)
+        ).fetchone()
+        return row[0] if row else 0
+
+    def add_records(self, records: list[HistoryRecord], record_dates: list[date]) -> int:
+        """
+        :param records: Записи в хронологическом порядке
+        :param record_dates: Полные даты записей (с годом), в том же порядке
+        :return: Количество новых записей
+        """
+        with self.connection:
+            cursor = self.connection.executemany(
+                """
+                INSERT OR IGNORE INTO history (
+                    row_id, app_id, context_id, item_id, item_hash_name, item_name, game_name,
+                    price, count, sign, partial_date, full_date
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                [
+                    (
+                        record.row_id, record.app_id, record.context_id, record.item_id, record.item_hash_name,
+                        record.item_name, record.game_name, record.price, record.count, record.sign,
+                        record.partial_date.isoformat(), record_date.isoformat()
+                    )
+                    for record, record_date in zip(records, record_dates)
+                ]
+            )
+        return cursor.rowcount
+
+    def iter_records(
+            self, app_id: str | None = None, after_seq: int = 0) -> Iterator[tuple[HistoryRecord, date]]:
+        """
+            Записи журнала от старых к новым вместе с их полными датами
+        :param after_seq: Только записи с seq больше этого
+        """
+        query = "SELECT * FROM history WHERE seq > ?"
+        params = (after_seq,)
+        if app_id is not None:
+            query += " AND app_id = ?"
+            params += (app_id,)
+        query += " ORDER BY seq"
+
+        for row in self.connection.execute(query, params):
+            yield HistoryRecord(
+                row_id=row["row_id"],
+                app_id=row["app_id"],
+                context_id=row["context_id"],
+                item_id=row["item_id"],
+                item_hash_name=row["item_hash_name"],
+                item_name=row["item_name"],
+                game_name=row["game_name"],
+                price=row["price"],
+                count=row["count"],
+                sign=row["sign"],
+                partial_date=date.fromisoformat(row["partial_date"])
+            ), date.fromisoformat(row["full_date"])
+
+    def game_names(self) -> dict[str, str]:
+        rows = self.connection.execute(
+            "SELECT app_id, game_name FROM history WHERE seq IN (SELECT MIN(seq) FROM history GROUP BY app_id)"
+        )
+        return {row["app_id"]: "Steam" if row["app_id"] == "753" else row["game_name"] for row in rows}
+
+    def item_summary(self, after_seq: int = 0) -> list[sqlite3.Row]:
+        """
+            Покупки и продажи по предметам (аналог summarize.json); название предмета - из самой новой записи
+        :param after_seq: Только записи с seq больше этого
+        """
+        return self.connection.execute(f"""
+            SELECT app_id, item_hash_name,
+                (SELECT h.item_name FROM history h
+                 WHERE h.app_id = history.app_id AND h.item_hash_name = history.item_hash_name
+                 ORDER BY h.seq DESC LIMIT 1) AS item_name,
+                {self._TOTALS}
+            FROM history
+            WHERE seq > ?
+            GROUP BY app_id, item_hash_name
+            ORDER BY app_id, MIN(seq)
+        """, (after_seq,)).fetchall()
+
+    def period_summary(self, period_format: str, after_seq: int = 0) -> list[sqlite3.Row]:
+        """
+        :param period_format: Формат strftime для группировки по дате записи
+        :param after_seq: Только записи с seq больше этого
+        """
+        return self.connection.execute(f"""
+            SELECT app_id, strftime(?, full_date) AS period, {self._TOTALS}
+            FROM history
+            WHERE seq > ?
+            GROUP BY app_id, period
+            ORDER BY app_id, period
+        """, (period_format, after_seq)).fetchall()
+
+    def monthly_summary(self, after_seq: int = 0) -> list[sqlite3.Row]:
+        """
+            Покупки и продажи по месяцам (аналог monthly_summarize.json, период вида 2024.05)
+        """
+        return self.period_summary("%Y.%m", after_seq)
+
+    def weekly_summary(self, after_seq: int = 0) -> list[sqlite3.Row]:
+        """
+            Покупки и продажи по неделям (период вида 2024-W18, неделя начинается с понедельника)
+        """
+        return self.period_summary("%Y-W%W", after_seq)
+
+    def game_summary(self) -> list[sqlite3.Row]:
+        """
+            Итоги по играм: купленное, проданное и разница между выручкой и затратами
+        """
+        return self.connection.execute(f"""
+            SELECT app_id, {self._TOTALS}
+            FROM history
+            GROUP BY app_id
+            ORDER BY app_id
+        """).fetchall()
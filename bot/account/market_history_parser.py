@@ -0,0 +1,130 @@
+import re
+from datetime import datetime, date
+
+from lxml import html
+from lxml.etree import XPath
+
+from bot.account.item_asset import ItemAsset
+from bot.account.history_record import HistoryRecord
+
+
+def _class_xpath(tag: str, class_name: str) -> XPath:
+    return XPath(f'.//{tag}[contains(concat(" ", normalize-space(@class), " "), " {class_name} ")]')
+
+
+class MarketHistoryParser:
+    """
+        Разбор страницы market history (ответа history/render) в список HistoryRecord.
+        Страница разбирается один раз, после чего записи используются всеми агрегаторами
+    """
+    _HOVER_CALL_RE = re.compile(
+        r"CreateItemHoverFromContainer\(\s*g_rgAssets\s*,\s*"
+        r"(?P<quote1>['\"])(?P<container>.+?)(?P=quote1)\s*,\s*"
+        r"(?P<app_id>\d+)\s*,\s*"
+        r"(?P<quote2>['\"])(?P<context_id>.+?)(?P=quote2)\s*,\s*"
+        r"(?P<quote3>['\"])(?P<item_id>\d+)(?P=quote3)\s*,\s*"
+        r"(?P<rest>\d+)\s*\)",
+        flags=re.IGNORECASE
+    )
+    _HOVER_SUFFIX_RE = re.compile(r"_(name|image|icon|link|price|count)$", flags=re.IGNORECASE)
+
+    _ROWS_XPATH = _class_xpath("div", "market_listing_row")
+    _GAME_XPATH = _class_xpath("span", "market_listing_game_name")
+    _ITEM_XPATH = _class_xpath("span", "market_listing_item_name")
+    _PRICE_XPATH = _class_xpath("span", "market_listing_price")
+    _GAIN_OR_LOSS_XPATH = _class_xpath("div", "market_listing_gainorloss")
+    _DATE_XPATH = _class_xpath("div", "market_listing_listed_date")
+
+    _MONTHS = {datetime(1904, month, 1).strftime("%b"): month for month in range(1, 13)}
+
+    @classmethod
+    def build_hover_map(cls, hovers: str) -> dict[str, ItemAsset]:
+        hover_map: dict[str, ItemAsset] = {}
+
+        for m in cls._HOVER_CALL_RE.finditer(hovers):
+            key = cls._HOVER_SUFFIX_RE.sub("", m.group("container"))
+            if not hover_map.get(key):
+                hover_map[key] = ItemAsset(m.group("app_id"), m.group("context_id"), m.group("item_id"))
+
+        return hover_map
+
+    @staticmethod
+    def get_split_name_count(item_name: str) -> (str, int):
+        parts = item_name.strip().split(maxsplit=1)
+        if parts and parts[0].isdigit():
+            count = int(parts[0])
+            base_name = parts[1].strip() if len(parts) > 1 else ""
+            return base_name, count
+        return item_name, 1
+
+    @classmethod
+    def parse_partial_date(cls, partial: str) -> date:
+        """
+            Дата записи в истории указана без года ("16 Oct"), поэтому год заменяется на 1904 (високосный)
+        """
+        day, month_str = partial.split()
+        month = cls._MONTHS.get(month_str) or datetime.strptime(month_str, "%b").month
+        return date(1904, month, int(day))
+
+    @staticmethod
+    def _first_text(elements: list) -> str | None:
+        if not elements:
+            return None
+        return elements[0].text_content().strip()
+
+    def parse_page(self, page_content: dict, unknown_prefix: str) -> list[HistoryRecord]:
+        """
+        :param page_content: Ответ history/render
+        :param unknown_prefix: Добавляется к имени предметов без market_hash_name, чтобы они не смешивались
+        :return: Записи страницы в хронологическом порядке (от старых к новым)
+        """
+        html_content: str = page_content.get("results_html", "")
+        assets: dict = page_content.get("assets", "")
+        hovers: str = page_content.get("hovers", "")
+
+        if not (html_content and assets and hovers):
+            raise Exception("Не получены элементы страницы истории")
+
+        hover_map = self.build_hover_map(hovers)
+
+        rows = self._ROWS_XPATH(html.fromstring(html_content))
+        if not rows:
+            raise Exception("Не получены элементы market history")
+
+        records = []
+        for row in reversed(rows):
+            game_name = self._first_text(self._GAME_XPATH(row))
+            item_text = self._first_text(self._ITEM_XPATH(row))
+            price_text = self._first_text(self._PRICE_XPATH(row))
+            gain_or_loss = self._first_text(self._GAIN_OR_LOSS_XPATH(row))
+            date_text = self._first_text(self._DATE_XPATH(row))
+            history_row_id = row.get("id")
+
+            if None in (game_name, item_text, price_text, gain_or_loss, date_text):
+                raise Exception("Не все элементы получены")
+            if gain_or_loss not in ("+", "-"):
+                raise Exception(f"Не найдено gain_or_loss")
+
+            asset: ItemAsset = hover_map.get(history_row_id)
+            item: dict = assets[asset.AppID][asset.ContextID][asset.ItemID]
+
+            item_hash_name = item.get("market_hash_name")
+            if not item_hash_name or item_hash_name == "":
+                item_hash_name = f"unknown_{unknown_prefix}_id={asset.ItemID}"
+            _, count = self.get_split_name_count(item_text)
+
+            records.append(HistoryRecord(
+                row_id=history_row_id,
+                app_id=asset.AppID,
+                context_id=asset.ContextID,
+                item_id=asset.ItemID,
+                item_hash_name=item_hash_name,
+                item_name=item.get("market_name") or item_hash_name,
+                game_name=game_name,
+                price=float(price_text.replace(",", ".").split()[0]),
+                count=count,
+                sign=gain_or_loss,
+                partial_date=self.parse_partial_date(date_text)
+            ))
+
+        return records
@@ -1,4 +1,6 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+
+from bot.account.fifo_lot_queue import FifoLotQueue
 
 
 @dataclass
@@ -8,10 +10,7 @@ class MarketItemProfitStats:
     total_unprofitable: int = 0
     sum_profitable: float = 0.0
     sum_unprofitable: float = 0.0
-    bought_queue: list[tuple[float, int]] = None
-
-    def __init__(self):
-        self.bought_queue = []
+    bought_queue: FifoLotQueue = field(default_factory=FifoLotQueue)
 
     @property
     def quantity_difference(self) -> int:
@@ -0,0 +1,159 @@
+import os
+from pathlib import Path
+from datetime import datetime
+
+import pyarrow as pa
+import pyarrow.feather as feather
+import pyarrow.parquet as parquet
+
+from bot.account.columnar_format import ColumnarFormat
+from bot.account.market_item_stats import MarketItemStats
+from bot.account.market_month_stats import MarketMonthStats
+from bot.account.market_item_profit_stats import MarketItemProfitStats
+
+
+class SummarizeToColumnar:
+    """
+        Выгрузка агрегированной истории торговой площадки в колоночные файлы (Feather или Parquet).
+        Таблицы строятся напрямую из агрегатов, без промежуточного json и pandas; все игры лежат
+        в одной таблице с колонками app_id и game_name.
+        Feather записывается без сжатия, поэтому load_table читает его через memory map без копирования.
+    """
+    ITEMS_SCHEMA = pa.schema([
+        ("app_id", pa.string()),
+        ("game_name", pa.string()),
+        ("item_hash_name", pa.string()),
+        ("item_name", pa.string()),
+        ("total_bought", pa.int64()),
+        ("total_sold", pa.int64()),
+        ("sum_bought", pa.float64()),
+        ("sum_sold", pa.float64()),
+        ("quantity_difference", pa.int64()),
+        ("sum_difference", pa.float64()),
+    ])
+
+    MONTHLY_SCHEMA = pa.schema([
+        ("app_id", pa.string()),
+        ("game_name", pa.string()),
+        ("month", pa.date32()),
+        ("total_bought", pa.int64()),
+        ("total_sold", pa.int64()),
+        ("sum_bought", pa.float64()),
+        ("sum_sold", pa.float64()),
+        ("quantity_difference", pa.int64()),
+        ("sum_difference", pa.float64()),
+    ])
+
+    PROFIT_SCHEMA = pa.schema([
+        ("app_id", pa.string()),
+        ("game_name", pa.string()),
+        ("item_hash_name", pa.string()),
+        ("item_name", pa.string()),
+        ("total_profitable", pa.int64()),
+        ("total_unprofitable", pa.int64()),
+        ("sum_profitable", pa.float64()),
+        ("sum_unprofitable", pa.float64()),
+        ("quantity_difference", pa.int64()),
+        ("sum_difference", pa.float64()),
+        ("open_lots_count", pa.int64()),
+    ])
+
+    def __init__(self, columnar_format: ColumnarFormat = ColumnarFormat.FEATHER) -> None:
+        self.columnar_format = columnar_format
+
+    @staticmethod
+    def _table_from_rows(rows: list[tuple], schema: pa.Schema) -> pa.Table:
+        columns = list(zip(*rows)) if rows else [[] for _ in schema]
+        return pa.Table.from_arrays(
+            [pa.array(column, type=field.type) for column, field in zip(columns, schema)],
+            schema=schema
+        )
+
+    def _write_table(self, table: pa.Table, file_path: str | Path) -> Path:
+        """
+            Файл записывается во временный и атомарно заменяет исходный, как в FileStore
+        """
+        path = Path(file_path).with_suffix(self.columnar_format.suffix)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.tmp")
+        try:
+            if self.columnar_format is ColumnarFormat.FEATHER:
+                feather.write_feather(table, tmp_path, compression="uncompressed")
+            else:
+                parquet.write_table(table, tmp_path)
+            os.replace(tmp_path, path)
+        finally:
+            tmp_path.unlink(missing_ok=True)
+        print(f"{self.columnar_format.value.capitalize()} сохранён: {path}")
+        return path
+
+    @staticmethod
+    def load_table(file_path: str | Path) -> pa.Table:
+        """
+            Прочитать выгруженную таблицу (Feather - через memory map, без копирования данных)
+        """
+        path = Path(file_path)
+        if path.suffix == ColumnarFormat.PARQUET.suffix:
+            return parquet.read_table(path, memory_map=True)
+        return feather.read_table(path, memory_map=True)
+
+    def items_table(self, aggregated_data: dict, app_id_to_game_name: dict) -> pa.Table:
+        rows = []
+        for app_id, items in aggregated_data.items():
+            game_name = app_id_to_game_name.get(app_id, app_id)
+            for item_hash_name, stats in items.items():
+                stats: MarketItemStats
+                rows.append((
+                    app_id, game_name, item_hash_name, stats.item_name,
+                    stats.total_bought, stats.total_sold, stats.sum_bought, stats.sum_sold,
+                    stats.quantity_difference, stats.sum_difference
+                ))
+        return self._table_from_rows(rows, self.ITEMS_SCHEMA)
+
+    def monthly_table(self, monthly_aggregated_data: dict, app_id_to_game_name: dict) -> pa.Table:
+        rows = []
+        for app_id, months in monthly_aggregated_data.items():
+            game_name = app_id_to_game_name.get(app_id, app_id)
+            for month_key, stats in sorted(months.items()):
+                stats: MarketMonthStats
+                rows.append((
+                    app_id, game_name, datetime.strptime(month_key, "%Y.%m").date(),
+                    stats.total_bought, stats.total_sold, stats.sum_bought, stats.sum_sold,
+                    stats.quantity_difference, stats.sum_difference
+                ))
+        return self._table_from_rows(rows, self.MONTHLY_SCHEMA)
+
+    def profit_table(self, profit_aggregated_data: dict, app_id_to_game_name: dict) -> pa.Table:
+        rows = []
+        for app_id, items in profit_aggregated_data.items():
+            game_name = app_id_to_game_name.get(app_id, app_id)
+            for item_hash_name, stats in items.items():
+                stats: MarketItemProfitStats
+                rows.append((
+                    app_id, game_name, item_hash_name, stats.item_name,
+                    stats.total_profitable, stats.total_unprofitable, stats.sum_profitable, stats.sum_unprofitable,
+                    stats.quantity_difference, stats.sum_difference, stats.bought_queue.total_count
+                ))
+        return self._table_from_rows(rows, self.PROFIT_SCHEMA)
+
+    def export(
+            self,
+            dir_path: str | Path,
+            aggregated_data: dict,
+            monthly_aggregated_data: dict,
+            profit_aggregated_data: dict,
+            app_id_to_game_name: dict
+    ) -> list[Path]:
+        """
+            Выгрузить три таблицы: summarize, monthly_summarize и profit_summarize
+        :return: Пути записанных файлов
+        """
+        dir_path = Path(dir_path)
+        return [
+            self._write_table(
+                self.items_table(aggregated_data, app_id_to_game_name), dir_path / "summarize"),
+            self._write_table(
+                self.monthly_table(monthly_aggregated_data, app_id_to_game_name), dir_path / "monthly_summarize"),
+            self._write_table(
+                self.profit_table(profit_aggregated_data, app_id_to_game_name), dir_path / "profit_summarize"),
+        ]
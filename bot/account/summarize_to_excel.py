@@ -1,20 +1,37 @@
+import os
 import json
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from collections import OrderedDict
-from typing import Dict
+from functools import lru_cache
+from typing import Callable, Dict
 from datetime import datetime
 
 import pandas as pd
+from openpyxl import Workbook, load_workbook
+from openpyxl.cell import Cell, WriteOnlyCell
 from openpyxl.styles import Font, Border, Side, PatternFill, Alignment
+from openpyxl.styles.cell_style import StyleArray
 from openpyxl.formatting.rule import CellIsRule, FormulaRule
+from openpyxl.worksheet.cell_range import CellRange
 from openpyxl.worksheet.worksheet import Worksheet
 from openpyxl.chart import LineChart, Reference
 from openpyxl.chart.axis import TextAxis
 from openpyxl.chart.marker import Marker
 from openpyxl.utils import get_column_letter
 
+from tools.file_store import FileStore, FileStoreType
+
 
 class SummarizeToExcel:
+    """
+        Построение Excel по json со сводками истории торговой площадки.
+        Для каждого листа хранится хэш его данных (файл <имя Excel>.hashes.json рядом с Excel),
+        поэтому перестраиваются только листы игр, данные которых изменились, а остальные переносятся как есть.
+        Книга целиком строится в потоковом режиме openpyxl (write-only): строки пишутся сразу в файл
+        уже оформленными, без повторного обхода ячеек.
+    """
     COLUMN_LABELS = {
         "item_name": "Предмет",
         "total_bought": "Куплено (количество)",
@@ -47,6 +64,42 @@ class SummarizeToExcel:
         "profit_pct": "Выгодность (%)",
     }
 
+    # Меньше строк выгоднее подготовить в текущем процессе, чем передавать в пул
+    PARALLEL_PREPARE_MIN_ROWS: int = 20000
+
+    def __init__(self, workers: int = 1) -> None:
+        """
+        :param workers: Количество процессов для подготовки таблиц листов одной книги
+        """
+        self.workers = workers
+        # (книга, формат, шрифт, границы, выравнивание): индексы стиля в книге (см. _cell)
+        self._style_arrays: dict[tuple, StyleArray] = {}
+
+    # Входит в хэш листа: при изменении оформления листов её нужно увеличить, чтобы листы перестроились
+    SHEET_STYLE_VERSION: int = 1
+
+    MONEY_FORMAT = "#,##0.00"
+    INT_FORMAT = "0"
+    PCT_FORMAT = "0.00%"
+    COLUMN_FORMATS = {
+        "sum_bought": MONEY_FORMAT,
+        "sum_sold": MONEY_FORMAT,
+        "sum_profitable": MONEY_FORMAT,
+        "sum_unprofitable": MONEY_FORMAT,
+        "sum_difference": MONEY_FORMAT,
+        "total_bought": INT_FORMAT,
+        "total_sold": INT_FORMAT,
+        "total_profitable": INT_FORMAT,
+        "total_unprofitable": INT_FORMAT,
+        "quantity_difference": INT_FORMAT,
+        "sold_to_bought_pct": PCT_FORMAT,
+        "profit_pct": PCT_FORMAT,
+    }
+
+    HEADER_FONT = Font(bold=True)
+    HEADER_ALIGNMENT = Alignment(vertical="center", horizontal="center")
+    SUMMARY_VALUE_ALIGNMENT = Alignment(horizontal="right")
+
     @staticmethod
     def _safe_sheet_name(name: str, existing: set, max_len: int = 31) -> str:
         name = name.replace(":", "")
@@ -109,80 +162,6 @@ class SummarizeToExcel:
         max_len = max(max_val_len, len(header))
         return min(max(14, int(max_len * 1.4) + 4), 90)
 
-    def _apply_number_formats(self, worksheet: Worksheet, df: pd.DataFrame, column_labels: dict[str, str]) -> None:
-        money_cols = {"sum_bought", "sum_sold", "sum_difference"}
-        int_cols = {"total_bought", "total_sold", "quantity_difference"}
-
-        for col_idx, col_name in enumerate(df.columns, start=1):
-            col_letter = get_column_letter(col_idx)
-
-            display_name = column_labels.get(col_name, col_name)
-
-            width = self._calc_column_width(df[col_name], display_name=display_name)
-            worksheet.column_dimensions[col_letter].width = width
-
-            if col_name in money_cols:
-                fmt = '#,##0.00'
-            elif col_name in int_cols:
-                fmt = '0'
-            elif col_name == "sold_to_bought_pct":
-                fmt = '0.00%'
-            else:
-                fmt = None
-
-            if fmt is not None:
-                for row_idx in range(2, 2 + len(df)):
-                    cell = worksheet.cell(row=row_idx, column=col_idx)
-                    if cell.value is not None:
-                        if col_name == "sold_to_bought_pct" and (pd.isna(cell.value) or cell.value is None):
-                            cell.value = None
-                        else:
-                            cell.number_format = fmt
-
-    def _apply_number_formats_profit(
-            self, worksheet: Worksheet, df: pd.DataFrame, column_labels: dict[str, str]) -> None:
-        money_cols = {"sum_profitable", "sum_unprofitable", "sum_difference"}
-        int_cols = {"total_profitable", "total_unprofitable", "quantity_difference"}
-
-        for col_idx, col_name in enumerate(df.columns, start=1):
-            col_letter = get_column_letter(col_idx)
-
-            display_name = column_labels.get(col_name, col_name)
-
-            width = self._calc_column_width(df[col_name], display_name=display_name)
-            worksheet.column_dimensions[col_letter].width = width
-
-            if col_name in money_cols:
-                fmt = '#,##0.00'
-            elif col_name in int_cols:
-                fmt = '0'
-            elif col_name == "profit_pct":
-                fmt = '0.00%'
-            else:
-                fmt = None
-
-            if fmt is not None:
-                for row_idx in range(2, 2 + len(df)):
-                    cell = worksheet.cell(row=row_idx, column=col_idx)
-                    if cell.value is not None:
-                        if col_name == "profit_pct" and (pd.isna(cell.value) or cell.value is None):
-                            cell.value = None
-                        else:
-                            cell.number_format = fmt
-
-    @staticmethod
-    def _apply_header_and_freeze(worksheet: Worksheet, df: pd.DataFrame) -> None:
-        last_row = len(df) + 1
-        last_col_letter = get_column_letter(len(df.columns))
-        worksheet.auto_filter.ref = f"A1:{last_col_letter}{last_row}"
-        worksheet.freeze_panes = "A2"
-
-        header_font = Font(bold=True)
-        for col_idx in range(1, len(df.columns) + 1):
-            header_cell = worksheet.cell(row=1, column=col_idx)
-            header_cell.font = header_font
-            header_cell.alignment = Alignment(vertical="center", horizontal="center")
-
     @staticmethod
     def _apply_conditional_formatting(worksheet: Worksheet, df: pd.DataFrame) -> None:
         last_row = len(df) + 1
@@ -234,7 +213,55 @@ class SummarizeToExcel:
             pass
 
     @staticmethod
-    def _write_summary(worksheet, df: pd.DataFrame, start_col: int) -> None:
+    @lru_cache(maxsize=None)
+    def _table_border(is_first_row: bool, is_last_row: bool, is_first_col: bool, is_last_col: bool) -> Border:
+        thin = Side(border_style="thin", color="000000")
+        medium = Side(border_style="medium", color="000000")
+        thick = Side(border_style="thick", color="000000")
+        return Border(
+            left=thick if is_first_col else medium,
+            right=thick if is_last_col else medium,
+            top=thick if is_first_row else thin,
+            bottom=thick if is_last_row else thin
+        )
+
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def _summary_border(is_first_row: bool, is_last_row: bool, is_first_col: bool, is_last_col: bool) -> Border:
+        thin = Side(border_style="thin", color="000000")
+        medium = Side(border_style="medium", color="000000")
+        return Border(
+            left=medium if is_first_col else thin,
+            right=medium if is_last_col else thin,
+            top=medium if is_first_row else thin,
+            bottom=medium if is_last_row else thin
+        )
+
+    def _cell(self, worksheet, value=None, number_format: str | None = None, font: Font | None = None,
+              border: Border | None = None, alignment: Alignment | None = None) -> Cell:
+        """
+            Оформленная ячейка; подходит и для обычного, и для потокового листа.
+            Назначение стиля ячейке требует хэширования его объектов, что занимает большую часть времени
+            построения листа, поэтому набор индексов стиля вычисляется один раз для каждого сочетания
+            оформления и затем копируется в новые ячейки
+        """
+        if value is None:
+            number_format = None
+        key = (id(worksheet.parent), number_format, id(font), id(border), id(alignment))
+        if (style_array := self._style_arrays.get(key)) is None:
+            template = WriteOnlyCell(worksheet)
+            if number_format is not None:
+                template.number_format = number_format
+            if font is not None:
+                template.font = font
+            if border is not None:
+                template.border = border
+            if alignment is not None:
+                template.alignment = alignment
+            style_array = self._style_arrays[key] = template._style
+        return Cell(worksheet, row=1, column=1, value=value, style_array=style_array)
+
+    def _summary_rows(self, worksheet, df: pd.DataFrame) -> list[list[Cell]]:
         total_sum_bought = round(df["sum_bought"].sum() if "sum_bought" in df.columns else 0.0, 2)
         total_sum_sold = round(df["sum_sold"].sum() if "sum_sold" in df.columns else 0.0, 2)
         total_sum_diff = round(df["sum_difference"].sum() if "sum_difference" in df.columns else 0.0, 2)
@@ -245,63 +272,191 @@ class SummarizeToExcel:
             total_pct = None
 
         summary_rows = [
-            ("Потрачено", total_sum_bought, "money"),
-            ("Получено", total_sum_sold, "money"),
-            ("Разница", total_sum_diff, "money"),
-            ("Получено/Потрачено (%)", total_pct, "pct"),
+            ("Потрачено", total_sum_bought, self.MONEY_FORMAT),
+            ("Получено", total_sum_sold, self.MONEY_FORMAT),
+            ("Разница", total_sum_diff, self.MONEY_FORMAT),
+            ("Получено/Потрачено (%)", total_pct, self.PCT_FORMAT),
         ]
+        last_row = len(summary_rows)
+
+        rows = [[
+            self._cell(worksheet, "Итог", font=self.HEADER_FONT,
+                       border=self._summary_border(True, False, True, False)),
+            self._cell(worksheet, border=self._summary_border(True, False, False, True))
+        ]]
+        for i, (label, value, number_format) in enumerate(summary_rows, start=1):
+            rows.append([
+                self._cell(worksheet, label, border=self._summary_border(False, i == last_row, True, False)),
+                self._cell(worksheet, value, number_format=number_format, alignment=self.SUMMARY_VALUE_ALIGNMENT,
+                           border=self._summary_border(False, i == last_row, False, True))
+            ])
+        return rows
+
+    def _write_table(
+            self, worksheet, df: pd.DataFrame, column_labels: dict[str, str], with_summary: bool = False) -> None:
+        """
+            Записать таблицу с оформлением (форматы чисел, заголовок, границы, фильтр, закреплённая строка)
+            и, при необходимости, блок итогов справа от неё.
+            Размеры колонок и закрепление задаются до строк, как требует потоковый режим
+        """
+        columns = list(df.columns)
+        last_row = len(df) + 1
+        last_col = len(columns)
 
-        worksheet.cell(row=1, column=start_col, value="Итог").font = Font(bold=True)
-        try:
-            worksheet.merge_cells(start_row=1, start_column=start_col, end_row=1, end_column=start_col+1)
-        except Exception:
-            pass
+        for col_idx, col_name in enumerate(columns, start=1):
+            display_name = column_labels.get(col_name, col_name)
+            worksheet.column_dimensions[get_column_letter(col_idx)].width = self._calc_column_width(
+                df[col_name], display_name=display_name)
+
+        summary_rows = []
+        summary_start_col = last_col + 3
+        if with_summary:
+            summary_rows = self._summary_rows(worksheet, df)
+            worksheet.column_dimensions[get_column_letter(summary_start_col)].width = 28
+            worksheet.column_dimensions[get_column_letter(summary_start_col + 1)].width = 18
+            worksheet.merged_cells.add(CellRange(
+                min_col=summary_start_col, min_row=1, max_col=summary_start_col + 1, max_row=1))
 
-        for i, (label, value, value_type) in enumerate(summary_rows, start=1):
-            worksheet.cell(row=i+1, column=start_col, value=label)
-            cell_val = worksheet.cell(row=i+1, column=start_col + 1, value=value)
-            if value is None:
-                cell_val.value = None
-            else:
-                if value_type == "money":
-                    cell_val.number_format = "#,##0.00"
-                elif value_type == "pct":
-                    cell_val.number_format = '0.00%'
-            cell_val.alignment = Alignment(horizontal="right")
+        worksheet.freeze_panes = "A2"
+        worksheet.auto_filter.ref = f"A1:{get_column_letter(last_col)}{last_row}"
 
-        worksheet.column_dimensions[get_column_letter(start_col)].width = 28
-        worksheet.column_dimensions[get_column_letter(start_col + 1)].width = 18
+        summary_padding = [None] * (summary_start_col - last_col - 1)
+        formats = [self.COLUMN_FORMATS.get(col_name) for col_name in columns]
 
-        thin = Side(border_style="thin", color="000000")
-        medium = Side(border_style="medium", color="000000")
-        summary_max_row = 1 + len(summary_rows)
-        summary_max_col = start_col + 1
-        for r in range(1, summary_max_row + 1):
-            for c in range(start_col, summary_max_col + 1):
-                cell = worksheet.cell(row=r, column=c)
-                left = medium if c == start_col else thin
-                right = medium if c == summary_max_col else thin
-                top = medium if r == 1 else thin
-                bottom = medium if r == summary_max_row else thin
-                cell.border = Border(left=left, right=right, top=top, bottom=bottom)
+        header = [
+            self._cell(worksheet, column_labels.get(col_name, col_name), font=self.HEADER_FONT,
+                       alignment=self.HEADER_ALIGNMENT,
+                       border=self._table_border(True, last_row == 1, col_idx == 1, col_idx == last_col))
+            for col_idx, col_name in enumerate(columns, start=1)
+        ]
+        if summary_rows:
+            header += summary_padding + summary_rows[0]
+        worksheet.append(header)
+
+        for row_idx, values in enumerate(df.itertuples(index=False, name=None), start=2):
+            is_last_row = row_idx == last_row
+            row = [
+                self._cell(
+                    worksheet,
+                    None if pd.isna(value) else value,
+                    number_format=number_format,
+                    border=self._table_border(False, is_last_row, col_idx == 1, col_idx == last_col)
+                )
+                for col_idx, (value, number_format) in enumerate(zip(values, formats), start=1)
+            ]
+            if row_idx <= len(summary_rows):
+                row += summary_padding + summary_rows[row_idx - 1]
+            worksheet.append(row)
+
+        # Таблица короче блока итогов
+        for summary_row in summary_rows[last_row:]:
+            worksheet.append([None] * last_col + summary_padding + summary_row)
 
     @staticmethod
-    def _apply_table_borders(worksheet: Worksheet, df: pd.DataFrame) -> None:
-        thin = Side(border_style="thin", color="000000")
-        medium = Side(border_style="medium", color="000000")
-        thick = Side(border_style="thick", color="000000")
+    def _hashes_path(excel_path: Path) -> Path:
+        return excel_path.with_name(f"{excel_path.name}.hashes.json")
 
-        max_row = len(df) + 1
-        max_col = len(df.columns)
+    def _sheet_hash(self, kind: str, game_name: str, data: dict) -> str:
+        payload = json.dumps(
+            [self.SHEET_STYLE_VERSION, kind, game_name, data], ensure_ascii=False, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _save_workbook(workbook: Workbook, excel_path: Path) -> None:
+        excel_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = excel_path.with_name(f"{excel_path.stem}.tmp{excel_path.suffix}")
+        try:
+            workbook.save(tmp_path)
+            os.replace(tmp_path, excel_path)
+        finally:
+            tmp_path.unlink(missing_ok=True)
+
+    def _prepare_frames(
+            self, prepare_sheet: Callable[[dict], pd.DataFrame], sheets_data: list[dict]) -> list[pd.DataFrame]:
+        """
+            Таблицы листов строятся в пуле процессов, если листов несколько и строк в них достаточно,
+            чтобы окупить передачу данных между процессами
+        """
+        total_rows = sum(len(data) for data in sheets_data)
+        if self.workers <= 1 or len(sheets_data) < 2 or total_rows < self.PARALLEL_PREPARE_MIN_ROWS:
+            return [prepare_sheet(data) for data in sheets_data]
+
+        with ProcessPoolExecutor(max_workers=min(self.workers, len(sheets_data))) as executor:
+            return list(executor.map(prepare_sheet, sheets_data))
+
+    def _write_workbook(
+            self,
+            excel_path: Path,
+            kind: str,
+            sheets: list[tuple[str, str, dict]],
+            prepare_sheet: Callable[[dict], pd.DataFrame],
+            render_sheet: Callable[[Worksheet, pd.DataFrame], None],
+            allow_partial: bool = True
+    ) -> None:
+        """
+            Записать книгу, перестраивая только изменившиеся листы
+        :param kind: Вид сводки (входит в хэш листа)
+        :param sheets: (имя листа, название игры, данные игры) в порядке листов
+        :param prepare_sheet: Построение таблицы листа по данным игры
+            (функция уровня модуля или staticmethod: может выполняться в другом процессе)
+        :param render_sheet: Заполнение пустого листа таблицей
+        :param allow_partial: Разрешить замену отдельных листов в существующей книге.
+            Книги с диаграммами всегда перестраиваются целиком: openpyxl не сохраняет диаграммы при загрузке книги
+        """
+        self._style_arrays.clear()
+        file_store = FileStore.from_type(FileStoreType.JSON)
+        hashes_path = self._hashes_path(excel_path)
+
+        sheet_names = [sheet_name for sheet_name, _, _ in sheets]
+        new_hashes = {
+            sheet_name: self._sheet_hash(kind, game_name, data) for sheet_name, game_name, data in sheets
+        }
+        old_hashes = file_store.load(hashes_path, default={}) if excel_path.exists() else {}
+
+        if list(old_hashes.items()) == list(new_hashes.items()):
+            print(f"Excel не изменился: {excel_path}")
+            return
+
+        changed = {sheet_name for sheet_name in sheet_names if old_hashes.get(sheet_name) != new_hashes[sheet_name]}
+        workbook = None
+        if allow_partial and old_hashes and len(changed) < len(sheet_names):
+            try:
+                workbook = load_workbook(excel_path)
+            except Exception as e:
+                print(f"Не удалось открыть {excel_path} ({e}), книга будет построена заново")
+
+        if workbook is not None:
+            rebuilt = [
+                (sheet_name, data) for sheet_name, _, data in sheets
+                if sheet_name in changed or sheet_name not in workbook.sheetnames
+            ]
+            frames = dict(zip(
+                [sheet_name for sheet_name, _ in rebuilt],
+                self._prepare_frames(prepare_sheet, [data for _, data in rebuilt])
+            ))
+            for index, sheet_name in enumerate(sheet_names):
+                if sheet_name in frames:
+                    if sheet_name in workbook.sheetnames:
+                        workbook.remove(workbook[sheet_name])
+                    render_sheet(workbook.create_sheet(sheet_name, index), frames[sheet_name])
+                else:
+                    worksheet = workbook[sheet_name]
+                    workbook.move_sheet(worksheet, index - workbook.index(worksheet))
+            for sheet_name in workbook.sheetnames:
+                if sheet_name not in new_hashes:
+                    workbook.remove(workbook[sheet_name])
+            workbook.active = 0
+            mode = f"перестроено листов: {len(changed)} из {len(sheet_names)}"
+        else:
+            workbook = Workbook(write_only=True)
+            frames = self._prepare_frames(prepare_sheet, [data for _, _, data in sheets])
+            for sheet_name, df in zip(sheet_names, frames):
+                render_sheet(workbook.create_sheet(sheet_name), df)
+            mode = "построен заново"
 
-        for r in range(1, max_row + 1):
-            for c in range(1, max_col + 1):
-                cell = worksheet.cell(row=r, column=c)
-                left = thick if c == 1 else medium
-                right = thick if c == max_col else medium
-                top = thick if r == 1 else thin
-                bottom = thick if r == max_row else thin
-                cell.border = Border(left=left, right=right, top=top, bottom=bottom)
+        self._save_workbook(workbook, excel_path)
+        file_store.save(hashes_path, new_hashes)
+        print(f"Excel сохранён: {excel_path} ({mode})")
 
     def summarize_json_to_excel(self, json_path_str: str, excel_path_str: str) -> None:
         json_path = Path(json_path_str)
@@ -314,30 +469,17 @@ class SummarizeToExcel:
             raise ValueError("В файле нет aggregated_data или он пуст.")
 
         games = OrderedDict(sorted(aggregated.items(), key=lambda kv: kv[0].lower()))
-        excel_path.parent.mkdir(parents=True, exist_ok=True)
-
-        with pd.ExcelWriter(excel_path, engine="openpyxl", date_format="YYYY-MM-DD") as writer:
-            existing_sheet_names = set()
-
-            for app_id, items in games.items():
-                game_name = app_id_to_game_name.get(app_id)
-                df = self._prepare_rows_from_items(items)
-                df_export = df.rename(columns=self.COLUMN_LABELS)
-
-                sheet_name = self._safe_sheet_name(game_name, existing_sheet_names)
-                df_export.to_excel(writer, sheet_name=sheet_name, index=False)
-                worksheet = writer.sheets[sheet_name]
-
-                self._apply_number_formats(worksheet, df, self.COLUMN_LABELS)
-                self._apply_header_and_freeze(worksheet, df)
-                self._apply_conditional_formatting(worksheet, df)
+        existing_sheet_names = set()
+        sheets = []
+        for app_id, items in games.items():
+            game_name = app_id_to_game_name.get(app_id)
+            sheets.append((self._safe_sheet_name(game_name, existing_sheet_names), game_name, items))
 
-                summary_start_col = len(df.columns) + 3
-                self._write_summary(worksheet, df, summary_start_col)
+        def render_sheet(worksheet, df: pd.DataFrame) -> None:
+            self._write_table(worksheet, df, self.COLUMN_LABELS, with_summary=True)
+            self._apply_conditional_formatting(worksheet, df)
 
-                self._apply_table_borders(worksheet, df)
-
-        print(f"Excel сохранён: {excel_path_str}")
+        self._write_workbook(excel_path, "summarize", sheets, self._prepare_rows_from_items, render_sheet)
 
     @staticmethod
     def _parse_month_key(key: str) -> datetime:
@@ -500,26 +642,21 @@ class SummarizeToExcel:
         if not aggregated:
             raise ValueError("В файле нет aggregated_data или он пуст.")
 
-        with pd.ExcelWriter(excel_path, engine="openpyxl") as writer:
-            used_names = set()
-
-            for app_id, months in aggregated.items():
-                game_name = app_id_to_game_name.get(app_id, app_id)
-
-                df = self._prepare_rows_from_months(months)
-                df_export = df.rename(columns=self.MONTHLY_COLUMN_LABELS)
-
-                sheet = self._safe_sheet_name(game_name, used_names)
-                df_export.to_excel(writer, sheet_name=sheet, index=False)
-                ws = writer.sheets[sheet]
+        used_names = set()
+        sheets = []
+        for app_id, months in aggregated.items():
+            game_name = app_id_to_game_name.get(app_id, app_id)
+            sheets.append((self._safe_sheet_name(game_name, used_names), game_name, months))
 
-                self._apply_number_formats(ws, df, self.MONTHLY_COLUMN_LABELS)
-                self._apply_header_and_freeze(ws, df)
-                self._apply_monthly_conditional_formatting(ws, df)
-                self._apply_table_borders(ws, df)
-                self._add_charts(ws, df)
+        def render_sheet(worksheet, df: pd.DataFrame) -> None:
+            self._write_table(worksheet, df, self.MONTHLY_COLUMN_LABELS)
+            self._apply_monthly_conditional_formatting(worksheet, df)
+            self._add_charts(worksheet, df)
 
-        print(f"Excel сохранён: {excel_path_str}")
+        self._write_workbook(
+            excel_path, "monthly_summarize", sheets, self._prepare_rows_from_months, render_sheet,
+            allow_partial=False
+        )
 
     @staticmethod
     def _prepare_rows_from_items_profit(items: Dict) -> pd.DataFrame:
@@ -619,24 +756,55 @@ class SummarizeToExcel:
             raise ValueError("В файле нет aggregated_data или он пуст.")
 
         games = OrderedDict(sorted(aggregated.items(), key=lambda kv: kv[0].lower()))
-        excel_path.parent.mkdir(parents=True, exist_ok=True)
-
-        with pd.ExcelWriter(excel_path, engine="openpyxl", date_format="YYYY-MM-DD") as writer:
-            existing_sheet_names = set()
-
-            for app_id, items in games.items():
-                game_name = app_id_to_game_name.get(app_id)
-                df = self._prepare_rows_from_items_profit(items)
-                df_export = df.rename(columns=self.PROFIT_COLUMN_LABELS)
-
-                sheet_name = self._safe_sheet_name(game_name, existing_sheet_names)
-                df_export.to_excel(writer, sheet_name=sheet_name, index=False)
-                worksheet = writer.sheets[sheet_name]
-
-                self._apply_number_formats_profit(worksheet, df, self.PROFIT_COLUMN_LABELS)
-                self._apply_header_and_freeze(worksheet, df)
-                self._apply_conditional_formatting_profit(worksheet, df)
-
-                self._apply_table_borders(worksheet, df)
+        existing_sheet_names = set()
+        sheets = []
+        for app_id, items in games.items():
+            game_name = app_id_to_game_name.get(app_id)
+            # Очередь купленных лотов на лист не выводится и не должна вызывать его перестройку
+            items = {
+                item_hash_name: {key: value for key, value in stats.items() if key != "bought_queue"}
+                for item_hash_name, stats in items.items()
+            }
+            sheets.append((self._safe_sheet_name(game_name, existing_sheet_names), game_name, items))
+
+        def render_sheet(worksheet, df: pd.DataFrame) -> None:
+            self._write_table(worksheet, df, self.PROFIT_COLUMN_LABELS)
+            self._apply_conditional_formatting_profit(worksheet, df)
+
+        self._write_workbook(
+            excel_path, "profit_summarize", sheets, self._prepare_rows_from_items_profit, render_sheet)
+
+    def summarize_all_to_excel(
+            self,
+            json_file_path: str, excel_file_path: str,
+            monthly_json_file_path: str, monthly_excel_file_path: str,
+            profit_json_file_path: str, profit_excel_file_path: str,
+            workers: int = 1
+    ) -> None:
+        """
+            Построить все три книги. Книги независимы, поэтому при workers > 1 строятся
+            в отдельных процессах; результат совпадает с последовательным построением.
+            Ошибка в одной книге не мешает построению остальных
+        """
+        jobs = [
+            (self.summarize_json_to_excel, json_file_path, excel_file_path),
+            (self.monthly_summarize_json_to_excel, monthly_json_file_path, monthly_excel_file_path),
+            (self.profit_summarize_json_to_excel, profit_json_file_path, profit_excel_file_path),
+        ]
+        if workers <= 1:
+            for func, json_path_str, excel_path_str in jobs:
+                try:
+                    func(json_path_str, excel_path_str)
+                except Exception as e:
+                    print("Ошибка:", e)
+            return
 
-        print(f"Excel сохранён: {excel_path_str}")
+        with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as executor:
+            futures = [
+                executor.submit(func, json_path_str, excel_path_str) for func, json_path_str, excel_path_str in jobs
+            ]
+            for future in futures:
+                try:
+                    future.result()
+                except Exception as e:
+                    print("Ошибка:", e)
@@ -0,0 +1,135 @@
+import re
+import json
+import logging
+from datetime import date
+from typing import Iterator
+
+import requests
+from lxml import html
+from lxml.etree import XPath
+
+from tools.rate_limiter import rate_limited
+from enums import Urls, Host, EndpointClass
+from utils.exceptions import TooManyRequestsError
+from utils.web_utils import api_request
+from utils import parse_steam_date
+
+
+class WalletHistoryClient:
+    """
+        Получение дат транзакций кошелька со страницы account/history без браузера.
+        Первая страница содержит курсор g_historyCursor, по которому кнопка "load more" запрашивает
+        следующие строки у AjaxLoadMoreHistory; здесь эти запросы выполняются напрямую с cookie сессии,
+        а каждая порция строк разбирается отдельно, по мере получения
+    """
+    _CURSOR_RE = re.compile(r"g_historyCursor\s*=\s*(\{.*?\})\s*;", flags=re.DOTALL)
+    _ROWS_XPATH = XPath('//tr[contains(concat(" ", normalize-space(@class), " "), " wallet_table_row ")]')
+    _CELLS_XPATH = XPath("./td")
+
+    def __init__(self, logger: logging.Logger) -> None:
+        self.logger = logger
+
+    @staticmethod
+    def _cell_text(cell) -> str:
+        # Как BeautifulSoup.get_text(strip=True): части текста обрезаются и склеиваются без разделителя
+        return "".join(part.strip() for part in cell.itertext())
+
+    @classmethod
+    def _dates_from_rows(cls, rows: list) -> list[date]:
+        dates = []
+        for row in rows:
+            cells = cls._CELLS_XPATH(row)
+            if len(cells) < 3:
+                continue
+
+            type_ = cls._cell_text(cells[2])
+            if not ("TransactionWallet" in type_ or "TransactionsWallet" in type_):
+                continue
+
+            dates.append(parse_steam_date(cls._cell_text(cells[0])))
+        return dates
+
+    @classmethod
+    def parse_wallet_dates(cls, rows_html: str) -> list[date]:
+        """
+            Даты транзакций, изменивших баланс кошелька, в порядке строк (от новых к старым)
+        :param rows_html: Порция строк таблицы из ответа AjaxLoadMoreHistory
+        """
+        if not rows_html or not rows_html.strip():
+            return []
+        return cls._dates_from_rows(cls._ROWS_XPATH(html.fromstring(f"<table>{rows_html}</table>")))
+
+    @classmethod
+    def parse_cursor(cls, page_html: str) -> dict | None:
+        if not (match := cls._CURSOR_RE.search(page_html)):
+            return None
+        return json.loads(match.group(1))
+
+    @rate_limited(Host.STORE, EndpointClass.ACCOUNT)
+    def get_history_page(self, session: requests.Session) -> requests.Response:
+        return api_request(
+            session,
+            "GET",
+            Urls.ACCOUNT_HISTORY,
+            headers={
+                "Referer": Urls.ACCOUNT
+            },
+            logger=self.logger
+        )
+
+    @rate_limited(Host.STORE, EndpointClass.ACCOUNT)
+    def load_more_history(self, session: requests.Session, cursor: dict) -> requests.Response:
+        # Курсор передаётся так же, как его сериализует jQuery на странице: cursor[поле]=значение
+        data = {f"cursor[{key}]": value for key, value in cursor.items()}
+        data["sessionid"] = session.cookies.get("sessionid", domain="store.steampowered.com")
+        return api_request(
+            session,
+            "POST",
+            Urls.ACCOUNT_HISTORY_LOAD_MORE,
+            headers={
+                "Origin": Urls.STORE,
+                "Referer": Urls.ACCOUNT_HISTORY,
+                "X-Requested-With": "XMLHttpRequest"
+            },
+            data=data,
+            logger=self.logger
+        )
+
+    def iter_wallet_dates(self, session: requests.Session) -> Iterator[date]:
+        """
+            Даты транзакций кошелька от новых к старым. Следующая порция запрашивается,
+            только когда предыдущая исчерпана, поэтому при досрочном завершении перебора
+            лишние запросы не выполняются
+        :raises RuntimeError: Страница или ответ AjaxLoadMoreHistory не получены (в том числе из-за 429)
+            или не в ожидаемом формате
+        """
+        try:
+            yield from self._iter_wallet_dates(session)
+        except TooManyRequestsError as e:
+            raise RuntimeError(f"account/history: {e}") from e
+        except ValueError as e:
+            raise RuntimeError(f"account/history: дата не в ожидаемом формате ({e})") from e
+
+    def _iter_wallet_dates(self, session: requests.Session) -> Iterator[date]:
+        response = self.get_history_page(session)
+        if response.status_code != 200:
+            raise RuntimeError(f"account/history: {response.status_code} {response.reason}")
+        if not (rows := self._ROWS_XPATH(html.document_fromstring(response.text))):
+            raise RuntimeError("account/history: на странице нет строк истории (сессия не авторизована?)")
+
+        yield from self._dates_from_rows(rows)
+
+        cursor = self.parse_cursor(response.text)
+        while cursor:
+            response = self.load_more_history(session, cursor)
+            if response.status_code != 200:
+                raise RuntimeError(f"AjaxLoadMoreHistory: {response.status_code} {response.reason}")
+            try:
+                payload = response.json()
+            except ValueError:
+                raise RuntimeError("AjaxLoadMoreHistory: ответ не в формате JSON")
+            if "html" not in payload:
+                raise RuntimeError(f"AjaxLoadMoreHistory: неожиданный ответ {list(payload)}")
+
+            yield from self.parse_wallet_dates(payload["html"])
+            cursor = payload.get("cursor")
@@ -0,0 +1,9 @@
+from .histogram_snapshot import HistogramSnapshot
+from .backtest_result import BacktestResult
+from .backtest_engine import BacktestEngine
+
+__all__ = [
+    "HistogramSnapshot",
+    "BacktestResult",
+    "BacktestEngine"
+]
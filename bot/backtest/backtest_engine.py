@@ -0,0 +1,305 @@
+import gzip
+import json
+import itertools
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any, Iterable
+
+from bot.account import MarketHistoryLedger, FifoLotQueue
+from bot.backtest.histogram_snapshot import HistogramSnapshot
+from bot.backtest.backtest_result import BacktestResult
+from bot.marketplace import HistogramRecorder
+from bot.price_analysis import PriceAnalysis, ItemPricingInput, ItemPricing
+
+from enums import Config
+
+# Движок передаётся в процесс пула один раз, при его запуске, а не с каждым набором настроек
+_worker_engine: 'BacktestEngine | None' = None
+
+
+def _init_worker(engine: 'BacktestEngine') -> None:
+    global _worker_engine
+    _worker_engine = engine
+
+
+def _run_in_worker(settings: dict[str, Any]) -> BacktestResult:
+    return _worker_engine.run(settings)
+
+
+class BacktestEngine:
+    """
+        Офлайн-прогон настроек PriceAnalysis по записанным снимкам 'itemordershistogram'.
+        Для каждого снимка предмета принимаются те же решения, что в TradeBot: снять неактуальный 'buy order',
+        выставить новый по рекомендуемой цене, выставить купленное на продажу по рекомендуемой цене.
+        Исполнение проверяется по следующему снимку предмета:
+        - 'buy order' исполняется, если его цена не ниже лучшего 'buy order' следующего снимка;
+        - выставленный предмет продаётся, если его цена не выше лучшего 'sell order' следующего снимка.
+        Объём, доступный каждой стороне за интервал, - fill_share от продаж за интервал по sales_per_day.
+
+        Цены всех снимков при одном наборе настроек рассчитываются одним вызовом PriceAnalysis.price_items,
+        а наборы настроек сетки распределяются по процессам
+    """
+    SECONDS_PER_DAY: int = 24 * 60 * 60
+
+    def __init__(
+            self,
+            snapshots: Iterable[HistogramSnapshot],
+            starting_lots: dict[str, list] | None = None,
+            order_quantity: int = 1,
+            fill_share: float = 0.5
+    ) -> None:
+        """
+        :param starting_lots: Инвентарь на начало периода: лоты [[цена, количество], ...] по названию предмета
+        :param order_quantity: Количество в одном 'buy order'
+        :param fill_share: Доля продаж предмета, приходящаяся на каждую сторону стакана
+        """
+        timelines = defaultdict(list)
+        for snapshot in snapshots:
+            timelines[snapshot.item_name].append(snapshot)
+        self.timelines: dict[str, list[HistogramSnapshot]] = {
+            item_name: sorted(timeline, key=lambda s: s.timestamp) for item_name, timeline in timelines.items()
+        }
+        self.starting_lots = starting_lots or {}
+        self.order_quantity = order_quantity
+        self.fill_share = fill_share
+
+        # Входные данные не зависят от настроек, поэтому собираются один раз
+        self._pricing_inputs: dict[tuple[str, int], ItemPricingInput] = {
+            (item_name, i): ItemPricingInput(snapshot.order_book, snapshot.sales_per_day)
+            for item_name, timeline in self.timelines.items()
+            for i, snapshot in enumerate(timeline)
+        }
+
+    @property
+    def period(self) -> tuple[date, date] | None:
+        timestamps = [timeline[i].timestamp for timeline in self.timelines.values() for i in (0, -1)]
+        if not timestamps:
+            return None
+        return datetime.fromtimestamp(min(timestamps)).date(), datetime.fromtimestamp(max(timestamps)).date()
+
+    @property
+    def app_ids(self) -> set[str]:
+        return {str(timeline[0].app_id) for timeline in self.timelines.values()}
+
+    @staticmethod
+    def load_snapshots(file_path: str | Path) -> list[HistogramSnapshot]:
+        """
+            Снимки из файла JSON Lines (.jsonl или .jsonl.gz): по записи HistogramSnapshot.to_json на строку
+        """
+        opener = gzip.open if str(file_path).endswith(".gz") else open
+        with opener(file_path, "rt", encoding="utf-8") as f:
+            return [HistogramSnapshot.from_json(json.loads(line)) for line in f if line.strip()]
+
+    @staticmethod
+    def _fill_sales_per_day(records: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        """
+            Количество продаж в день известно не при каждой записи; пропуски заполняются ближайшим
+            известным значением предмета (сначала предыдущим, затем следующим), предметы без него отбрасываются
+        """
+        by_item = defaultdict(list)
+        for record in records:
+            by_item[record["item_name"]].append(record)
+
+        filled = []
+        for item_records in by_item.values():
+            item_records.sort(key=lambda r: r["timestamp"])
+            known = [r["sales_per_day"] for r in item_records if r.get("sales_per_day") is not None]
+            if not known:
+                continue
+            last_known = known[0]
+            for record in item_records:
+                if record.get("sales_per_day") is None:
+                    record["sales_per_day"] = last_known
+                last_known = record["sales_per_day"]
+                filled.append(record)
+        return filled
+
+    @classmethod
+    def load_recorded_snapshots(
+            cls, dir_path: str | Path, start: float | None = None, end: float | None = None
+    ) -> list[HistogramSnapshot]:
+        """
+            Снимки из хранилища HistogramRecorder за [start, end] (unix-время).
+            dir_path - каталог хранилища одной игры или общий каталог с каталогами игр
+        """
+        dir_path = Path(dir_path)
+        store_paths = [dir_path] if (dir_path / HistogramRecorder.INDEX_FILE_NAME).exists() else sorted(
+            path.parent for path in dir_path.glob(f"*/{HistogramRecorder.INDEX_FILE_NAME}"))
+
+        records = []
+        for store_path in store_paths:
+            records.extend(HistogramRecorder(store_path).iter_range(start, end))
+        return [HistogramSnapshot.from_json(record) for record in cls._fill_sales_per_day(records)]
+
+    @staticmethod
+    def replay_ledger(
+            ledger_file_path: str | Path, start: date, end: date, app_ids: set[str] | None = None
+    ) -> (dict[str, list], float | None):
+        """
+            Прогнать журнал истории торговой площадки по FIFO, как в сводке прибыли
+        :return: Лоты, купленные до start и не проданные к нему (начальный инвентарь),
+            и прибыль реальных продаж в [start, end] для сравнения (None, если журнала нет)
+        """
+        if not Path(ledger_file_path).exists():
+            return {}, None
+
+        queues: dict[str, FifoLotQueue] = defaultdict(FifoLotQueue)
+        starting_lots = None
+        realized_profit = 0.0
+        with MarketHistoryLedger(ledger_file_path) as ledger:
+            for record, full_date in ledger.iter_records():
+                if full_date > end:
+                    break
+                if app_ids and record.app_id not in app_ids:
+                    continue
+                if starting_lots is None and full_date >= start:
+                    starting_lots = {name: queue.to_list() for name, queue in queues.items() if len(queue)}
+
+                queue = queues[record.item_hash_name]
+                if record.is_purchase:
+                    queue.push(record.price, record.count)
+                    continue
+                bought_price, matched_count = queue.consume(record.count)
+                if matched_count and full_date >= start:
+                    realized_profit += record.price * matched_count / record.count - bought_price
+
+        if starting_lots is None:
+            starting_lots = {name: queue.to_list() for name, queue in queues.items() if len(queue)}
+        return starting_lots, round(realized_profit, 2)
+
+    @classmethod
+    def from_files(
+            cls,
+            snapshots_file_path: str | Path,
+            ledger_file_path: str | Path = "data/market_history/ledger.sqlite3",
+            **kwargs
+    ) -> ('BacktestEngine', float | None):
+        """
+            Движок по файлу снимков или каталогу HistogramRecorder;
+            начальный инвентарь берётся из журнала истории торговой площадки
+        :return: Движок и прибыль реальных продаж за период снимков (None, если журнала нет)
+        """
+        if Path(snapshots_file_path).is_dir():
+            snapshots = cls.load_recorded_snapshots(snapshots_file_path)
+        else:
+            snapshots = cls.load_snapshots(snapshots_file_path)
+        engine = cls(snapshots, **kwargs)
+        if not (period := engine.period):
+            return engine, None
+        engine.starting_lots, realized_profit = cls.replay_ledger(ledger_file_path, *period, engine.app_ids)
+        return engine, realized_profit
+
+    @staticmethod
+    def settings_grid(grid: dict[str, list], base_settings: dict[str, Any] | None = None) -> list[dict[str, Any]]:
+        """
+            Все сочетания значений сетки поверх базовых настроек
+        :param grid: Значения для перебора по названию настройки, например {"reduction": [0.01, 0.03]}
+        """
+        keys = list(grid)
+        return [
+            {**(base_settings or {}), **dict(zip(keys, values))}
+            for values in itertools.product(*(grid[key] for key in keys))
+        ]
+
+    def _simulate_item(
+            self,
+            price_analysis: PriceAnalysis,
+            item_name: str,
+            timeline: list[HistogramSnapshot],
+            pricing: dict[tuple[str, int], ItemPricing],
+            result: BacktestResult
+    ) -> None:
+        lots = FifoLotQueue(self.starting_lots.get(item_name))
+        buy_price = None
+        buy_remaining = 0
+        sell_price = None
+        buy_volume = sell_volume = 0.0
+        traded = False
+
+        for i, snapshot in enumerate(timeline):
+            item_pricing = pricing[(item_name, i)]
+
+            # Решения по снимку - как в update_buy_orders, update_sell_orders и sell_inventory
+            if buy_price is not None:
+                profit = item_pricing.actual_sell_price * Config.WITH_COMMISSION / buy_price - 1
+                if not price_analysis.is_buy_order_profit_relevant(profit, snapshot.sales_per_day):
+                    buy_price = None
+            if buy_price is None and item_pricing.recommended_buy_price:
+                buy_price, buy_remaining = item_pricing.recommended_buy_price, self.order_quantity
+            sell_price = item_pricing.recommended_sell_price if item_pricing.recommended_sell_price > 0 else None
+
+            if i + 1 == len(timeline):
+                break
+
+            # Исполнение до следующего снимка
+            next_snapshot = timeline[i + 1]
+            volume = snapshot.sales_per_day * self.fill_share * \
+                (next_snapshot.timestamp - snapshot.timestamp) / self.SECONDS_PER_DAY
+
+            best_buy_price = next_snapshot.best_buy_price
+            if buy_price is not None and (best_buy_price is None or buy_price >= best_buy_price):
+                buy_volume += volume
+                if filled := min(buy_remaining, int(buy_volume)):
+                    buy_volume -= filled
+                    buy_remaining -= filled
+                    lots.push(buy_price * filled, filled)
+                    result.bought_count += filled
+                    result.sum_bought += buy_price * filled
+                    traded = True
+                    if not buy_remaining:
+                        buy_price = None
+            else:
+                buy_volume = 0.0
+
+            best_sell_price = next_snapshot.best_sell_price
+            if sell_price is not None and len(lots) and (best_sell_price is None or sell_price <= best_sell_price):
+                sell_volume += volume
+                if count := int(sell_volume):
+                    bought_price, sold = lots.consume(count)
+                    sell_volume -= sold
+                    if sold:
+                        income = sell_price * Config.WITH_COMMISSION * sold
+                        result.sold_count += sold
+                        result.sum_sold += income
+                        result.realized_profit += income - bought_price
+                        traded = True
+            else:
+                sell_volume = 0.0
+
+        result.open_count += lots.total_count
+        result.open_cost += sum(price for price, _ in lots)
+        result.traded_items += traded
+
+    def run(self, settings: dict[str, Any]) -> BacktestResult:
+        """
+            Прогнать один набор настроек по всем снимкам
+        """
+        price_analysis = PriceAnalysis(settings)
+        pricing = price_analysis.price_items(self._pricing_inputs)
+
+        result = BacktestResult(settings=dict(settings))
+        for item_name, timeline in self.timelines.items():
+            self._simulate_item(price_analysis, item_name, timeline, pricing, result)
+
+        result.sum_bought = round(result.sum_bought, 2)
+        result.sum_sold = round(result.sum_sold, 2)
+        result.realized_profit = round(result.realized_profit, 2)
+        result.open_cost = round(result.open_cost, 2)
+        return result
+
+    def run_grid(
+            self, settings_list: list[dict[str, Any]], workers: int = Config.BACKTEST_WORKERS
+    ) -> list[BacktestResult]:
+        """
+            Прогнать наборы настроек, при workers > 1 - в пуле процессов
+        :return: Результаты в порядке settings_list
+        """
+        if workers <= 1 or len(settings_list) < 2:
+            return [self.run(settings) for settings in settings_list]
+
+        workers = min(workers, len(settings_list))
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(self,)) as executor:
+            return list(executor.map(
+                _run_in_worker, settings_list, chunksize=max(1, len(settings_list) // (workers * 4))))
@@ -0,0 +1,26 @@
+from dataclasses import dataclass, field
+from typing import Any
+
+
+@dataclass
+class BacktestResult:
+    """
+        Итог прогона одного набора настроек PriceAnalysis
+    """
+    settings: dict[str, Any] = field(default_factory=dict)
+    bought_count: int = 0
+    sold_count: int = 0
+    sum_bought: float = 0.0
+    sum_sold: float = 0.0  # выручка за вычетом комиссии
+    realized_profit: float = 0.0  # по FIFO, только по проданному
+    open_count: int = 0  # осталось в инвентаре к концу периода
+    open_cost: float = 0.0
+    traded_items: int = 0
+
+    @property
+    def turnover(self) -> float:
+        return round(self.sum_bought + self.sum_sold, 2)
+
+    @property
+    def profit_per_turnover(self) -> float:
+        return round(self.realized_profit / self.turnover, 4) if self.turnover else 0.0
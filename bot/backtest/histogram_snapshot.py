@@ -0,0 +1,54 @@
+from dataclasses import dataclass
+from typing import Any
+
+from bot.price_analysis import OrderBook
+
+
+@dataclass(slots=True)
+class HistogramSnapshot:
+    """
+        Записанный ответ 'itemordershistogram' предмета вместе с количеством продаж в день на момент записи
+    """
+    app_id: int
+    item_name: str
+    timestamp: float  # unix-время записи
+    sales_per_day: int
+    order_book: OrderBook
+
+    @property
+    def best_sell_price(self) -> float | None:
+        return float(self.order_book.sell_prices[0]) if self.order_book.sell_prices.size else None
+
+    @property
+    def best_buy_price(self) -> float | None:
+        return float(self.order_book.buy_prices[0]) if self.order_book.buy_prices.size else None
+
+    @classmethod
+    def from_json(cls, saved: dict[str, Any]) -> 'HistogramSnapshot':
+        """
+        :param saved: Запись с полями app_id, item_name, timestamp, sales_per_day
+            и графиками 'sell_order_graph' и 'buy_order_graph' в формате 'itemordershistogram'
+        """
+        return cls(
+            app_id=int(saved["app_id"]),
+            item_name=saved["item_name"],
+            timestamp=float(saved["timestamp"]),
+            sales_per_day=int(saved["sales_per_day"]),
+            order_book=OrderBook.from_market_data(saved)
+        )
+
+    def to_json(self) -> dict[str, Any]:
+        return {
+            "app_id": self.app_id,
+            "item_name": self.item_name,
+            "timestamp": self.timestamp,
+            "sales_per_day": self.sales_per_day,
+            "sell_order_graph": [
+                [float(price), int(depth)]
+                for price, depth in zip(self.order_book.sell_prices, self.order_book.sell_depth)
+            ],
+            "buy_order_graph": [
+                [float(price), int(depth)]
+                for price, depth in zip(self.order_book.buy_prices, self.order_book.buy_depth)
+            ]
+        }
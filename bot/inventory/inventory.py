@@ -7,8 +7,9 @@ from bot.inventory.inventory_item import InventoryItem
 from tools.rate_limiter import rate_limited
 from tools import BasicLogger
 from utils.web_utils import api_request
+from utils.revalidation_cache import RevalidationCache
 
-from enums import Urls
+from enums import Urls, Host, EndpointClass
 
 
 class Inventory(BasicLogger):
@@ -26,7 +27,10 @@ class Inventory(BasicLogger):
         self.app_id = app_id
         self.context_id = context_id
 
-    @rate_limited(2)
+        # Страницы инвентаря обычно не меняются между итерациями, поэтому запрашиваются условно (ETag)
+        self.revalidation_cache = RevalidationCache()
+
+    @rate_limited(Host.COMMUNITY, EndpointClass.INVENTORY)
     def get_inventory_page(
             self, session: requests.Session, count: int, start_asset_id: str = None,
             max_attempts: int = 10, sleep_time: int = 2
@@ -43,7 +47,8 @@ class Inventory(BasicLogger):
                 "GET",
                 f"{Urls.INVENTORY}/{os.getenv('STEAM_ID')}/{self.app_id}/{self.context_id}",
                 params=params,
-                logger=self.logger
+                logger=self.logger,
+                revalidation_cache=self.revalidation_cache
             )
             if result.status_code == 200 or result.status_code != 500:
                 return result
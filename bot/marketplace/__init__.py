@@ -1,7 +1,9 @@
 from .marketplace import Marketplace
+from .histogram_recorder import HistogramRecorder
 from .marketplace_item_parser import *
 
 __all__ = [
     "Marketplace",
+    "HistogramRecorder",
     *marketplace_item_parser.__all__
 ]
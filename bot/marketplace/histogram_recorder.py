@@ -0,0 +1,152 @@
+import gzip
+import json
+import time
+import threading
+from bisect import bisect_left, bisect_right
+from pathlib import Path
+from typing import Any, Iterator
+
+
+class HistogramRecorder:
+    """
+        Запись ответов 'itemordershistogram' для локальных наборов данных (бэктест, калибровка, разбор ошибок).
+
+        Хранилище только дописывается и состоит из двух файлов в каталоге:
+        - snapshots.gz - по одному gzip-элементу (member) на запись; склейка элементов - обычный gzip-поток,
+          а каждый элемент распаковывается и сам по себе, поэтому запись читается по смещению без соседних;
+        - index.tsv - строка на запись: предмет, item_nameid, время, смещение и длина элемента в snapshots.gz.
+        По индексу в памяти строятся списки записей каждого предмета, упорядоченные по времени,
+        и выборка за интервал находится двоичным поиском.
+
+        Элемент дописывается раньше строки индекса: при сбое между ними остаются лишние байты, на которые
+        ничего не ссылается, а недописанная строка индекса при загрузке пропускается
+    """
+    DATA_FILE_NAME: str = "snapshots.gz"
+    INDEX_FILE_NAME: str = "index.tsv"
+
+    def __init__(self, dir_path: str | Path) -> None:
+        self.dir_path = Path(dir_path)
+        self.data_path = self.dir_path / self.DATA_FILE_NAME
+        self.index_path = self.dir_path / self.INDEX_FILE_NAME
+        self._lock = threading.Lock()
+        # Предмет -> (время записей по возрастанию, (смещение, длина) в том же порядке)
+        self._index: dict[str, tuple[list[float], list[tuple[int, int]]]] = {}
+        self._item_nameids: dict[str, int | None] = {}
+        self._load_index()
+
+    def _add_to_index(self, item_name: str, timestamp: float, offset: int, length: int) -> None:
+        timestamps, locations = self._index.setdefault(item_name, ([], []))
+        if not timestamps or timestamp >= timestamps[-1]:
+            timestamps.append(timestamp)
+            locations.append((offset, length))
+            return
+        position = bisect_right(timestamps, timestamp)
+        timestamps.insert(position, timestamp)
+        locations.insert(position, (offset, length))
+
+    def _load_index(self) -> None:
+        if not self.index_path.exists():
+            return
+        with open(self.index_path, "r", encoding="utf-8") as f:
+            for line in f:
+                fields = line.rstrip("\n").split("\t")
+                if len(fields) != 5:
+                    continue
+                item_name, item_nameid, timestamp, offset, length = fields
+                try:
+                    self._add_to_index(item_name, float(timestamp), int(offset), int(length))
+                except ValueError:
+                    continue
+                self._item_nameids[item_name] = int(item_nameid) if item_nameid else None
+
+    @staticmethod
+    def _graph(market_data: dict[str, Any], key: str) -> list[list]:
+        """
+            Из графика сохраняются только цена и накопительное количество, без текстовой подписи
+        """
+        return [[level[0], level[1]] for level in market_data.get(key) or ()]
+
+    def record(
+            self,
+            app_id: int,
+            item_name: str,
+            item_nameid: int | None,
+            market_data: dict[str, Any],
+            sales_per_day: int | None = None,
+            timestamp: float | None = None
+    ) -> None:
+        """
+            Дописать снимок 'itemordershistogram' предмета
+        :param sales_per_day: Количество продаж в день, если уже известно
+        """
+        timestamp = time.time() if timestamp is None else timestamp
+        snapshot = {
+            "app_id": app_id,
+            "item_name": item_name,
+            "item_nameid": item_nameid,
+            "timestamp": timestamp,
+            "sales_per_day": sales_per_day,
+            "sell_order_graph": self._graph(market_data, "sell_order_graph"),
+            "buy_order_graph": self._graph(market_data, "buy_order_graph")
+        }
+        member = gzip.compress(json.dumps(snapshot, ensure_ascii=False).encode("utf-8"), mtime=0)
+        item_name_field = item_name.replace("\t", " ").replace("\n", " ")
+
+        with self._lock:
+            self.dir_path.mkdir(parents=True, exist_ok=True)
+            with open(self.data_path, "ab") as f:
+                offset = f.seek(0, 2)
+                f.write(member)
+            with open(self.index_path, "a", encoding="utf-8") as f:
+                f.write(f"{item_name_field}\t{item_nameid or ''}\t{timestamp!r}\t{offset}\t{len(member)}\n")
+            self._add_to_index(item_name_field, timestamp, offset, len(member))
+            self._item_nameids[item_name_field] = item_nameid
+
+    @property
+    def item_names(self) -> list[str]:
+        return list(self._index)
+
+    def item_nameid(self, item_name: str) -> int | None:
+        return self._item_nameids.get(item_name)
+
+    def __len__(self) -> int:
+        return sum(len(timestamps) for timestamps, _ in self._index.values())
+
+    def _locations(self, item_name: str, start: float | None, end: float | None) -> list[tuple[int, int]]:
+        if item_name not in self._index:
+            return []
+        timestamps, locations = self._index[item_name]
+        low = 0 if start is None else bisect_left(timestamps, start)
+        high = len(timestamps) if end is None else bisect_right(timestamps, end)
+        return locations[low:high]
+
+    def read(self, item_name: str, start: float | None = None, end: float | None = None) -> list[dict[str, Any]]:
+        """
+            Снимки предмета за [start, end] (unix-время, границы необязательны) по возрастанию времени
+        """
+        with self._lock:
+            locations = self._locations(item_name, start, end)
+        return list(self._read_locations(locations))
+
+    def iter_range(
+            self, start: float | None = None, end: float | None = None, item_names: list[str] | None = None
+    ) -> Iterator[dict[str, Any]]:
+        """
+            Снимки всех (или указанных) предметов за [start, end]. Записи читаются в порядке
+            расположения в файле, то есть в порядке записи
+        """
+        with self._lock:
+            locations = [
+                location
+                for item_name in (self._index if item_names is None else item_names)
+                for location in self._locations(item_name, start, end)
+            ]
+        yield from self._read_locations(sorted(locations))
+
+    def _read_locations(self, locations: list[tuple[int, int]]) -> Iterator[dict[str, Any]]:
+        if not locations:
+            return
+        with open(self.data_path, "rb") as f:
+            for offset, length in locations:
+                f.seek(offset)
+                yield json.loads(gzip.decompress(f.read(length)))
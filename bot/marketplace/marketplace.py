@@ -1,3 +1,5 @@
+import time
+import threading
 from typing import Any
 
 import requests
@@ -6,9 +8,11 @@ from urllib.parse import quote
 
 from tools.file_managers.item_manager import ItemManager
 from tools.rate_limiter import rate_limited
-from enums import Config, Urls
+from enums import Config, Urls, Host, EndpointClass
 from tools import BasicLogger
 from utils.web_utils import api_request
+from utils.revalidation_cache import RevalidationCache
+from bot.marketplace.histogram_recorder import HistogramRecorder
 
 
 class Marketplace(BasicLogger):
@@ -33,12 +37,54 @@ class Marketplace(BasicLogger):
         self.cache_sales_per_day_filename = f"data/sales_per_day_cache/{self.app_id}.dill"
         self.cache_sales_per_day = CustomTTLCache.load_cache(
             self.cache_sales_per_day_filename, maxsize=1000, ttl=24*60*60)
+        # Данные 'itemordershistogram', общие для этапов одного цикла (sell orders, inventory, buy orders)
+        self.cache_market_data_filename = f"data/market_data_cache/{self.app_id}_market_data.dill"
+        self.cache_market_data = CustomTTLCache.load_cache(
+            self.cache_market_data_filename, maxsize=1000, ttl=Config.MARKET_DATA_CACHE_TTL, timer=time.time)
+        self._cache_lock = threading.Lock()
+
+        self.revalidation_cache = RevalidationCache(maxsize=1000)
+
+        # Запись полученных 'itemordershistogram' для бэктеста (включается в Config)
+        self.histogram_recorder = HistogramRecorder(
+            f"{Config.HISTOGRAM_RECORDER_DIR}/{self.app_id}") if Config.RECORD_HISTOGRAMS else None
 
     def save_cache_sales_per_day(self):
-        self.cache_sales_per_day.save_cache(self.cache_sales_per_day_filename)
+        with self._cache_lock:
+            self.cache_sales_per_day.save_cache(self.cache_sales_per_day_filename)
+
+    def save_cache_market_data(self):
+        with self._cache_lock:
+            self.cache_market_data.save_cache(self.cache_market_data_filename)
+
+    def _market_data_cache_key(self, item_name: str) -> tuple[int, int | None, int]:
+        return self.app_id, self.item_manager.items.get(item_name), self.currency
+
+    def invalidate_item_market_data(self, item_name: str) -> None:
+        """
+            Удалить из кэша данные 'itemordershistogram' предмета (после выставления или снятия ордера)
+        """
+        with self._cache_lock:
+            self.cache_market_data.pop(self._market_data_cache_key(item_name), None)
 
-    @rate_limited(6)
-    def get_item_market_data(self, session: requests.Session, item_name: str) -> requests.Response | None:
+    def get_item_market_data(self, session: requests.Session, item_name: str) -> dict[str, Any] | None:
+        """
+            Данные 'itemordershistogram' берутся из кэша, если они были получены не раньше
+            Config.MARKET_DATA_CACHE_TTL секунд назад и с тех пор не было ордеров по этому предмету
+        """
+        key = self._market_data_cache_key(item_name)
+        with self._cache_lock:
+            if key in self.cache_market_data:
+                return self.cache_market_data[key]
+
+        market_data = self._request_item_market_data(session, item_name)
+        if market_data:
+            with self._cache_lock:
+                self.cache_market_data[key] = market_data
+        return market_data
+
+    @rate_limited(Host.COMMUNITY, EndpointClass.MARKET_DATA)
+    def _request_item_market_data(self, session: requests.Session, item_name: str) -> dict[str, Any] | None:
         params = {
             "country": "RU",
             "language": "russian",
@@ -55,16 +101,30 @@ class Marketplace(BasicLogger):
             params=params,
             logger=self.logger
         )
+        if response.status_code != 200:
+            return None
 
         market_data: dict[str, Any] = response.json()
         if market_data.get('sell_order_graph', None) and market_data.get('buy_order_graph', None):
-            return response
+            if self.histogram_recorder:
+                self._record_histogram(item_name, market_data)
+            return market_data
 
         return None
 
+    def _record_histogram(self, item_name: str, market_data: dict[str, Any]) -> None:
+        with self._cache_lock:
+            sales_per_day = self.cache_sales_per_day.get(item_name)
+        try:
+            self.histogram_recorder.record(
+                self.app_id, item_name, self.item_manager.items.get(item_name), market_data, sales_per_day)
+        except OSError as e:
+            self.logger.error(f"Histogram recorder '{item_name}': {e}")
+
     def get_sales_per_day(self, session: requests.Session, item_name: str) -> int | None:
-        if item_name in self.cache_sales_per_day:
-            return self.cache_sales_per_day[item_name]
+        with self._cache_lock:
+            if item_name in self.cache_sales_per_day:
+                return self.cache_sales_per_day[item_name]
 
         response = self.get_item_public_info(session, item_name)
         if response.status_code != 200:
@@ -72,13 +132,14 @@ class Marketplace(BasicLogger):
 
         try:
             sales_per_day = int(response.json().get('volume').replace(",", ""))
-            self.cache_sales_per_day[item_name] = sales_per_day
+            with self._cache_lock:
+                self.cache_sales_per_day[item_name] = sales_per_day
         except Exception:
             return 1
 
         return sales_per_day if sales_per_day > 0 else 1
 
-    @rate_limited(6)
+    @rate_limited(Host.COMMUNITY, EndpointClass.MARKET_DATA)
     def get_item_public_info(self, session: requests.Session, item_name: str) -> requests.Response:
         params = {
             "currency": self.currency,
@@ -93,10 +154,11 @@ class Marketplace(BasicLogger):
                 "Referer": f"{Urls.MARKET}/listings/{self.app_id}/{item_name}"
             },
             params=params,
-            logger=self.logger
+            logger=self.logger,
+            revalidation_cache=self.revalidation_cache
         )
 
-    @rate_limited(1)
+    @rate_limited(Host.COMMUNITY, EndpointClass.MARKET_ACTION)
     def create_buy_order(
             self, session: requests.Session,
             item_name: str, price: float, quantity: int, confirmation_id: str = '0'
@@ -124,7 +186,7 @@ class Marketplace(BasicLogger):
             logger=self.logger
         )
 
-    @rate_limited(1)
+    @rate_limited(Host.COMMUNITY, EndpointClass.MARKET_ACTION)
     def create_sell_order(
             self, session: requests.Session, steam_id: str, asset_id: int, amount: int, price: float
     ) -> requests.Response:
@@ -141,13 +203,13 @@ class Marketplace(BasicLogger):
             "POST",
             f"{Urls.MARKET}/sellitem/",
             headers={
-                "Referer": f"https://steamcommunity.com/id/{steam_id}/inventory"
+                "Referer": f"{Urls.COMMUNITY}/id/{steam_id}/inventory"
             },
             data=data,
             logger=self.logger
         )
 
-    @rate_limited(1)
+    @rate_limited(Host.COMMUNITY, EndpointClass.MARKET_ACTION)
     def cancel_sell_order(self, session: requests.Session, sell_listing_id: int) -> requests.Response:
         data = {
             'sessionid': session.cookies.get("sessionid", domain="steamcommunity.com")
@@ -163,7 +225,7 @@ class Marketplace(BasicLogger):
             logger=self.logger
         )
 
-    @rate_limited(1)
+    @rate_limited(Host.COMMUNITY, EndpointClass.MARKET_ACTION)
     def cancel_buy_order(self, session: requests.Session, buy_order_id: int) -> requests.Response:
         data = {
             'sessionid': session.cookies.get("sessionid", domain="steamcommunity.com"),
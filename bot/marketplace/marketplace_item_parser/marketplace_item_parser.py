@@ -1,22 +1,31 @@
 import re
 
 import bs4.element
+from typing import Iterator
+
 import requests
 from bs4 import BeautifulSoup
 
 from tools.rate_limiter import rate_limited
 from bot.marketplace.marketplace_item_parser.sell_order_item import SellOrderItem
 from bot.marketplace.marketplace_item_parser.buy_order_item import BuyOrderItem
-from enums import Urls
+from bot.marketplace.marketplace_item_parser.sell_order_row_parser import \
+    SellOrderRow, SellOrderRowParser, SellOrderRowParserType
+from enums import Config, Urls, Host, EndpointClass
 from tools import BasicLogger
 from utils.web_utils import api_request
+from utils.revalidation_cache import RevalidationCache
 
 
 class MarketplaceItemParser(BasicLogger):
-    def __init__(self, app_id: int, context_id: int) -> None:
+    def __init__(
+            self, app_id: int, context_id: int,
+            row_parser_type: SellOrderRowParserType | str = Config.SELL_ORDER_ROW_PARSER
+    ) -> None:
         """
         :param app_id: ID игры
         :param context_id: ID контекста
+        :param row_parser_type: Способ разбора HTML страницы 'sell order'
         """
         super().__init__(
             logger_name=f"{self.__class__.__name__}{app_id}",
@@ -30,12 +39,21 @@ class MarketplaceItemParser(BasicLogger):
         self.sell_orders: dict[str, list[SellOrderItem]] = {}
         self.buy_orders: dict[str, BuyOrderItem] = {}
 
-    @rate_limited(6)
-    def get_sell_orders_page(self, session: requests.Session) -> requests.Response:
+        self.sell_order_row_parser = SellOrderRowParser.from_type(row_parser_type)
+        # 'sell order' последнего полного обхода по order_id: цена лота не меняется, поэтому они не разбираются заново
+        self._sell_order_snapshot: dict[int, SellOrderItem] = {}
+        self.is_sell_orders_complete = False
+
+        self.revalidation_cache = RevalidationCache(maxsize=16)
+
+    @rate_limited(Host.COMMUNITY, EndpointClass.MARKET_LISTINGS)
+    def get_sell_orders_page(
+            self, session: requests.Session, start: int = 0, count: int = Config.SELL_ORDERS_PAGE_SIZE
+    ) -> requests.Response:
         params = {
             "query": "",
-            "start": 0,
-            "count": -1
+            "start": start,
+            "count": count
         }
         return api_request(
             session,
@@ -45,10 +63,11 @@ class MarketplaceItemParser(BasicLogger):
                 "Referer": Urls.MARKET,
             },
             params=params,
-            logger=self.logger
+            logger=self.logger,
+            revalidation_cache=self.revalidation_cache
         )
 
-    @rate_limited(6)
+    @rate_limited(Host.COMMUNITY, EndpointClass.MARKET_LISTINGS)
     def _get_buy_orders_page(self, session: requests.Session) -> requests.Response:
         return api_request(
             session,
@@ -60,88 +79,127 @@ class MarketplaceItemParser(BasicLogger):
             logger=self.logger
         )
 
-    @staticmethod
-    def _get_item_app_id_sell_order(element: bs4.element.Tag) -> int:
-        remove_button_link = element.find(
-            "a",
-            class_="item_market_action_button item_market_action_button_edit nodisable")
-        remove_button_href = remove_button_link.get("href", "")
-        return int(re.search(r"RemoveMarketListing\('mylisting', '\d+', (\d+),", remove_button_href).group(1))
-
     @staticmethod
     def _get_item_app_id_buy_order(element: bs4.element.Tag) -> int:
         item_page_link = element.find(
             "a",
             class_="market_listing_item_name_link")
         name_href = item_page_link.get("href", "")
-        return int(re.search(r"https://steamcommunity.com/market/listings/(\d+)", name_href).group(1))
+        return int(re.search(r"/market/listings/(\d+)", name_href).group(1))
 
-    @staticmethod
-    def _get_item_count(element: bs4.element.Tag) -> int:
-        market_listing_item_name_link = element.find(
-            "a",
-            class_="market_listing_item_name_link")
-        name_text = market_listing_item_name_link.text
-        count = name_text.split(" ")[0].replace(",", "")
-        if str.isdigit(count):
-            return int(count)
-        return 1
-
-    def parse_actual_sell_order_items(self, session: requests.Session) -> dict[str, list[SellOrderItem]] | None:
-        response = self.get_sell_orders_page(session)
-
-        if response.status_code != 200:
+    def _create_sell_order_item(self, row: SellOrderRow, assets: dict) -> SellOrderItem | None:
+        asset_info = assets.get(str(row.context_id), {}).get(row.asset_id)
+        if not asset_info:
+            self.logger.error(f"Sell order {row.order_id}: asset {row.asset_id} not found")
             return None
 
-        data = response.json()
-        html_content = data["results_html"]
-
-        sell_order_items = []
-
-        for _, asset_info in data.get("assets", {}).get(str(self.app_id), {}).get(str(self.context_id), {}).items():
-            item = SellOrderItem(app_id=self.app_id, context_id=self.context_id)
-            item.name = asset_info["market_hash_name"]
-            sell_order_items.append(item)
-
-        soup = BeautifulSoup(html_content, "html.parser")
-
-        i = 0
-        for element in soup.find_all("div", class_="market_listing_row"):
-            app_id = self._get_item_app_id_sell_order(element)
-            if app_id != self.app_id:
-                continue
+        return SellOrderItem(
+            app_id=self.app_id,
+            context_id=row.context_id,
+            name=asset_info["market_hash_name"],
+            count=row.count,
+            order_id=row.order_id,
+            buyer_price=row.buyer_price,
+            seller_price=row.seller_price,
+            creation_date=row.creation_date
+        )
 
-            order_id = int(element.get("id", "").split("_")[1])
-            try:
-                sell_order_items[i].order_id = order_id
-            except IndexError:
+    def iter_sell_order_items(
+            self, session: requests.Session, page_size: int = Config.SELL_ORDERS_PAGE_SIZE,
+            max_restarts: int = Config.SELL_ORDERS_MAX_RESTARTS
+    ) -> Iterator[SellOrderItem]:
+        """
+        Постранично получить выставленные 'sell order' текущей игры, выдавая их по мере загрузки страниц.
+        Строки других игр пропускаются без полного разбора, а 'sell order' из предыдущего полного обхода
+        берутся из него без разбора.
+
+        Если обход завершён полностью, обновляются sell_orders и is_sell_orders_complete;
+        если обход не удался (ошибка запроса или список постоянно меняется), sell_orders очищается,
+        чтобы по прежнему списку ничего не снималось и не выставлялось.
+        Вызывающий код может прервать обход раньше, если ему достаточно уже полученных 'sell order'.
+        Steam не фильтрует страницу по игре, поэтому для всех 'sell order' игры нужно обойти все страницы.
+
+        Если между страницами изменилось общее количество 'sell order' (лот продан или выставлен),
+        страницы сдвинулись и часть строк могла быть пропущена: обход начинается заново
+        (уже выданные 'sell order' повторно не выдаются). Если список меняется и после max_restarts
+        повторов, обход считается неполным.
+
+        :param page_size: Количество 'sell order' на странице (-1 - все одним запросом).
+            Steam может вернуть меньше строк, чем запрошено: следующая страница начинается после полученных строк
+        :param max_restarts: Сколько раз начинать обход заново при изменении списка
+        """
+        self.is_sell_orders_complete = False
+        previous_snapshot = self._sell_order_snapshot
+        yielded_order_ids: set[int] = set()
+
+        for _ in range(max_restarts + 1):
+            snapshot: dict[int, SellOrderItem] = {}
+            first_total_count = None
+            is_changed = False
+
+            start = 0
+            while True:
+                response = self.get_sell_orders_page(session, start, page_size)
+                if response.status_code != 200:
+                    self.sell_orders = {}
+                    return
+
+                data = response.json()
+                total_count = data.get("total_count", 0)
+                if first_total_count is None:
+                    first_total_count = total_count
+                elif total_count != first_total_count:
+                    is_changed = True
+                    break
+
+                # Если 'sell order' нет, Steam присылает пустой список вместо словаря
+                assets = data.get("assets") or {}
+                assets = assets.get(str(self.app_id), {}) if isinstance(assets, dict) else {}
+
+                rows = self.sell_order_row_parser.split_rows(data.get("results_html") or "")
+                for row in rows:
+                    order_id, app_id, _, _ = self.sell_order_row_parser.get_row_ids(row)
+                    if app_id != self.app_id or order_id in snapshot:
+                        continue
+
+                    item = previous_snapshot.get(order_id)
+                    if item is None:
+                        item = self._create_sell_order_item(self.sell_order_row_parser.parse_row(row), assets)
+                        if item is None:
+                            continue
+
+                    snapshot[order_id] = item
+                    if order_id not in yielded_order_ids:
+                        yielded_order_ids.add(order_id)
+                        yield item
+
+                start += len(rows)
+                if not rows or start >= total_count:
+                    break
+
+            if not is_changed:
                 break
-
-            buyer_price = element.find("span", title="This is the price the buyer pays.")
-            seller_price = element.find("span", title="This is how much you will receive.")
-            creation_date = element.find("div",
-                                         class_="market_listing_right_cell market_listing_listed_date can_combine")
-
-            count = self._get_item_count(element)
-            sell_order_items[i].count = count
-
-            sell_order_items[i].buyer_price = count * float(
-                buyer_price.get_text(strip=True).replace(",", ".").split()[0] if buyer_price else None
-            )
-            sell_order_items[i].seller_price = count * float(
-                seller_price.get_text(strip=True).replace(",", ".").replace("(", "").replace(")", "").split()[0]
-                if seller_price else None
-            )
-            sell_order_items[i].creation_date = creation_date.get_text(strip=True) if creation_date else None
-
-            i += 1
-
+            self.logger.info(f"Sell orders changed while paging ({first_total_count} -> {total_count}), restarting")
+            previous_snapshot = {**previous_snapshot, **snapshot}
+        else:
+            self.logger.error(f"Sell orders kept changing after {max_restarts} restarts, snapshot is incomplete")
+            self.sell_orders = {}
+            return
+
+        self._sell_order_snapshot = snapshot
         self.sell_orders = {}
-        for item in sell_order_items:
+        for item in snapshot.values():
             if not self.sell_orders.get(item.name):
                 self.sell_orders[item.name] = []
             self.sell_orders[item.name].append(item)
+        self.is_sell_orders_complete = True
 
+    def parse_actual_sell_order_items(self, session: requests.Session) -> dict[str, list[SellOrderItem]] | None:
+        for _ in self.iter_sell_order_items(session):
+            pass
+
+        if not self.is_sell_orders_complete:
+            return None
         return self.sell_orders
 
     def parse_actual_buy_order_items(self, session: requests.Session) -> dict[str, BuyOrderItem] | None:
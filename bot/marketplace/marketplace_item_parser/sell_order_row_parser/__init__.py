@@ -0,0 +1,9 @@
+from .sell_order_row_parser_type import SellOrderRowParserType
+from .sell_order_row import SellOrderRow
+from .sell_order_row_parser import SellOrderRowParser
+
+__all__ = [
+    "SellOrderRowParserType",
+    "SellOrderRow",
+    "SellOrderRowParser"
+]
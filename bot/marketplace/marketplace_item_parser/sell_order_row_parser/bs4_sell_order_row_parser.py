@@ -0,0 +1,33 @@
+import bs4.element
+from bs4 import BeautifulSoup
+
+from bot.marketplace.marketplace_item_parser.sell_order_row_parser.sell_order_row import SellOrderRow
+from bot.marketplace.marketplace_item_parser.sell_order_row_parser.sell_order_row_parser import SellOrderRowParser
+
+
+class Bs4SellOrderRowParser(SellOrderRowParser):
+    """
+        Разбор через BeautifulSoup (html.parser). Самый медленный, но не требует дополнительных зависимостей
+    """
+    def __init__(self, features: str = "html.parser") -> None:
+        self.features = features
+
+    def split_rows(self, html_content: str) -> list[bs4.element.Tag]:
+        soup = BeautifulSoup(html_content, self.features)
+        return soup.find_all("div", class_=self.ROW_CLASS)
+
+    def _get_remove_listing_call(self, row: bs4.element.Tag) -> str:
+        remove_button_link = row.find("a", class_=self.EDIT_BUTTON_CLASS)
+        return remove_button_link.get("href", "") if remove_button_link else ""
+
+    def parse_row(self, row: bs4.element.Tag) -> SellOrderRow:
+        buyer_price = row.find("span", title=self.BUYER_PRICE_TITLE)
+        seller_price = row.find("span", title=self.SELLER_PRICE_TITLE)
+        creation_date = row.find("div", class_=self.LISTED_DATE_CLASS)
+        return self._create_row(
+            row,
+            count=self._parse_count(row.find("a", class_=self.NAME_LINK_CLASS).text),
+            buyer_price=buyer_price.get_text(strip=True) if buyer_price else None,
+            seller_price=seller_price.get_text(strip=True) if seller_price else None,
+            creation_date=creation_date.get_text(strip=True) if creation_date else None
+        )
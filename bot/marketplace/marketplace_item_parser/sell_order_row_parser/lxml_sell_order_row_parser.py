@@ -0,0 +1,44 @@
+from lxml import html
+from lxml.etree import XPath, _Element
+
+from bot.marketplace.marketplace_item_parser.sell_order_row_parser.sell_order_row import SellOrderRow
+from bot.marketplace.marketplace_item_parser.sell_order_row_parser.sell_order_row_parser import SellOrderRowParser
+
+
+class LxmlSellOrderRowParser(SellOrderRowParser):
+    """
+        Разбор через lxml и XPath
+    """
+    def __init__(self) -> None:
+        self._rows_xpath = XPath(f'//div[contains(concat(" ", normalize-space(@class), " "), " {self.ROW_CLASS} ")]')
+        self._edit_href_xpath = XPath(f'.//a[@class="{self.EDIT_BUTTON_CLASS}"]/@href')
+        self._name_link_xpath = XPath(f'.//a[@class="{self.NAME_LINK_CLASS}"]')
+        self._listed_date_xpath = XPath(f'.//div[@class="{self.LISTED_DATE_CLASS}"]')
+        self._buyer_price_xpath = XPath(f'.//span[@title="{self.BUYER_PRICE_TITLE}"]')
+        self._seller_price_xpath = XPath(f'.//span[@title="{self.SELLER_PRICE_TITLE}"]')
+
+    @staticmethod
+    def _get_text(elements: list[_Element], strip: bool = True) -> str | None:
+        if not elements:
+            return None
+        if strip:
+            return "".join(text.strip() for text in elements[0].itertext())
+        return elements[0].text_content()
+
+    def split_rows(self, html_content: str) -> list[_Element]:
+        if not html_content.strip():
+            return []
+        return self._rows_xpath(html.fromstring(html_content))
+
+    def _get_remove_listing_call(self, row: _Element) -> str:
+        hrefs = self._edit_href_xpath(row)
+        return hrefs[0] if hrefs else ""
+
+    def parse_row(self, row: _Element) -> SellOrderRow:
+        return self._create_row(
+            row,
+            count=self._parse_count(self._get_text(self._name_link_xpath(row), strip=False)),
+            buyer_price=self._get_text(self._buyer_price_xpath(row)),
+            seller_price=self._get_text(self._seller_price_xpath(row)),
+            creation_date=self._get_text(self._listed_date_xpath(row))
+        )
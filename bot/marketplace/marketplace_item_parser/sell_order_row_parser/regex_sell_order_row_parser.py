@@ -0,0 +1,50 @@
+import re
+from html import unescape
+
+from bot.marketplace.marketplace_item_parser.sell_order_row_parser.sell_order_row import SellOrderRow
+from bot.marketplace.marketplace_item_parser.sell_order_row_parser.sell_order_row_parser import SellOrderRowParser
+
+
+class RegexSellOrderRowParser(SellOrderRowParser):
+    """
+        Разбор регулярными выражениями без построения дерева документа. Самый быстрый, но опирается
+        на текущую разметку Steam: строкой считается фрагмент от открывающего тега строки до следующей строки
+    """
+    _TAG_RE = re.compile(r"<[^>]+>")
+
+    def __init__(self) -> None:
+        self._row_start_re = re.compile(rf'<div[^>]*?\sclass="(?:[^"]*\s)?{self.ROW_CLASS}(?:\s[^"]*)?"[^>]*>')
+        # Шаблоны начинаются с уникального значения атрибута: поиск по литералу намного быстрее, чем перебор тегов
+        self._name_link_re = re.compile(
+            rf'class="{re.escape(self.NAME_LINK_CLASS)}"[^>]*>(.*?)</a>', re.S)
+        self._listed_date_re = re.compile(
+            rf'class="{re.escape(self.LISTED_DATE_CLASS)}"[^>]*>(.*?)</div>', re.S)
+        self._buyer_price_re = re.compile(
+            rf'title="{re.escape(self.BUYER_PRICE_TITLE)}"[^>]*>(.*?)</span>', re.S)
+        self._seller_price_re = re.compile(
+            rf'title="{re.escape(self.SELLER_PRICE_TITLE)}"[^>]*>(.*?)</span>', re.S)
+
+    def _get_text(self, pattern: re.Pattern, row: str, strip: bool = True) -> str | None:
+        match = pattern.search(row)
+        if not match:
+            return None
+        parts = self._TAG_RE.split(match.group(1))
+        if strip:
+            return "".join(unescape(part).strip() for part in parts)
+        return unescape("".join(parts))
+
+    def split_rows(self, html_content: str) -> list[str]:
+        starts = [match.start() for match in self._row_start_re.finditer(html_content)]
+        return [html_content[start:end] for start, end in zip(starts, starts[1:] + [len(html_content)])]
+
+    def _get_remove_listing_call(self, row: str) -> str:
+        return row
+
+    def parse_row(self, row: str) -> SellOrderRow:
+        return self._create_row(
+            row,
+            count=self._parse_count(self._get_text(self._name_link_re, row, strip=False)),
+            buyer_price=self._get_text(self._buyer_price_re, row),
+            seller_price=self._get_text(self._seller_price_re, row),
+            creation_date=self._get_text(self._listed_date_re, row)
+        )
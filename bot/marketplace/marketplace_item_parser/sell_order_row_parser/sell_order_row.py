@@ -0,0 +1,17 @@
+from dataclasses import dataclass
+
+
+@dataclass
+class SellOrderRow:
+    """
+        Данные одной строки 'sell order' со страницы mylistings.
+        Цены указаны за весь лот (за цену одного предмета, умноженную на count)
+    """
+    app_id: int
+    order_id: int
+    context_id: int = 0
+    asset_id: str | None = None
+    count: int = 1
+    buyer_price: float = 0
+    seller_price: float = 0
+    creation_date: str | None = None
@@ -0,0 +1,118 @@
+import re
+from abc import ABC, abstractmethod
+from typing import Any
+
+from bot.marketplace.marketplace_item_parser.sell_order_row_parser.sell_order_row import SellOrderRow
+from bot.marketplace.marketplace_item_parser.sell_order_row_parser.sell_order_row_parser_type import \
+    SellOrderRowParserType
+
+
+class SellOrderRowParser(ABC):
+    """
+        Разбор HTML страницы mylistings на строки 'sell order'.
+        Строки сначала выделяются (split_rows), затем у каждой дёшево определяются идентификаторы
+        (get_row_ids), и полностью разбираются (parse_row) только нужные строки
+    """
+    # RemoveMarketListing('mylisting', '<order_id>', <app_id>, '<context_id>', '<asset_id>')
+    REMOVE_LISTING_RE = re.compile(r"RemoveMarketListing\('mylisting', '(\d+)', (\d+), '(\d+)', '(\d+)'")
+
+    ROW_CLASS = "market_listing_row"
+    EDIT_BUTTON_CLASS = "item_market_action_button item_market_action_button_edit nodisable"
+    NAME_LINK_CLASS = "market_listing_item_name_link"
+    LISTED_DATE_CLASS = "market_listing_right_cell market_listing_listed_date can_combine"
+    BUYER_PRICE_TITLE = "This is the price the buyer pays."
+    SELLER_PRICE_TITLE = "This is how much you will receive."
+
+    @staticmethod
+    def from_type(parser_type: SellOrderRowParserType | str) -> 'SellOrderRowParser':
+        parser_type = SellOrderRowParserType(parser_type)
+
+        if parser_type is SellOrderRowParserType.REGEX:
+            from bot.marketplace.marketplace_item_parser.sell_order_row_parser.regex_sell_order_row_parser import \
+                RegexSellOrderRowParser
+            return RegexSellOrderRowParser()
+
+        if parser_type is SellOrderRowParserType.LXML:
+            from bot.marketplace.marketplace_item_parser.sell_order_row_parser.lxml_sell_order_row_parser import \
+                LxmlSellOrderRowParser
+            return LxmlSellOrderRowParser()
+
+        if parser_type is SellOrderRowParserType.HTML_PARSER:
+            from bot.marketplace.marketplace_item_parser.sell_order_row_parser.bs4_sell_order_row_parser import \
+                Bs4SellOrderRowParser
+            return Bs4SellOrderRowParser()
+
+        raise ValueError(f"Unknown SellOrderRowParserType: {parser_type}")
+
+    @abstractmethod
+    def split_rows(self, html_content: str) -> list[Any]:
+        """
+        Выделить строки 'sell order' в порядке их следования на странице
+        """
+        pass
+
+    @abstractmethod
+    def _get_remove_listing_call(self, row: Any) -> str:
+        """
+        Фрагмент строки, содержащий вызов RemoveMarketListing (ссылка кнопки снятия с продажи)
+        """
+        pass
+
+    def get_row_ids(self, row: Any) -> tuple[int, int, int, str]:
+        """
+        (order_id, app_id, context_id, asset_id) строки
+        """
+        match = self.REMOVE_LISTING_RE.search(self._get_remove_listing_call(row))
+        order_id, app_id, context_id, asset_id = match.groups()
+        return int(order_id), int(app_id), int(context_id), asset_id
+
+    def get_row_app_id(self, row: Any) -> int:
+        return self.get_row_ids(row)[1]
+
+    @abstractmethod
+    def parse_row(self, row: Any) -> SellOrderRow:
+        """
+        Полностью разобрать строку
+        """
+        pass
+
+    def parse_rows(self, html_content: str, app_id: int | None = None) -> list[SellOrderRow]:
+        """
+        :param app_id: Если задан, строки других игр пропускаются без полного разбора
+        """
+        result = []
+        for row in self.split_rows(html_content):
+            row_app_id = self.get_row_app_id(row)
+            if app_id is not None and row_app_id != app_id:
+                continue
+            result.append(self.parse_row(row))
+        return result
+
+    @staticmethod
+    def _parse_count(name_text: str) -> int:
+        # Для лотов из нескольких предметов название начинается с их количества: "5 Item Name"
+        count = name_text.split(" ")[0].replace(",", "")
+        if str.isdigit(count):
+            return int(count)
+        return 1
+
+    @staticmethod
+    def _parse_price(price_text: str | None) -> float:
+        if not price_text:
+            return 0
+        return float(price_text.replace(",", ".").replace("(", "").replace(")", "").split()[0])
+
+    def _create_row(
+            self, row: Any, count: int, buyer_price: str | None, seller_price: str | None, creation_date: str | None
+    ) -> SellOrderRow:
+        order_id, app_id, context_id, asset_id = self.get_row_ids(row)
+        return SellOrderRow(
+            app_id=app_id,
+            order_id=order_id,
+            context_id=context_id,
+            asset_id=asset_id,
+            count=count,
+            buyer_price=count * self._parse_price(buyer_price),
+            seller_price=count * self._parse_price(seller_price),
+            creation_date=creation_date
+        )
@@ -0,0 +1,7 @@
+from enum import Enum
+
+
+class SellOrderRowParserType(Enum):
+    REGEX = "regex"
+    LXML = "lxml"
+    HTML_PARSER = "html.parser"
@@ -1,5 +1,13 @@
 from .price_analysis import PriceAnalysis
+from .order_book import OrderBook
+from .order_book_batch import OrderBookBatch
+from .item_pricing_input import ItemPricingInput
+from .item_pricing import ItemPricing
 
 __all__ = [
-    "PriceAnalysis"
+    "PriceAnalysis",
+    "OrderBook",
+    "OrderBookBatch",
+    "ItemPricingInput",
+    "ItemPricing"
 ]
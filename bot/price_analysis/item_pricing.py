@@ -0,0 +1,12 @@
+from dataclasses import dataclass
+
+
+@dataclass(slots=True)
+class ItemPricing:
+    """
+        Результат пакетного расчёта цен для одного предмета
+    """
+    actual_sell_price: float  # с учётом собственных 'sell order'
+    recommended_sell_price: float
+    recommended_buy_price: float | None
+    is_buy_order_relevant: bool | None  # None, если 'buy order' по предмету нет
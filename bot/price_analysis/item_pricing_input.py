@@ -0,0 +1,24 @@
+from dataclasses import dataclass
+from typing import Any
+
+from bot.marketplace import SellOrderItem, BuyOrderItem
+from bot.price_analysis.order_book import OrderBook
+
+
+@dataclass(slots=True)
+class ItemPricingInput:
+    """
+        Данные одного предмета для пакетного расчёта цен (PriceAnalysis.price_items)
+    """
+    market_data: dict[str, Any] | OrderBook
+    sales_per_day: int
+    my_sell_orders: list[SellOrderItem] | None = None
+    my_buy_order: BuyOrderItem | None = None
+    max_number_prices_used: int | None = None  # None - sales_per_day // 2, как в TradeBot
+    allow_check_max_profit: bool = True
+
+    @property
+    def number_prices_used(self) -> int:
+        if self.max_number_prices_used is None:
+            return self.sales_per_day // 2
+        return self.max_number_prices_used
@@ -0,0 +1,107 @@
+from typing import Any
+
+import numpy as np
+
+
+class OrderBook:
+    """
+        Графики 'sell_order_graph' и 'buy_order_graph' из 'itemordershistogram' в виде массивов NumPy.
+        Количество в графиках Steam накопительное: на уровне цены указано число ордеров по этой цене
+        и всем более выгодным, поэтому массив количества - уже готовая глубина стакана.
+        Строится один раз на предмет, после чего поиск цен выполняется векторно, без цикла по уровням
+    """
+    __slots__ = ("sell_prices", "sell_depth", "buy_prices", "buy_depth")
+
+    def __init__(
+            self,
+            sell_prices: np.ndarray, sell_depth: np.ndarray,
+            buy_prices: np.ndarray, buy_depth: np.ndarray
+    ) -> None:
+        self.sell_prices = sell_prices
+        self.sell_depth = sell_depth
+        self.buy_prices = buy_prices
+        self.buy_depth = buy_depth
+
+    @staticmethod
+    def _graph_to_arrays(graph: list | None) -> (np.ndarray, np.ndarray):
+        prices, depth = [], []
+        for level in graph or ():
+            try:
+                price = float(level[0])
+                count = int(level[1])
+            except (TypeError, ValueError, IndexError):
+                continue
+            prices.append(price)
+            depth.append(count)
+        return np.array(prices, dtype=np.float64), np.array(depth, dtype=np.int64)
+
+    @classmethod
+    def from_market_data(cls, market_data: dict[str, Any]) -> 'OrderBook':
+        sell_prices, sell_depth = cls._graph_to_arrays(market_data.get('sell_order_graph'))
+        buy_prices, buy_depth = cls._graph_to_arrays(market_data.get('buy_order_graph'))
+        return cls(sell_prices, sell_depth, buy_prices, buy_depth)
+
+    @classmethod
+    def of(cls, market_data: 'dict[str, Any] | OrderBook') -> 'OrderBook':
+        """
+            Принимает как готовый OrderBook, так и ответ 'itemordershistogram'
+        """
+        if isinstance(market_data, cls):
+            return market_data
+        return cls.from_market_data(market_data)
+
+    @staticmethod
+    def _first_index(mask: np.ndarray) -> int | None:
+        """
+            Индекс первого True или None
+        """
+        idx = int(mask.argmax()) if mask.size else 0
+        return idx if mask.size and mask[idx] else None
+
+    def own_sell_depth(self, my_prices: np.ndarray, my_counts: np.ndarray) -> np.ndarray:
+        """
+            Накопительное количество собственных 'sell order' на каждом уровне стакана продажи
+        :param my_prices: Различные цены собственных ордеров (по возрастанию)
+        :param my_counts: Количество собственных ордеров по каждой цене
+        """
+        if not my_prices.size or not self.sell_prices.size:
+            return np.zeros(self.sell_prices.size, dtype=np.int64)
+        idx = np.minimum(np.searchsorted(my_prices, self.sell_prices), my_prices.size - 1)
+        matched = my_prices[idx] == self.sell_prices
+        return np.cumsum(np.where(matched, my_counts[idx], 0))
+
+    def is_own_sell_level(self, my_prices: np.ndarray) -> np.ndarray:
+        return np.isin(self.sell_prices, my_prices)
+
+    def median_sell_price(self, min_depth: int, my_prices: np.ndarray, my_counts: np.ndarray) -> float:
+        """
+            Первая цена, до которой (включительно) выставлено не меньше min_depth чужих 'sell order';
+            если такой нет - самая высокая цена графика
+        """
+        if not self.sell_prices.size:
+            return 0
+        available_depth = self.sell_depth - self.own_sell_depth(my_prices, my_counts)
+        idx = self._first_index(available_depth >= min_depth)
+        return float(self.sell_prices[-1 if idx is None else idx])
+
+    def first_available_sell_price(self, min_price: float, my_prices: np.ndarray) -> float:
+        """
+            Первая цена не ниже min_price, по которой нет собственных 'sell order'
+        """
+        idx = self._first_index((self.sell_prices >= min_price) & ~self.is_own_sell_level(my_prices))
+        return 0 if idx is None else float(self.sell_prices[idx])
+
+    def first_buy_price(self) -> float:
+        return float(self.buy_prices[0])
+
+    def available_buy_price(self, max_depth: int) -> float:
+        """
+            Цена уровня перед первым, на котором 'buy order' больше max_depth (или самого этого уровня,
+            если он первый); 0, если такого уровня нет
+        """
+        idx = self._first_index(self.buy_depth > max_depth)
+        if idx is None:
+            return 0
+        if idx > 0 and self.buy_prices[idx - 1] != 0:
+            return float(self.buy_prices[idx - 1])
+        return float(self.buy_prices[idx])
@@ -0,0 +1,127 @@
+import numpy as np
+
+from bot.price_analysis.order_book import OrderBook
+
+
+class OrderBookBatch:
+    """
+        Стаканы нескольких предметов, склеенные в общие массивы. Границы предметов задаются смещениями:
+        уровни предмета i - [offsets[i], offsets[i + 1]). Поиск цен выполняется сразу для всех предметов:
+        первый подходящий уровень каждого предмета находится двоичным поиском по индексам подходящих уровней
+    """
+    __slots__ = (
+        "size",
+        "sell_prices", "sell_depth", "sell_offsets", "sell_item_ids",
+        "buy_prices", "buy_depth", "buy_offsets", "buy_item_ids"
+    )
+
+    def __init__(self, order_books: list[OrderBook]) -> None:
+        self.size = len(order_books)
+        self.sell_prices, self.sell_depth, self.sell_offsets, self.sell_item_ids = self._concat(
+            [book.sell_prices for book in order_books], [book.sell_depth for book in order_books])
+        self.buy_prices, self.buy_depth, self.buy_offsets, self.buy_item_ids = self._concat(
+            [book.buy_prices for book in order_books], [book.buy_depth for book in order_books])
+
+    @staticmethod
+    def _concat(
+            prices: list[np.ndarray], depth: list[np.ndarray]
+    ) -> (np.ndarray, np.ndarray, np.ndarray, np.ndarray):
+        lengths = np.array([p.size for p in prices], dtype=np.int64)
+        offsets = np.zeros(lengths.size + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+        return (
+            np.concatenate(prices) if prices else np.empty(0, dtype=np.float64),
+            np.concatenate(depth) if depth else np.empty(0, dtype=np.int64),
+            offsets,
+            np.repeat(np.arange(lengths.size), lengths)
+        )
+
+    @staticmethod
+    def _first_in_segments(mask: np.ndarray, offsets: np.ndarray) -> (np.ndarray, np.ndarray):
+        """
+            Индекс первого True в каждом сегменте
+        :return: Индексы (в общем массиве) и признак, что такой уровень есть
+        """
+        true_idx = np.flatnonzero(mask)
+        if not true_idx.size:
+            return offsets[:-1].copy(), np.zeros(offsets.size - 1, dtype=bool)
+        pos = np.searchsorted(true_idx, offsets[:-1])
+        idx = true_idx[np.minimum(pos, true_idx.size - 1)]
+        return idx, (pos < true_idx.size) & (idx < offsets[1:])
+
+    def _segment_cumsum(self, values: np.ndarray) -> np.ndarray:
+        total = np.concatenate(([0], np.cumsum(values)))
+        return total[1:] - total[self.sell_offsets[:-1]][self.sell_item_ids]
+
+    def own_sell_levels(
+            self, my_item_ids: np.ndarray, my_prices: np.ndarray) -> (np.ndarray, np.ndarray):
+        """
+            Собственные 'sell order' на уровнях стакана продажи
+        :param my_item_ids: Номер предмета для каждого собственного ордера
+        :param my_prices: Цена каждого собственного ордера
+        :return: Признак уровня с собственными ордерами и их накопительное количество на каждом уровне
+        """
+        if not my_prices.size or not self.sell_prices.size:
+            return np.zeros(self.sell_prices.size, dtype=bool), np.zeros(self.sell_prices.size, dtype=np.int64)
+
+        # Цены сравниваются точно: вещественные цены заменяются номерами в общем отсортированном наборе
+        codes = np.unique(np.concatenate((self.sell_prices, my_prices)), return_inverse=True)[1].ravel()
+        codes_count = int(codes.max()) + 1
+        level_keys = self.sell_item_ids * codes_count + codes[:self.sell_prices.size]
+        my_keys, my_counts = np.unique(my_item_ids * codes_count + codes[self.sell_prices.size:], return_counts=True)
+
+        pos = np.minimum(np.searchsorted(my_keys, level_keys), my_keys.size - 1)
+        is_own_level = my_keys[pos] == level_keys
+        return is_own_level, self._segment_cumsum(np.where(is_own_level, my_counts[pos], 0))
+
+    def actual_sell_prices(
+            self,
+            min_depth: np.ndarray,
+            acceptable_price_diff: float,
+            is_own_level: np.ndarray | None = None,
+            own_depth: np.ndarray | None = None
+    ) -> np.ndarray:
+        """
+            То же, что PriceAnalysis.get_actual_sell_order_price, для всех предметов сразу
+        :param min_depth: Для каждого предмета - сколько чужих ордеров должно быть до медианной цены
+        """
+        prices = self.sell_prices
+        if not prices.size:
+            return np.zeros(self.size)
+
+        # Медианная цена; если порог не достигнут - последний уровень, у предмета без уровней - 0
+        has_levels = self.sell_offsets[1:] > self.sell_offsets[:-1]
+        available_depth = self.sell_depth if own_depth is None else self.sell_depth - own_depth
+        idx, found = self._first_in_segments(available_depth >= min_depth[self.sell_item_ids], self.sell_offsets)
+        idx = np.clip(np.where(found, idx, self.sell_offsets[1:] - 1), 0, prices.size - 1)
+        median = np.where(has_levels, prices[idx], 0)
+
+        # Первая цена не ниже допустимой, по которой нет собственных ордеров
+        mask = prices >= ((1 - acceptable_price_diff) * median)[self.sell_item_ids]
+        if is_own_level is not None:
+            mask &= ~is_own_level
+        idx, found = self._first_in_segments(mask, self.sell_offsets)
+        return np.where(found, prices[np.minimum(idx, prices.size - 1)], 0)
+
+    def first_buy_prices(self) -> np.ndarray:
+        """
+            Лучшая цена 'buy order' каждого предмета (NaN, если 'buy order' нет)
+        """
+        if not self.buy_prices.size:
+            return np.full(self.size, np.nan)
+        has_levels = self.buy_offsets[1:] > self.buy_offsets[:-1]
+        first_idx = np.minimum(self.buy_offsets[:-1], self.buy_prices.size - 1)
+        return np.where(has_levels, self.buy_prices[first_idx], np.nan)
+
+    def available_buy_prices(self, max_depth: np.ndarray) -> np.ndarray:
+        """
+            То же, что OrderBook.available_buy_price, для всех предметов сразу
+        """
+        prices = self.buy_prices
+        if not prices.size:
+            return np.zeros(self.size)
+        idx, found = self._first_in_segments(self.buy_depth > max_depth[self.buy_item_ids], self.buy_offsets)
+        idx = np.minimum(idx, prices.size - 1)
+        previous = prices[np.maximum(idx - 1, 0)]
+        use_previous = (idx > self.buy_offsets[:-1]) & (previous != 0)
+        return np.where(found, np.where(use_previous, previous, prices[idx]), 0)
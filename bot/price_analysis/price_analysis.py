@@ -1,16 +1,25 @@
-from collections import Counter
-from typing import Any
+from typing import Any, Mapping, Hashable, TypeVar
+
+import numpy as np
 
 from bot.marketplace import SellOrderItem, BuyOrderItem
+from bot.price_analysis.order_book import OrderBook
+from bot.price_analysis.order_book_batch import OrderBookBatch
+from bot.price_analysis.item_pricing_input import ItemPricingInput
+from bot.price_analysis.item_pricing import ItemPricing
 
 from enums import Config
 
 from tools.file_managers import PriceAnalysisSettingsManager
 
+K = TypeVar("K", bound=Hashable)
+
 
 class PriceAnalysis:
-    def __init__(self) -> None:
+    def __init__(self, settings: dict[str, Any] | None = None) -> None:
         """
+        :param settings: Настройки вместо сохранённых в price_analysis_settings.json
+            (например, для бэктеста); отсутствующие значения берутся по умолчанию
         :param self.acceptable_price_diff: Допустимая доля разницы с медианной ценой.
         :param self.reduction: Значение снижения цены относительно найденной цены.
         :param self.min_desired_profit: Минимальный процент прибыли, ниже которого
@@ -29,11 +38,12 @@ class PriceAnalysis:
 
         self.max_profit = 0
 
-        self.change_settings()
+        self.change_settings(settings)
 
-    def change_settings(self) -> None:
+    def change_settings(self, settings: dict[str, Any] | None = None) -> None:
         settings_manager = PriceAnalysisSettingsManager()
-        settings = settings_manager.settings
+        if settings is None:
+            settings = settings_manager.settings
 
         self.acceptable_price_diff = settings.get("acceptable_price_diff", settings_manager.def_acceptable_price_diff)
         self.reduction = settings.get("reduction", settings_manager.def_reduction)
@@ -52,64 +62,52 @@ class PriceAnalysis:
             "max_profit", settings_manager.def_max_profit)
 
     @staticmethod
-    def _find_median_price(market_data: dict[str, Any], my_sell_orders: list[SellOrderItem] = None,
+    def _my_sell_prices(my_sell_orders: list[SellOrderItem] | None) -> (np.ndarray, np.ndarray):
+        """
+            Различные цены собственных 'sell order' (по возрастанию) и количество ордеров по каждой
+        """
+        if not my_sell_orders:
+            return np.empty(0, dtype=np.float64), np.empty(0, dtype=np.int64)
+        return np.unique(np.array([order.buyer_price for order in my_sell_orders], dtype=np.float64),
+                         return_counts=True)
+
+    @staticmethod
+    def _find_median_price(order_book: OrderBook, my_prices: np.ndarray, my_counts: np.ndarray,
                            max_number_prices_used: int = 10) -> float:
-        my_prices_count = None
-        if my_sell_orders:
-            my_prices_count = Counter(order.buyer_price for order in my_sell_orders)
-
-        price = 0
-        ignore_count = 0
-        for sell_order in market_data['sell_order_graph']:
-            try:
-                price = float(sell_order[0])
-                count = int(sell_order[1])
-            except (TypeError, ValueError):
-                continue
-
-            if my_prices_count:
-                for my_price, my_count in my_prices_count.items():
-                    if my_price == price:
-                        ignore_count += my_count
-                        del my_prices_count[my_price]
-                        break
-
-            if (count - ignore_count) >= max_number_prices_used // 2:
-                return price
-
-        return price
+        return order_book.median_sell_price(max_number_prices_used // 2, my_prices, my_counts)
 
     def _find_first_available_price(
-            self, market_data: dict[str, Any], median_price: float, my_sell_orders: list[SellOrderItem]) -> float:
+            self, order_book: OrderBook, median_price: float, my_prices: np.ndarray) -> float:
         acceptable_price = (1 - self.acceptable_price_diff) * median_price
-        for sell_order in market_data.get('sell_order_graph'):
-            try:
-                price = float(sell_order[0])
-            except (TypeError, ValueError):
-                continue
-            if my_sell_orders and any(sell_order.buyer_price == price for sell_order in my_sell_orders):
-                continue
-            if price >= acceptable_price:
-                return price
-        return 0
-
-    def get_actual_sell_order_price(self, market_data: dict[str, Any], my_sell_orders: list[SellOrderItem] = None,
+        return order_book.first_available_sell_price(acceptable_price, my_prices)
+
+    def get_actual_sell_order_price(self, market_data: dict[str, Any] | OrderBook,
+                                    my_sell_orders: list[SellOrderItem] = None,
                                     max_number_prices_used: int = 10) -> float:
-        median_price = self._find_median_price(market_data, my_sell_orders, max_number_prices_used)
-        return self._find_first_available_price(market_data, median_price, my_sell_orders)
+        order_book = OrderBook.of(market_data)
+        my_prices, my_counts = self._my_sell_prices(my_sell_orders)
+        median_price = self._find_median_price(order_book, my_prices, my_counts, max_number_prices_used)
+        return self._find_first_available_price(order_book, median_price, my_prices)
 
-    def recommend_sell_price(self, market_data: dict[str, Any], my_sell_orders: list[SellOrderItem] = None,
+    def recommend_sell_price(self, market_data: dict[str, Any] | OrderBook,
+                             my_sell_orders: list[SellOrderItem] = None,
                              max_number_prices_used: int = 10) -> float:
         recommended_price = self.get_actual_sell_order_price(market_data, my_sell_orders, max_number_prices_used)
         return round(recommended_price - self.reduction, 2)
 
-    def is_buy_order_relevant(self, market_data: dict[str, Any], sales_per_day: int,
+    def is_buy_order_relevant(self, market_data: dict[str, Any] | OrderBook, sales_per_day: int,
                               my_buy_order: BuyOrderItem, max_number_prices_used: int = 10,
                               allow_check_max_profit: bool = True) -> bool:
         actual_sell_order_price = self.get_actual_sell_order_price(
             market_data, max_number_prices_used=max_number_prices_used)
         profit = (actual_sell_order_price * Config.WITH_COMMISSION) / my_buy_order.price - 1
+        return self.is_buy_order_profit_relevant(profit, sales_per_day, allow_check_max_profit)
 
+    def is_buy_order_profit_relevant(
+            self, profit: float, sales_per_day: int, allow_check_max_profit: bool = True) -> bool:
+        """
+            Достаточна ли ожидаемая доля прибыли выставленного 'buy order', чтобы его не снимать
+        """
         if allow_check_max_profit and profit > self.max_profit:
             return False
         if sales_per_day < self.low_liquidity_threshold:
@@ -117,40 +115,30 @@ class PriceAnalysis:
         return profit >= self.min_desired_profit
 
     @staticmethod
-    def _find_first_buy_order(market_data: dict[str, Any]) -> float:
-        sell_order_graph = market_data.get('buy_order_graph')
-        return sell_order_graph[0][0]
+    def _find_first_buy_order(order_book: OrderBook) -> float:
+        return order_book.first_buy_price()
 
     @staticmethod
-    def _find_available_price_in_buy_orders(market_data: dict[str, Any], sales_per_day: int) -> float:
-        prev_price = 0
-        for buy_order in market_data.get('buy_order_graph'):
-            price = buy_order[0]
-            count = buy_order[1]
-
-            if count > sales_per_day // 2:
-                return prev_price if prev_price != 0 else price
-
-            prev_price = price
-
-        return 0
+    def _find_available_price_in_buy_orders(order_book: OrderBook, sales_per_day: int) -> float:
+        return order_book.available_buy_price(sales_per_day // 2)
 
-    def recommend_buy_price(self, market_data: dict[str, Any], sales_per_day: int,
+    def recommend_buy_price(self, market_data: dict[str, Any] | OrderBook, sales_per_day: int,
                             max_number_prices_used: int = 10) -> float | None:
+        order_book = OrderBook.of(market_data)
         actual_sell_order_price = self.get_actual_sell_order_price(
-            market_data, max_number_prices_used=max_number_prices_used)
+            order_book, max_number_prices_used=max_number_prices_used)
 
         desired_profit = self.desired_profit_low_liquidity if sales_per_day < self.low_liquidity_threshold \
             else self.desired_profit
 
-        max_recommended_price = self._find_first_buy_order(market_data) + self.reduction
+        max_recommended_price = self._find_first_buy_order(order_book) + self.reduction
         profit = (actual_sell_order_price * Config.WITH_COMMISSION) / max_recommended_price - 1
         if profit >= desired_profit:
             if profit > self.max_profit:
                 return None
             return max_recommended_price
 
-        min_recommended_price = self._find_available_price_in_buy_orders(market_data, sales_per_day)
+        min_recommended_price = self._find_available_price_in_buy_orders(order_book, sales_per_day)
         profit = (actual_sell_order_price * Config.WITH_COMMISSION) / min_recommended_price - 1
         if profit >= desired_profit:
             if profit > self.max_profit:
@@ -158,3 +146,67 @@ class PriceAnalysis:
             return min_recommended_price
 
         return None
+
+    def price_items(self, items: Mapping[K, ItemPricingInput]) -> dict[K, ItemPricing]:
+        """
+            Пакетный расчёт для набора предметов: фактическая и рекомендуемая цены продажи,
+            рекомендуемая цена покупки и актуальность выставленного 'buy order' - те же значения,
+            что дают get_actual_sell_order_price, recommend_sell_price, recommend_buy_price
+            и is_buy_order_relevant, но стаканы всех предметов обрабатываются за один векторный проход.
+            Где одиночные методы падают (нет 'buy order' в стакане, нулевая цена), здесь просто нет рекомендации
+        :param items: Данные предметов по названию (или любому другому ключу)
+        :return: Результаты по тем же ключам
+        """
+        if not items:
+            return {}
+
+        names = list(items)
+        inputs = [items[name] for name in names]
+        batch = OrderBookBatch([OrderBook.of(item.market_data) for item in inputs])
+
+        sales_per_day = np.array([item.sales_per_day for item in inputs], dtype=np.int64)
+        min_depth = np.array([item.number_prices_used // 2 for item in inputs], dtype=np.int64)
+        my_item_ids = np.array(
+            [i for i, item in enumerate(inputs) for _ in item.my_sell_orders or ()], dtype=np.int64)
+        my_prices = np.array(
+            [order.buyer_price for item in inputs for order in item.my_sell_orders or ()], dtype=np.float64)
+        my_buy_prices = np.array(
+            [item.my_buy_order.price if item.my_buy_order else np.nan for item in inputs], dtype=np.float64)
+        allow_check_max_profit = np.array([item.allow_check_max_profit for item in inputs], dtype=bool)
+
+        is_own_level, own_depth = batch.own_sell_levels(my_item_ids, my_prices)
+        actual_sell_prices = batch.actual_sell_prices(
+            min_depth, self.acceptable_price_diff, is_own_level, own_depth)
+        # Для покупки цена продажи считается без учёта собственных 'sell order', как в одиночных методах
+        income = batch.actual_sell_prices(min_depth, self.acceptable_price_diff) * Config.WITH_COMMISSION
+        low_liquidity = sales_per_day < self.low_liquidity_threshold
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            buy_order_profit = income / my_buy_prices - 1
+            max_recommended_prices = batch.first_buy_prices() + self.reduction
+            max_price_profit = income / max_recommended_prices - 1
+            min_recommended_prices = batch.available_buy_prices(sales_per_day // 2)
+            min_price_profit = income / min_recommended_prices - 1
+
+        is_relevant = np.where(
+            low_liquidity,
+            buy_order_profit >= self.min_desired_profit_low_liquidity,
+            buy_order_profit >= self.min_desired_profit
+        ) & ~(allow_check_max_profit & (buy_order_profit > self.max_profit))
+
+        desired_profit = np.where(low_liquidity, self.desired_profit_low_liquidity, self.desired_profit)
+        use_max_price = max_price_profit >= desired_profit
+        use_min_price = ~use_max_price & (min_recommended_prices != 0) & (min_price_profit >= desired_profit)
+        buy_profit = np.where(use_max_price, max_price_profit, min_price_profit)
+        recommended_buy_prices = np.where(use_max_price, max_recommended_prices, min_recommended_prices)
+        has_buy_price = (use_max_price | use_min_price) & ~(buy_profit > self.max_profit)
+
+        return {
+            name: ItemPricing(
+                actual_sell_price=float(actual_sell_prices[i]),
+                recommended_sell_price=round(float(actual_sell_prices[i]) - self.reduction, 2),
+                recommended_buy_price=float(recommended_buy_prices[i]) if has_buy_price[i] else None,
+                is_buy_order_relevant=bool(is_relevant[i]) if item.my_buy_order else None
+            )
+            for i, (name, item) in enumerate(zip(names, inputs))
+        }
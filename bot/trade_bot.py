@@ -1,18 +1,21 @@
 import os
 from typing import Any
+from concurrent.futures import ThreadPoolExecutor, Future
 
 import requests
 from tqdm import tqdm
 
 from bot.inventory import Inventory, InventoryItem
 from bot.marketplace import Marketplace, SellOrderItem
-from bot.price_analysis import PriceAnalysis
+from bot.price_analysis import PriceAnalysis, OrderBook, ItemPricingInput
 from bot.marketplace import MarketplaceItemParser, BuyOrderItem
 from tools.file_managers import TradeItemManager, TempTradeItemManager, ManualTradeItemManager
 from steam_lib.guard import ConfirmationExecutor, ConfirmationType
-from tools import BasicLogger
+from tools import BasicLogger, OrderedPrefetcher
+from tools.rate_limiter import request_priority
 
 from enums.config import Config
+from enums import RequestPriority
 
 
 class TradeBot(BasicLogger):
@@ -39,9 +42,21 @@ class TradeBot(BasicLogger):
 
         self.marketplace_item_parser = MarketplaceItemParser(self.app_id, self.context_id)
 
-    def get_sell_orders_info(self, session: requests.Session) -> dict[str, list[SellOrderItem]]:
+    def get_sell_orders_info(self, session: requests.Session) -> dict[str, list[SellOrderItem]] | None:
+        """
+        :return: None, если список 'sell order' получен не полностью
+        """
         return self.marketplace_item_parser.parse_actual_sell_order_items(session)
 
+    def _parse_complete_sell_orders(self, session: requests.Session) -> bool:
+        """
+            Получить все выставленные 'sell order'; по неполному списку действия с ними пропускаются
+        """
+        if self.marketplace_item_parser.parse_actual_sell_order_items(session) is None:
+            print("Не удалось получить полный список выставленных предметов")
+            return False
+        return True
+
     def get_marketable_inventory(self, session: requests.Session) -> list[int]:
         inventory_items = self.inventory.get_inventory_items(session)
 
@@ -55,19 +70,16 @@ class TradeBot(BasicLogger):
 
         return result
 
-    def _cancel_incorrect_buy_orders(
-            self, session: requests.Session, buy_order: BuyOrderItem, market_data: dict[str, Any],
-            sales_per_day: int) -> None:
+    def _is_buy_order_relevant(
+            self, buy_order: BuyOrderItem, market_data: dict[str, Any] | OrderBook, sales_per_day: int) -> bool:
         max_number_prices_used = sales_per_day // 2
         allow_check_max_profit = buy_order.name not in self.manual_trade_item_manager.items
-        if self.price_analysis.is_buy_order_relevant(
-                market_data, sales_per_day, buy_order, max_number_prices_used, allow_check_max_profit):
-            return
-
-        self._cancel_buy_order(session, buy_order)
+        return self.price_analysis.is_buy_order_relevant(
+            market_data, sales_per_day, buy_order, max_number_prices_used, allow_check_max_profit)
 
     def _cancel_buy_order(self, session: requests.Session, buy_order: BuyOrderItem) -> None:
         response = self.marketplace.cancel_buy_order(session, buy_order.order_id)
+        self.marketplace.invalidate_item_market_data(buy_order.name)
         if response.status_code == 200:
             self.logger.info(
                 f"Cancel buy order '{buy_order.name}': "
@@ -79,10 +91,86 @@ class TradeBot(BasicLogger):
                 f"{response.status_code} {response.reason}"
             )
 
-    def update_buy_orders(self, session: requests.Session) -> None:
+    def _create_buy_order(self, session: requests.Session, item_name: str, price: float) -> None:
+        quantity = self.trade_item_manager.items.get(item_name)
+        response = self.marketplace.create_buy_order(session, item_name, price, quantity)
+        self.marketplace.invalidate_item_market_data(item_name)
+        if response.status_code == 200:
+            self.logger.info(
+                f"Buy order '{item_name}' "
+                f"({round(price, 2)} x {quantity}): "
+                f"{response.status_code} {response.reason}"
+            )
+        elif response.status_code == 406:
+            self.logger.info(
+                f"Buy order '{item_name}' need confirmation "
+                f"{response.status_code} {response.reason}"
+            )
+            ConfirmationExecutor(
+                os.getenv('IDENTITY_SECRET'),
+                os.getenv('STEAM_ID'),
+                session
+            ).allow_buy_order_confirmation()
+            confirmation_id = response.json().get('confirmation').get('confirmation_id')
+            response = self.marketplace.create_buy_order(session, item_name, price, quantity, confirmation_id)
+            self.marketplace.invalidate_item_market_data(item_name)
+            if response.status_code == 200:
+                self.logger.info(
+                    f"Buy order '{item_name}' "
+                    f"({round(price, 2)} x {quantity}): "
+                    f"{response.status_code} {response.reason}"
+                )
+            else:
+                self.logger.error(
+                    f"Buy order '{item_name}' "
+                    f"({round(price, 2)} x {quantity}): "
+                    f"{response.status_code} {response.reason}"
+                )
+        else:
+            self.logger.error(
+                f"Buy order '{item_name}' "
+                f"({round(price, 2)} x {quantity}): "
+                f"{response.status_code} {response.reason}"
+            )
+
+    def _place_buy_order(
+            self, session: requests.Session, item_name: str,
+            incorrect_buy_order: BuyOrderItem | None, recommended_buy_price: float | None) -> None:
+        if incorrect_buy_order:
+            self._cancel_buy_order(session, incorrect_buy_order)
+        if recommended_buy_price:
+            self._create_buy_order(session, item_name, recommended_buy_price)
+
+    def _fetch_item_market_info(self, session: requests.Session, item_name: str) -> tuple[OrderBook, int] | None:
+        """
+            Получить стакан из 'itemordershistogram' и количество продаж в день для предмета
+        """
+        market_data = self.marketplace.get_item_market_data(session, item_name)
+        if not market_data:
+            return None
+
+        sales_per_day = self.marketplace.get_sales_per_day(session, item_name)
+        if not sales_per_day:
+            return None
+
+        return OrderBook.from_market_data(market_data), sales_per_day
+
+    def _prefetch_item_market_info(
+            self, session: requests.Session, item_name: str) -> tuple[OrderBook, int] | None:
+        """
+            То же, что _fetch_item_market_info, но запросы уступают очередь снятию и выставлению ордеров
+        """
+        with request_priority(RequestPriority.PREFETCH):
+            return self._fetch_item_market_info(session, item_name)
+
+    def update_buy_orders(self, session: requests.Session, prefetch_workers: int = Config.PREFETCH_WORKERS) -> None:
         """
         Снимет некорректные 'buy order',
-        а также выставит новые 'buy order' по рекомендуемой цене (если таковая будет найдена)
+        а также выставит новые 'buy order' по рекомендуемой цене (если таковая будет найдена).
+
+        Работает как конвейер: данные о предметах загружаются наперёд в prefetch_workers потоках
+        (в пределах лимитов запросов), цены рассчитываются по мере поступления данных,
+        а снятие и выставление 'buy order' выполняется в отдельном потоке
         """
         self.trade_item_manager.load_items()
         self.marketplace.item_manager.load_items()
@@ -90,75 +178,42 @@ class TradeBot(BasicLogger):
 
         actual_buy_orders = self.marketplace_item_parser.parse_actual_buy_order_items(session)
 
-        for item_name in tqdm(trade_item_names, unit="order", ncols=Config.TQDM_CONSOLE_WIDTH):
-            if self.trade_item_manager.items.get(item_name) == 0:
+        with ThreadPoolExecutor(max_workers=1) as placement_executor:
+            placements: list[Future] = []
+
+            item_names_to_price = []
+            for item_name in trade_item_names:
+                if self.trade_item_manager.items.get(item_name) != 0:
+                    item_names_to_price.append(item_name)
+                elif buy_order := actual_buy_orders.get(item_name):
+                    placements.append(placement_executor.submit(self._cancel_buy_order, session, buy_order))
+
+            prefetcher = OrderedPrefetcher(
+                lambda name: self._prefetch_item_market_info(session, name),
+                item_names_to_price,
+                max_workers=prefetch_workers
+            )
+            for item_name, market_info in tqdm(
+                    prefetcher, total=len(item_names_to_price), unit="order", ncols=Config.TQDM_CONSOLE_WIDTH):
+                if not market_info:
+                    continue
+                order_book, sales_per_day = market_info
+
+                incorrect_buy_order = None
                 if buy_order := actual_buy_orders.get(item_name):
-                    self._cancel_buy_order(session, buy_order)
-                continue
+                    if not self._is_buy_order_relevant(buy_order, order_book, sales_per_day):
+                        incorrect_buy_order = buy_order
 
-            response_market_data = self.marketplace.get_item_market_data(session, item_name)
-            if not response_market_data or response_market_data.status_code != 200:
-                continue
-            market_data = response_market_data.json()
+                recommended_buy_price = self.price_analysis.recommend_buy_price(
+                    order_book, sales_per_day, sales_per_day // 2)
 
-            sales_per_day = self.marketplace.get_sales_per_day(session, item_name)
-            if not sales_per_day:
-                continue
+                if incorrect_buy_order or recommended_buy_price:
+                    placements.append(placement_executor.submit(
+                        self._place_buy_order, session, item_name, incorrect_buy_order, recommended_buy_price
+                    ))
 
-            if buy_order := actual_buy_orders.get(item_name):
-                self._cancel_incorrect_buy_orders(session, buy_order, market_data, sales_per_day)
-
-            recommended_buy_price = self.price_analysis.recommend_buy_price(
-                market_data, sales_per_day, sales_per_day // 2)
-            if recommended_buy_price:
-                response = self.marketplace.create_buy_order(
-                    session,
-                    item_name,
-                    recommended_buy_price,
-                    self.trade_item_manager.items.get(item_name)
-                )
-                if response.status_code == 200:
-                    self.logger.info(
-                        f"Buy order '{item_name}' "
-                        f"({round(recommended_buy_price, 2)} x {self.trade_item_manager.items.get(item_name)}): "
-                        f"{response.status_code} {response.reason}"
-                    )
-                elif response.status_code == 406:
-                    self.logger.info(
-                        f"Buy order '{item_name}' need confirmation "
-                        f"{response.status_code} {response.reason}"
-                    )
-                    ConfirmationExecutor(
-                        os.getenv('IDENTITY_SECRET'),
-                        os.getenv('STEAM_ID'),
-                        session
-                    ).allow_buy_order_confirmation()
-                    confirmation_id = response.json().get('confirmation').get('confirmation_id')
-                    response = self.marketplace.create_buy_order(
-                        session,
-                        item_name,
-                        recommended_buy_price,
-                        self.trade_item_manager.items.get(item_name),
-                        confirmation_id
-                    )
-                    if response.status_code == 200:
-                        self.logger.info(
-                            f"Buy order '{item_name}' "
-                            f"({round(recommended_buy_price, 2)} x {self.trade_item_manager.items.get(item_name)}): "
-                            f"{response.status_code} {response.reason}"
-                        )
-                    else:
-                        self.logger.error(
-                            f"Buy order '{item_name}' "
-                            f"({round(recommended_buy_price, 2)} x {self.trade_item_manager.items.get(item_name)}): "
-                            f"{response.status_code} {response.reason}"
-                        )
-                else:
-                    self.logger.error(
-                        f"Buy order '{item_name}' "
-                        f"({round(recommended_buy_price, 2)} x {self.trade_item_manager.items.get(item_name)}): "
-                        f"{response.status_code} {response.reason}"
-                    )
+            for placement in placements:
+                placement.result()
 
     def _cancel_incorrect_sell_orders(
             self, session: requests.Session, item_name: str, actual_price: float) -> None:
@@ -169,6 +224,7 @@ class TradeBot(BasicLogger):
                 if item.buyer_price > actual_price:
                     pbar.set_description(f"Cancel '{item_name}'")
                     response = self.marketplace.cancel_sell_order(session, item.order_id)
+                    self.marketplace.invalidate_item_market_data(item_name)
                     if response.status_code == 200:
                         self.logger.info(
                             f"Cancel sell order '{item_name}': "
@@ -179,43 +235,51 @@ class TradeBot(BasicLogger):
                             f"{response.status_code} {response.reason}"
                         )
 
-    def update_sell_orders(self, session: requests.Session) -> None:
+    def update_sell_orders(
+            self, session: requests.Session,
+            prefetch_workers: int = Config.PREFETCH_WORKERS, pricing_chunk_size: int = Config.PRICING_CHUNK_SIZE
+    ) -> None:
         """
         Выставленные некорректные 'sell order' будут сняты,
         но метод не будет выставлять их по корректной цене (нужно вызвать метод 'sell_inventory')
+
+        Данные о предметах загружаются наперёд в prefetch_workers потоках, как в update_buy_orders;
+        цены рассчитываются одним вызовом для каждых pricing_chunk_size загруженных предметов,
+        и 'sell order' снимаются, пока загружаются следующие
         """
-        self.marketplace_item_parser.parse_actual_sell_order_items(session)
+        if not self._parse_complete_sell_orders(session):
+            return
         if not self.marketplace_item_parser.sell_orders:
             print("Нет выставленных предметов")
             return
 
-        with tqdm(
-                self.marketplace_item_parser.sell_orders.keys(), unit="order", ncols=Config.TQDM_CONSOLE_WIDTH
-        ) as pbar:
-            for item_name in pbar:
-                # pbar.set_description(f"{item_name}")
-                if item_name not in self.trade_item_manager.items:
-                    continue
-
-                if item_name in self.temp_trade_item_manager.items:
-                    continue
-
-                response_market_data = self.marketplace.get_item_market_data(session, item_name)
-                if not response_market_data or response_market_data.status_code != 200:
-                    continue
-                market_data = response_market_data.json()
+        item_names_to_price = [
+            item_name for item_name in self.marketplace_item_parser.sell_orders.keys()
+            if item_name in self.trade_item_manager.items and item_name not in self.temp_trade_item_manager.items
+        ]
 
-                sales_per_day = self.marketplace.get_sales_per_day(session, item_name)
-                if not sales_per_day:
-                    continue
+        def cancel_incorrect_sell_orders(chunk: dict[str, ItemPricingInput]) -> None:
+            for item_name, pricing in self.price_analysis.price_items(chunk).items():
+                self._cancel_incorrect_sell_orders(session, item_name, pricing.actual_sell_price)
 
-                actual_sell_order_price = self.price_analysis.get_actual_sell_order_price(
-                    market_data,
-                    self.marketplace_item_parser.sell_orders.get(item_name),
-                    sales_per_day // 2
-                )
+        prefetcher = OrderedPrefetcher(
+            lambda name: self._prefetch_item_market_info(session, name),
+            item_names_to_price,
+            max_workers=prefetch_workers
+        )
+        items_to_price: dict[str, ItemPricingInput] = {}
+        for item_name, market_info in tqdm(
+                prefetcher, total=len(item_names_to_price), unit="item", ncols=Config.TQDM_CONSOLE_WIDTH):
+            if not market_info:
+                continue
+            order_book, sales_per_day = market_info
+            items_to_price[item_name] = ItemPricingInput(
+                order_book, sales_per_day, self.marketplace_item_parser.sell_orders.get(item_name))
 
-                self._cancel_incorrect_sell_orders(session, item_name, actual_sell_order_price)
+            if len(items_to_price) >= pricing_chunk_size:
+                cancel_incorrect_sell_orders(items_to_price)
+                items_to_price = {}
+        cancel_incorrect_sell_orders(items_to_price)
 
     def _confirm_all_sell_orders(self, session: requests.Session) -> None:
         ConfirmationExecutor(
@@ -242,6 +306,7 @@ class TradeBot(BasicLogger):
                 1,
                 price
             )
+            self.marketplace.invalidate_item_market_data(item.name)
 
             if log_success:
                 if response.status_code == 200:
@@ -262,7 +327,9 @@ class TradeBot(BasicLogger):
             print("Нет предметов для продажи")
             return
 
-        self.marketplace_item_parser.parse_actual_sell_order_items(session)
+        # Цена выставления учитывает собственные 'sell order', поэтому нужен полный их список
+        if not self._parse_complete_sell_orders(session):
+            return
 
         items = [item for item in inventory_items.values() if item.marketable]
         if not items:
@@ -275,10 +342,9 @@ class TradeBot(BasicLogger):
                 if not item_value and item_value != 0:
                     continue
 
-                response_market_data = self.marketplace.get_item_market_data(session, item.name)
-                if not response_market_data or response_market_data.status_code != 200:
+                market_data = self.marketplace.get_item_market_data(session, item.name)
+                if not market_data:
                     continue
-                market_data = response_market_data.json()
 
                 sales_per_day = self.marketplace.get_sales_per_day(session, item.name)
                 if not sales_per_day:
@@ -369,23 +435,21 @@ class TradeBot(BasicLogger):
             "BODY_YULED_COAT"
         ]
 
-    def get_dst_count(self, session: requests.Session, is_spiffy: bool = True) -> int:
-        self.marketplace_item_parser.parse_actual_sell_order_items(session)
-
-        sell_order_items = self.marketplace_item_parser.sell_orders
-        if is_spiffy:
-            return sum([
-                len(sell_order_items.get(item))
-                for item in sell_order_items.keys() if self._is_dst_spiffy(item)
-            ])
-        else:
-            return sum([
-                len(sell_order_items.get(item))
-                for item in sell_order_items.keys() if self._is_dst_distinguished(item)
-            ])
+    def get_dst_count(self, session: requests.Session, is_spiffy: bool = True) -> int | None:
+        """
+        :return: None, если список 'sell order' получен не полностью
+        """
+        is_dst_item = self._is_dst_spiffy if is_spiffy else self._is_dst_distinguished
+        count = sum(
+            1 for item in self.marketplace_item_parser.iter_sell_order_items(session) if is_dst_item(item.name)
+        )
+        if not self.marketplace_item_parser.is_sell_orders_complete:
+            return None
+        return count
 
     def dst_cancel_sell_orders(self, session: requests.Session, is_spiffy: bool = True) -> None:
-        self.marketplace_item_parser.parse_actual_sell_order_items(session)
+        if not self._parse_complete_sell_orders(session):
+            return
 
         sell_order_items = self.marketplace_item_parser.sell_orders.keys()
         if is_spiffy:
@@ -400,6 +464,7 @@ class TradeBot(BasicLogger):
                     inner_pbar.set_description(f"Cancel '{item_name}'")
                     for item in inner_pbar:
                         response = self.marketplace.cancel_sell_order(session, item.order_id)
+                        self.marketplace.invalidate_item_market_data(item_name)
                         if response.status_code != 200:
                             self.logger.error(
                                 f"Cancel sell order '{item_name}': "
@@ -7,18 +7,21 @@ from typing import Iterable
 
 from dotenv import load_dotenv
 from rich.text import Text
+from rich.table import Table
 from rich.console import Console
 
 from bot import TradeBot
 from bot.marketplace import SellOrderItem
 from bot.account import Account
+from bot.backtest import BacktestEngine
 
 from steam_lib import SessionManager
 from steam_lib.guard import ConfirmationExecutor, ConfirmationType
-from tools.file_managers import GameIDManager
+from tools.file_managers import GameIDManager, PriceAnalysisSettingsManager
+from tools.file_store import FileStore, FileStoreType
 from tools.console import BasicConsole, command
 from utils import handle_429_status_code
-from enums import Currency
+from enums import Currency, Config, Urls
 
 from utils.exceptions import TooManyRequestsError
 
@@ -29,6 +32,8 @@ class TradeUserInterface(BasicConsole):
         self.session: requests.Session = requests.Session()
         self.console = Console()
         load_dotenv()
+        # Адреса Steam могут быть переопределены в .env (см. Urls)
+        Urls.configure_from_env()
         self.session_manager = SessionManager(
             os.getenv('USER_NAME'),
             os.getenv('PASSWORD'),
@@ -51,15 +56,18 @@ class TradeUserInterface(BasicConsole):
         aliases=["auto", "autojob"],
         description="Автоматически (в бесконечном цикле) произвести весь процесс: "
                     "проверка 'sell order', продажа инвентаря, подтверждения продажи, "
-                    "проверка 'buy order' (если указан флаг -ub с параметром частоты проверки)",
-        usage="auto <duration sec> [-ub FREQUENCY (once in this number of runs)] "
+                    "проверка 'buy order' (если указан флаг -ub с параметром частоты проверки), "
+                    "сбор истории торговой площадки без Excel (если указан флаг -history)",
+        usage="auto <duration sec> [-ub FREQUENCY (once in this number of runs)] [-history] "
               "<game_1> [game_2] ... [game_N]",
         flags={
-            "frequency_update_buy_orders": (["-ub"], "Обновлять 'buy order' с некоторой частотой")
+            "frequency_update_buy_orders": (["-ub"], "Обновлять 'buy order' с некоторой частотой"),
+            "summarize_history": (["-history"], "Собирать историю торговой площадки после каждого запуска")
         }
     )
     def auto_job(
-            self, iteration_duration_sec: int, game_names: list[str], frequency_update_buy_orders: int = 0) -> None:
+            self, iteration_duration_sec: int, game_names: list[str], frequency_update_buy_orders: int = 0,
+            summarize_history: bool = False) -> None:
         if not self.validate_game_names(game_names):
             self.console.print(Text("Присутствуют некорректные названия игр", style="red"))
             self.console.print(Text(f"Доступные: {list(self.get_available_games().keys())}"))
@@ -79,6 +87,10 @@ class TradeUserInterface(BasicConsole):
 
             if not self._basic_job(game_names, update_buy_orders):
                 return
+            if summarize_history:
+                self.console.print(Text("Summarize market history", style="yellow"))
+                self.summarize_market_history(no_excel=True)
+                self.console.print(Text("---"))
             i += 1
 
             current_time = datetime.now()
@@ -218,6 +230,9 @@ class TradeUserInterface(BasicConsole):
             sell_orders = dict()
             try:
                 sell_orders: dict[str, list[SellOrderItem]] = trade_bot.get_sell_orders_info(self.session)
+                if sell_orders is None:
+                    self.console.print(Text("Список выставленных предметов получен не полностью", style="red"))
+                    sell_orders = dict()
             except TooManyRequestsError as ex:
                 Console().print(
                     f"{datetime.now().strftime('%Y-%m-%d %H:%M:%S')} "
@@ -287,12 +302,97 @@ class TradeUserInterface(BasicConsole):
     @command(
         aliases=["history", "summarize"],
         description="Собрать историю торговой площадки",
-        usage="history"
+        usage="history [-noexcel]",
+        flags={
+            "no_excel": (["-noexcel"], "Не строить Excel (только json и колоночные файлы)")
+        }
     )
     @login_wrapper
-    def summarize_market_history(self) -> None:
+    def summarize_market_history(self, no_excel: bool = False) -> None:
         account = Account()
-        account.summarize_market_history(self.session)
+        account.summarize_market_history(self.session, render_excel=not no_excel)
+
+    @command(
+        aliases=["ledger"],
+        description="Сводка по локальному журналу истории торговой площадки (без запросов к Steam)",
+        usage="ledger [-weekly] [-rebuild [-noexcel]]",
+        flags={
+            "weekly": (["-weekly"], "Сводка по неделям вместо месяцев"),
+            "rebuild": (["-rebuild"], "Пересобрать json, колоночные файлы и Excel сводок по журналу"),
+            "no_excel": (["-noexcel"], "Не строить Excel при пересборке")
+        }
+    )
+    def market_history_ledger(self, weekly: bool = False, rebuild: bool = False, no_excel: bool = False) -> None:
+        if rebuild:
+            if Account().rebuild_market_history_from_ledger(render_excel=not no_excel):
+                self.console.print(Text("done"))
+            return
+
+        app_id_to_game_name, rows = Account.get_ledger_period_summary(weekly)
+        if not rows:
+            self.console.print(Text("Журнал пуст", style="yellow"))
+            return
+
+        table = Table(title="Market history ledger", show_lines=False)
+        for column in ("Game", "Period", "Bought", "Sum bought", "Sold", "Sum sold", "Difference"):
+            table.add_column(column)
+        for row in rows:
+            difference = round(row["sum_sold"] - row["sum_bought"], 2)
+            table.add_row(
+                app_id_to_game_name.get(row["app_id"], row["app_id"]), row["period"],
+                str(row["total_bought"]), f"{row['sum_bought']:.2f}",
+                str(row["total_sold"]), f"{row['sum_sold']:.2f}",
+                Text(f"{difference:.2f}", style="green" if difference >= 0 else "red")
+            )
+        self.console.print(table)
+
+    @command(
+        aliases=["backtest"],
+        description="Прогнать сетку настроек анализа цен по записанным снимкам 'itemordershistogram' "
+                    "(начальный инвентарь - из журнала истории торговой площадки, без запросов к Steam)",
+        usage="backtest [-grid path] [-snapshots path] [-workers N] [-top N]",
+        flags={
+            "grid_file_path": (["-grid"], "Json с перебираемыми значениями настроек, например "
+                                          "{\"reduction\": [0.01, 0.03], \"max_profit\": [0.2, 0.3]}"),
+            "snapshots_file_path": (
+                ["-snapshots"], "Файл снимков (.jsonl или .jsonl.gz) или каталог записи HistogramRecorder"),
+            "workers": (["-workers"], "Количество процессов"),
+            "top": (["-top"], "Сколько лучших наборов показать")
+        }
+    )
+    def backtest(
+            self,
+            grid_file_path: str = "data/backtest/grid.json",
+            snapshots_file_path: str = "data/backtest/snapshots.jsonl.gz",
+            workers: int = Config.BACKTEST_WORKERS,
+            top: int = 20
+    ) -> None:
+        grid = FileStore.from_type(FileStoreType.JSON).load(grid_file_path)
+        if not grid:
+            self.console.print(Text(f"Нет сетки настроек: {grid_file_path}", style="red"))
+            return
+        if not os.path.exists(snapshots_file_path):
+            self.console.print(Text(f"Нет файла снимков: {snapshots_file_path}", style="red"))
+            return
+
+        engine, ledger_profit = BacktestEngine.from_files(snapshots_file_path)
+        settings_list = BacktestEngine.settings_grid(grid, PriceAnalysisSettingsManager().settings)
+        self.console.print(f"Предметов: {len(engine.timelines)}, наборов настроек: {len(settings_list)}")
+        results = engine.run_grid(settings_list, workers)
+
+        table = Table(title="Backtest", show_lines=False)
+        for column in (*grid, "Bought", "Sold", "Turnover", "Open", "Profit"):
+            table.add_column(column)
+        for result in sorted(results, key=lambda r: r.realized_profit, reverse=True)[:top]:
+            table.add_row(
+                *(str(result.settings[key]) for key in grid),
+                str(result.bought_count), str(result.sold_count), f"{result.turnover:.2f}",
+                str(result.open_count),
+                Text(f"{result.realized_profit:.2f}", style="green" if result.realized_profit >= 0 else "red")
+            )
+        self.console.print(table)
+        if ledger_profit is not None:
+            self.console.print(f"Прибыль реальных продаж за период по журналу: {ledger_profit:.2f}")
     # endregion
 
     # region Fundamental commands
@@ -304,7 +404,9 @@ class TradeUserInterface(BasicConsole):
     @login_wrapper
     def update_sell_orders(self, game_name: str) -> bool:
         if trade_bot := self._get_bot(game_name):
-            return not handle_429_status_code(trade_bot.update_sell_orders, self.session)
+            result = handle_429_status_code(trade_bot.update_sell_orders, self.session)
+            trade_bot.marketplace.save_cache_market_data()
+            return not result
         return False
 
     @command(
@@ -317,6 +419,7 @@ class TradeUserInterface(BasicConsole):
         if trade_bot := self._get_bot(game_name):
             result = handle_429_status_code(trade_bot.update_buy_orders, self.session)
             trade_bot.marketplace.save_cache_sales_per_day()
+            trade_bot.marketplace.save_cache_market_data()
             return not result
         return False
 
@@ -328,7 +431,9 @@ class TradeUserInterface(BasicConsole):
     @login_wrapper
     def sell_inventory(self, game_name: str) -> bool:
         if trade_bot := self._get_bot(game_name):
-            return not handle_429_status_code(trade_bot.sell_inventory, self.session)
+            result = handle_429_status_code(trade_bot.sell_inventory, self.session)
+            trade_bot.marketplace.save_cache_market_data()
+            return not result
         return False
 
     @command(
@@ -382,6 +487,9 @@ class TradeUserInterface(BasicConsole):
                 return
             if count:
                 count = trade_bot.get_dst_count(self.session)
+                if count is None:
+                    self.console.print(Text("Список выставленных предметов получен не полностью", style="red"))
+                    return
                 self.console.print(count)
                 return
             self.console.print(Text("Необходимо выставить флаг команды", style="red"))
@@ -407,6 +515,9 @@ class TradeUserInterface(BasicConsole):
                 return
             if count:
                 count = trade_bot.get_dst_count(self.session, False)
+                if count is None:
+                    self.console.print(Text("Список выставленных предметов получен не полностью", style="red"))
+                    return
                 self.console.print(count)
                 return
             self.console.print(Text("Необходимо выставить флаг команды", style="red"))
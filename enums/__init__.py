@@ -1,9 +1,14 @@
 from .config import Config
 from .currency import Currency
+from .endpoint import Host, EndpointClass
+from .request_priority import RequestPriority
 from .urls import Urls
 
 __all__ = [
     "Config",
     "Currency",
+    "Host",
+    "EndpointClass",
+    "RequestPriority",
     "Urls"
 ]
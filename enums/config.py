@@ -1,3 +1,19 @@
+import os
+
+
 class Config:
     WITH_COMMISSION: float = 0.8696
     TQDM_CONSOLE_WIDTH: int = 100
+    PREFETCH_WORKERS: int = 4
+    PRICING_CHUNK_SIZE: int = 20
+    MARKET_DATA_CACHE_TTL: int = 5 * 60
+    SELL_ORDER_ROW_PARSER: str = "lxml"  # "lxml", "regex" или "html.parser" (см. SellOrderRowParserType)
+    SELL_ORDERS_PAGE_SIZE: int = 500
+    SELL_ORDERS_MAX_RESTARTS: int = 2
+    HISTORY_DOWNLOAD_WORKERS: int = 3
+    HISTORY_CHECKPOINT_PAGES: int = 20
+    HISTORY_COLUMNAR_FORMAT: str = "feather"  # "feather" или "parquet" (см. ColumnarFormat)
+    REPORT_WORKERS: int = os.cpu_count() or 1
+    BACKTEST_WORKERS: int = os.cpu_count() or 1
+    RECORD_HISTOGRAMS: bool = False  # записывать ответы 'itemordershistogram' (см. HistogramRecorder)
+    HISTOGRAM_RECORDER_DIR: str = "data/histograms"
@@ -0,0 +1,13 @@
+class Host:
+    COMMUNITY = "steamcommunity.com"
+    STORE = "store.steampowered.com"
+
+
+class EndpointClass:
+    HOST = "host"  # общий лимит для всех запросов к хосту
+    MARKET_DATA = "market_data"  # itemordershistogram, priceoverview
+    MARKET_LISTINGS = "market_listings"  # mylistings, страница торговой площадки
+    MARKET_ACTION = "market_action"  # выставление и снятие 'sell order' / 'buy order'
+    MARKET_HISTORY = "market_history"  # myhistory
+    INVENTORY = "inventory"
+    ACCOUNT = "account"
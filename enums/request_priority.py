@@ -0,0 +1,7 @@
+from enum import IntEnum
+
+
+class RequestPriority(IntEnum):
+    MUTATION = 0  # выставление и снятие ордеров
+    ACTIVE_READ = 1  # чтение данных для предметов, с которыми сейчас будут работать
+    PREFETCH = 2  # упреждающая загрузка данных
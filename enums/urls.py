@@ -1,12 +1,65 @@
+import os
+
+
 class Urls:
-    API = "https://api.steampowered.com"
-    LOGIN = "https://login.steampowered.com"
-    COMMUNITY = "https://steamcommunity.com"
-    INVENTORY = "https://steamcommunity.com/inventory"
-    MY_INVENTORY = "https://steamcommunity.com/my/inventory"
-    MARKET = "https://steamcommunity.com/market"
-    MARKET_ITEM_ORDERS_HISTOGRAM = "https://steamcommunity.com/market/itemordershistogram"
-    MARKET_PRICE_OVERVIEW = "https://steamcommunity.com/market//priceoverview"
-    ACCOUNT = "https://store.steampowered.com/account"
-    STORE = "https://store.steampowered.com"
-    HISTORY = "https://steamcommunity.com/market/myhistory"
+    """
+        Адреса Steam. Базовые адреса хостов можно переопределить переменными окружения
+        (например, чтобы направить бота на локальный стенд benchmarks.steam_standin):
+        STEAM_COMMUNITY_URL, STEAM_STORE_URL, STEAM_API_URL, STEAM_LOGIN_URL - для отдельного хоста,
+        STEAM_BASE_URL - для всех хостов, не заданных по отдельности.
+        Остальные адреса строятся от базовых, поэтому их следует читать в момент запроса, а не при импорте
+    """
+    DEFAULT_API = "https://api.steampowered.com"
+    DEFAULT_LOGIN = "https://login.steampowered.com"
+    DEFAULT_COMMUNITY = "https://steamcommunity.com"
+    DEFAULT_STORE = "https://store.steampowered.com"
+
+    API: str
+    LOGIN: str
+    COMMUNITY: str
+    INVENTORY: str
+    MY_INVENTORY: str
+    MARKET: str
+    MARKET_ITEM_ORDERS_HISTOGRAM: str
+    MARKET_PRICE_OVERVIEW: str
+    ACCOUNT: str
+    ACCOUNT_HISTORY: str
+    ACCOUNT_HISTORY_LOAD_MORE: str
+    STORE: str
+    HISTORY: str
+
+    @classmethod
+    def configure(
+            cls, community: str | None = None, store: str | None = None,
+            api: str | None = None, login: str | None = None
+    ) -> None:
+        """
+            Задать базовые адреса хостов (None - настоящий адрес Steam) и пересчитать остальные
+        """
+        cls.API = (api or cls.DEFAULT_API).rstrip("/")
+        cls.LOGIN = (login or cls.DEFAULT_LOGIN).rstrip("/")
+        cls.COMMUNITY = (community or cls.DEFAULT_COMMUNITY).rstrip("/")
+        cls.STORE = (store or cls.DEFAULT_STORE).rstrip("/")
+
+        cls.INVENTORY = f"{cls.COMMUNITY}/inventory"
+        cls.MY_INVENTORY = f"{cls.COMMUNITY}/my/inventory"
+        cls.MARKET = f"{cls.COMMUNITY}/market"
+        cls.MARKET_ITEM_ORDERS_HISTOGRAM = f"{cls.COMMUNITY}/market/itemordershistogram"
+        cls.MARKET_PRICE_OVERVIEW = f"{cls.COMMUNITY}/market//priceoverview"
+        cls.HISTORY = f"{cls.COMMUNITY}/market/myhistory"
+        cls.ACCOUNT = f"{cls.STORE}/account"
+        cls.ACCOUNT_HISTORY = f"{cls.STORE}/account/history/"
+        cls.ACCOUNT_HISTORY_LOAD_MORE = f"{cls.STORE}/account/AjaxLoadMoreHistory/"
+
+    @classmethod
+    def configure_from_env(cls) -> None:
+        base = os.getenv("STEAM_BASE_URL") or None
+        cls.configure(
+            community=os.getenv("STEAM_COMMUNITY_URL") or base,
+            store=os.getenv("STEAM_STORE_URL") or base,
+            api=os.getenv("STEAM_API_URL") or base,
+            login=os.getenv("STEAM_LOGIN_URL") or base
+        )
+
+
+Urls.configure_from_env()
@@ -6,6 +6,7 @@ import requests
 import time
 
 from steam_lib.guard import generate_confirmation_key, generate_device_id
+from enums import Urls
 
 
 class ConfirmationTag:
@@ -52,16 +53,7 @@ class Confirmation(NamedTuple):
             return self.headline
         return f'Confirmation: {self.summary[0]}'
 
-class SteamUrl:
-    API = 'https://api.steampowered.com'
-    COMMUNITY = 'https://steamcommunity.com'
-    STORE = 'https://store.steampowered.com'
-    LOGIN = 'https://login.steampowered.com'
-
-
 class ConfirmationExecutor:
-    CONF_URL = SteamUrl.COMMUNITY + '/mobileconf'
-
     def __init__(self, identity_secret: str, steam_id: str,
                  session: requests.Session) -> None:
         self.steam_id = steam_id
@@ -84,6 +76,11 @@ class ConfirmationExecutor:
             'Sec-Fetch-Site': 'same-origin'
         }
 
+    @property
+    def conf_url(self) -> str:
+        # Адрес берётся при каждом запросе, чтобы учитывать переопределение Urls
+        return Urls.COMMUNITY + '/mobileconf'
+
     def respond_to_confirmation(self, confirmation: Confirmation,
                                 cancel: bool = False) -> bool:
         tag = ConfirmationTag.ALLOW if cancel is False\
@@ -94,7 +91,7 @@ class ConfirmationExecutor:
         params['cid'] = confirmation.id
         headers = {'X-Requested-With': 'XMLHttpRequest'}
         response = self.session.get(
-            self.CONF_URL + '/ajaxop', params=params, headers=headers)
+            self.conf_url + '/ajaxop', params=params, headers=headers)
         try:
             status = response.json()['success']
         except requests.exceptions.JSONDecodeError:
@@ -111,7 +108,7 @@ class ConfirmationExecutor:
         params['cid[]'] = [i.id for i in confirmations]
         headers = {'X-Requested-With': 'XMLHttpRequest'}
         response = self.session.post(
-            self.CONF_URL + '/multiajaxop', data=params, headers=headers)
+            self.conf_url + '/multiajaxop', data=params, headers=headers)
         try:
             status = response.json()['success']
         except requests.exceptions.JSONDecodeError:
@@ -140,7 +137,7 @@ class ConfirmationExecutor:
         return confirmations
 
     def _fetch_confirmations_page(self) -> requests.Response:
-        url = self.CONF_URL + '/getlist'
+        url = self.conf_url + '/getlist'
         tag = ConfirmationTag.CONF
         params = self._create_confirmation_params(tag)
         headers = {'X-Requested-With': 'com.valvesoftware.android.steam.community'}
@@ -0,0 +1,19 @@
+import pytest
+
+from tools.rate_limiter import RateLimiterRegistry
+
+
+@pytest.fixture
+def unlimited_rate_limiter(tmp_path, monkeypatch):
+    """
+        Снять лимиты запросов на время теста (стенду они не нужны); подобранные скорости пишутся в tmp_path
+    """
+    registry = RateLimiterRegistry.get()
+    monkeypatch.setattr(registry, "learned_rates_file_path", tmp_path / "learned_rates.json")
+    monkeypatch.setattr(registry, "learned_rates", {})
+    limits = dict(registry.limits)
+    for host, endpoint_class in limits:
+        registry.configure(host, endpoint_class, 1000, 1000)
+    yield registry
+    for (host, endpoint_class), (rate, burst) in limits.items():
+        registry.configure(host, endpoint_class, rate, burst)
@@ -0,0 +1,55 @@
+import asyncio
+import logging
+
+import pytest
+import requests
+
+from benchmarks.steam_standin import StandinMarket, StandinServer
+from utils.async_web_utils import api_request
+from utils.exceptions import TooManyRequestsError
+from utils.revalidation_cache import RevalidationCache
+from utils.web_utils import api_request as sync_api_request
+
+MARKET = dict(items=5, listings=0, inventory=10, buy_orders=0, history=0)
+
+
+def inventory_url(server: StandinServer) -> str:
+    return f"{server.url}/inventory/76561197960287930/{StandinMarket.CONTEXT_ID}/2"
+
+
+def test_awaitable_request_revalidates():
+    cache = RevalidationCache(maxsize=16)
+    params = {"l": "english", "count": 5}
+
+    async def fetch_twice(session: requests.Session, url: str) -> (requests.Response, requests.Response):
+        first = await api_request(session, "GET", url, params=params, revalidation_cache=cache)
+        return first, await api_request(session, "GET", url, params=params, revalidation_cache=cache)
+
+    with StandinServer(StandinMarket(**MARKET)) as server:
+        first, second = asyncio.run(fetch_twice(requests.Session(), inventory_url(server)))
+
+    assert first.status_code == second.status_code == 200
+    assert second.json() == first.json()
+    assert server.stats[("inventory", 200)] == 1
+    assert server.stats[("inventory", 304)] == 1
+
+
+def test_awaitable_request_raises_on_too_many_requests():
+    with StandinServer(StandinMarket(**MARKET), too_many_requests_rate=1.0) as server:
+        with pytest.raises(TooManyRequestsError):
+            asyncio.run(api_request(
+                requests.Session(), "GET", inventory_url(server), logger=logging.getLogger(__name__)))
+
+
+def test_sync_request_runs_awaitable_with_async_engine(monkeypatch):
+    monkeypatch.setenv("ASYNC_HTTP", "1")
+    cache = RevalidationCache(maxsize=16)
+    session = requests.Session()
+
+    with StandinServer(StandinMarket(**MARKET)) as server:
+        first = sync_api_request(session, "GET", inventory_url(server), revalidation_cache=cache)
+        second = sync_api_request(session, "GET", inventory_url(server), revalidation_cache=cache)
+
+    assert second.request.headers["If-None-Match"] == first.headers["ETag"]
+    assert second.content == first.content
+    assert server.stats[("inventory", 304)] == 1
@@ -0,0 +1,40 @@
+from datetime import date
+
+from bot.account.date_index import DateIndex
+
+
+def align_all(date_index: DateIndex, cursor: date, history_dates: list[date]) -> list[date]:
+    result = []
+    for history_date in history_dates:
+        cursor = date_index.align(cursor, history_date)
+        result.append(cursor)
+    return result
+
+
+def partial(month: int, day: int) -> date:
+    # Год записи истории неизвестен; 1904 - високосный, как в MarketHistoryParser.parse_partial_date
+    return date(1904, month, day)
+
+
+def test_align_matches_wallet_dates():
+    date_index = DateIndex([date(2024, 3, 1), date(2024, 3, 5)])
+
+    aligned = align_all(date_index, date(2024, 3, 1), [partial(3, 1), partial(3, 5), partial(3, 5)])
+
+    assert aligned == [date(2024, 3, 1), date(2024, 3, 5), date(2024, 3, 5)]
+
+
+def test_align_synthesized_date_crosses_year_boundary():
+    date_index = DateIndex([date(2023, 12, 20), date(2024, 1, 10), date(2024, 2, 1)])
+
+    aligned = align_all(
+        date_index, date(2023, 12, 20), [partial(12, 20), partial(1, 3), partial(1, 10), partial(2, 1)])
+
+    assert aligned == [date(2023, 12, 20), date(2024, 1, 3), date(2024, 1, 10), date(2024, 2, 1)]
+    assert date(2024, 1, 3) in date_index
+
+
+def test_align_synthesized_leap_day_uses_leap_year():
+    date_index = DateIndex([date(2027, 3, 1)])
+
+    assert date_index.align(date(2027, 3, 1), partial(2, 29)) == date(2028, 2, 29)
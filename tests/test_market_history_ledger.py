@@ -0,0 +1,148 @@
+import random
+from collections import defaultdict
+from datetime import date, timedelta
+
+import pytest
+
+from bot.account.account import Account
+from bot.account.history_record import HistoryRecord
+from bot.account.market_history_ledger import MarketHistoryLedger
+from bot.account.market_item_stats import MarketItemStats
+from bot.account.market_month_stats import MarketMonthStats
+from bot.account.market_item_profit_stats import MarketItemProfitStats
+
+
+def generate_records(count: int, seed: int = 7) -> (list[HistoryRecord], list[date]):
+    rng = random.Random(seed)
+    records, record_dates = [], []
+    record_date = date(2023, 11, 1)
+    for number in range(count):
+        record_date += timedelta(days=rng.randint(0, 3))
+        app_id = rng.choice(("730", "570", "753"))
+        item = rng.randint(1, 8)
+        records.append(HistoryRecord(
+            row_id=f"row_{number}",
+            app_id=app_id,
+            context_id="2",
+            item_id=str(number),
+            item_hash_name=f"{app_id}_item_{item}",
+            item_name=f"Item {item} v{number // 50}",
+            game_name=f"Game {app_id}",
+            price=round(rng.uniform(0.03, 40), 2),
+            count=rng.randint(1, 3),
+            sign=rng.choice("+-"),
+            partial_date=record_date.replace(year=1904)
+        ))
+        record_dates.append(record_date)
+    return records, record_dates
+
+
+def aggregate_in_memory(records: list[HistoryRecord], record_dates: list[date]) -> (dict, dict):
+    """
+        Сводки по предметам и месяцам простым проходом по записям (суммы в копейках)
+    """
+    items = defaultdict(lambda: {"item_name": "", "total_bought": 0, "total_sold": 0, "sum_bought": 0, "sum_sold": 0})
+    months = defaultdict(lambda: {"total_bought": 0, "total_sold": 0, "sum_bought": 0, "sum_sold": 0})
+    for record, record_date in zip(records, record_dates):
+        kind = "bought" if record.is_purchase else "sold"
+        item = items[(record.app_id, record.item_hash_name)]
+        item["item_name"] = record.item_name
+        month = months[(record.app_id, record_date.strftime("%Y.%m"))]
+        for stats in (item, month):
+            stats[f"total_{kind}"] += record.count
+            stats[f"sum_{kind}"] += round(record.price * 100)
+
+    for stats in (*items.values(), *months.values()):
+        stats["sum_bought"] = round(stats["sum_bought"] / 100, 2)
+        stats["sum_sold"] = round(stats["sum_sold"] / 100, 2)
+    return dict(items), dict(months)
+
+
+def item_stats_by_key(aggregated_data: dict) -> dict:
+    return {
+        (app_id, item_hash_name): {
+            "item_name": stats.item_name, "total_bought": stats.total_bought, "total_sold": stats.total_sold,
+            "sum_bought": stats.sum_bought, "sum_sold": stats.sum_sold
+        }
+        for app_id, items in aggregated_data.items() for item_hash_name, stats in items.items()
+    }
+
+
+def month_stats_by_key(aggregated_data: dict) -> dict:
+    return {
+        (app_id, period): {
+            "total_bought": stats.total_bought, "total_sold": stats.total_sold,
+            "sum_bought": stats.sum_bought, "sum_sold": stats.sum_sold
+        }
+        for app_id, months in aggregated_data.items() for period, stats in months.items()
+    }
+
+
+def profit_stats_by_key(aggregated_data: dict) -> dict:
+    return {
+        (app_id, item_hash_name): (
+            stats.item_name, stats.total_profitable, stats.total_unprofitable,
+            stats.sum_profitable, stats.sum_unprofitable, stats.bought_queue.to_list()
+        )
+        for app_id, items in aggregated_data.items() for item_hash_name, stats in items.items()
+    }
+
+
+@pytest.fixture
+def ledger(tmp_path):
+    with MarketHistoryLedger(tmp_path / "ledger.sqlite3") as ledger:
+        yield ledger
+
+
+def test_records_are_deduplicated_by_row_id(ledger):
+    records, record_dates = generate_records(120)
+
+    assert ledger.add_records(records[:80], record_dates[:80]) == 80
+    max_seq = ledger.max_seq()
+
+    # Повторная обработка страниц (например, после контрольной точки) частично перекрывает прежние
+    assert ledger.add_records(records[40:80], record_dates[40:80]) == 0
+    assert ledger.max_seq() == max_seq
+    assert ledger.add_records(records[60:], record_dates[60:]) == 40
+
+    assert len(ledger) == 120
+    assert [record.row_id for record, _ in ledger.iter_records()] == [record.row_id for record in records]
+
+
+def test_sql_summaries_match_in_memory(ledger):
+    records, record_dates = generate_records(600)
+    ledger.add_records(records, record_dates)
+    items, months = aggregate_in_memory(records, record_dates)
+
+    assert {(row["app_id"], row["item_hash_name"]): {
+        key: row[key] for key in ("item_name", "total_bought", "total_sold", "sum_bought", "sum_sold")
+    } for row in ledger.item_summary()} == items
+    assert {(row["app_id"], row["period"]): {
+        key: row[key] for key in ("total_bought", "total_sold", "sum_bought", "sum_sold")
+    } for row in ledger.monthly_summary()} == months
+
+
+def test_incremental_summaries_match_full(ledger):
+    records, record_dates = generate_records(600)
+    account = Account()
+    aggregated_data = defaultdict(lambda: defaultdict(MarketItemStats))
+    monthly_aggregated_data = defaultdict(lambda: defaultdict(MarketMonthStats))
+    profit_aggregated_data = defaultdict(lambda: defaultdict(MarketItemProfitStats))
+
+    ledger_seq = 0
+    for start, end in ((0, 250), (200, 430), (430, 600)):
+        ledger.add_records(records[start:end], record_dates[start:end])
+        account._aggregate_item_summary(ledger, aggregated_data, ledger_seq)
+        account._aggregate_monthly_summary(ledger, monthly_aggregated_data, ledger_seq)
+        account._aggregate_profit_summary(ledger, profit_aggregated_data, ledger_seq, batch_size=64)
+        ledger_seq = ledger.max_seq()
+
+    items, months = aggregate_in_memory(records, record_dates)
+    assert item_stats_by_key(aggregated_data) == items
+    assert month_stats_by_key(monthly_aggregated_data) == months
+
+    full_items, full_months, full_profit, _ = account._aggregate_ledger(ledger)
+    assert item_stats_by_key(full_items) == items
+    assert month_stats_by_key(full_months) == months
+    # Очередь покупок переходит между частями, поэтому прибыль совпадает с расчётом за один проход
+    assert profit_stats_by_key(profit_aggregated_data) == profit_stats_by_key(full_profit)
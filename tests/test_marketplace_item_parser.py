@@ -0,0 +1,77 @@
+import pytest
+import requests
+
+from benchmarks.steam_standin import StandinMarket, StandinServer
+from bot.marketplace.marketplace_item_parser.marketplace_item_parser import MarketplaceItemParser
+from enums import Urls
+
+
+@pytest.fixture
+def market():
+    return StandinMarket(items=20, listings=250, inventory=0, buy_orders=0, history=0)
+
+
+@pytest.fixture
+def parser(market, monkeypatch, unlimited_rate_limiter):
+    monkeypatch.delenv("ASYNC_HTTP", raising=False)
+    with StandinServer(market) as server:
+        Urls.configure(community=server.url, store=server.url, api=server.url, login=server.url)
+        yield MarketplaceItemParser(market.app_id, StandinMarket.CONTEXT_ID)
+    Urls.configure_from_env()
+
+
+def test_restarts_pass_when_listings_change_between_pages(market, parser, monkeypatch):
+    get_sell_orders_page = parser.get_sell_orders_page
+    pages = []
+
+    def get_page_and_sell_newest(session, start, count):
+        pages.append(start)
+        if len(pages) == 2:
+            # Продан самый новый лот: все следующие строки сдвигаются на одну позицию к началу
+            market.remove_listing(next(reversed(market.listings)))
+        return get_sell_orders_page(session, start, count)
+
+    monkeypatch.setattr(parser, "get_sell_orders_page", get_page_and_sell_newest)
+    items = list(parser.iter_sell_order_items(requests.Session(), page_size=100))
+
+    assert pages == [0, 100, 0, 100, 200]
+    assert parser.is_sell_orders_complete
+    assert len({item.order_id for item in items}) == len(items)
+    listed = {item.order_id for items in parser.sell_orders.values() for item in items}
+    assert listed == {int(order_id) for order_id in market.listings}
+
+
+def test_incomplete_when_listings_keep_changing(market, parser, monkeypatch):
+    get_sell_orders_page = parser.get_sell_orders_page
+
+    def get_page_and_sell_newest(session, start, count):
+        if start:
+            market.remove_listing(next(reversed(market.listings)))
+        return get_sell_orders_page(session, start, count)
+
+    monkeypatch.setattr(parser, "get_sell_orders_page", get_page_and_sell_newest)
+    for _ in parser.iter_sell_order_items(requests.Session(), page_size=100, max_restarts=2):
+        pass
+
+    assert not parser.is_sell_orders_complete
+    assert not parser.sell_orders
+
+
+def test_incomplete_pass_drops_previous_sell_orders(market, parser, monkeypatch):
+    session = requests.Session()
+    assert parser.parse_actual_sell_order_items(session)
+
+    get_sell_orders_page = parser.get_sell_orders_page
+
+    def get_page_and_sell_newest(session, start, count):
+        if start:
+            market.remove_listing(next(reversed(market.listings)))
+        return get_sell_orders_page(session, start, count)
+
+    monkeypatch.setattr(parser, "get_sell_orders_page", get_page_and_sell_newest)
+    for _ in parser.iter_sell_order_items(session, page_size=100, max_restarts=1):
+        pass
+
+    # По устаревшему списку нельзя ни снимать, ни выставлять лоты
+    assert not parser.is_sell_orders_complete
+    assert not parser.sell_orders
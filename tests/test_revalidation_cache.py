@@ -0,0 +1,62 @@
+import pytest
+import requests
+
+from benchmarks.steam_standin import StandinMarket, StandinServer
+from utils.revalidation_cache import RevalidationCache
+from utils.web_utils import api_request
+
+
+@pytest.fixture
+def server(monkeypatch):
+    monkeypatch.delenv("ASYNC_HTTP", raising=False)
+    market = StandinMarket(items=5, listings=0, inventory=10, buy_orders=0, history=0)
+    with StandinServer(market) as server:
+        yield server
+
+
+@pytest.fixture
+def inventory_url(server) -> str:
+    return f"{server.url}/inventory/76561197960287930/{StandinMarket.CONTEXT_ID}/2"
+
+
+def test_second_get_is_conditional(server, inventory_url):
+    session = requests.Session()
+    cache = RevalidationCache(maxsize=16)
+    params = {"l": "english", "count": 5}
+
+    first = api_request(session, "GET", inventory_url, params=params, revalidation_cache=cache)
+    assert "If-None-Match" not in first.request.headers
+    assert first.headers["ETag"]
+
+    second = api_request(session, "GET", inventory_url, params=params, revalidation_cache=cache)
+    assert second.request.headers["If-None-Match"] == first.headers["ETag"]
+    assert server.stats[("inventory", 200)] == 1
+    assert server.stats[("inventory", 304)] == 1
+
+
+def test_not_modified_returns_cached_body(server, inventory_url):
+    session = requests.Session()
+    cache = RevalidationCache(maxsize=16)
+    params = {"l": "english", "count": 5}
+
+    first = api_request(session, "GET", inventory_url, params=params, revalidation_cache=cache)
+    second = api_request(session, "GET", inventory_url, params=params, revalidation_cache=cache)
+
+    assert server.stats[("inventory", 304)] == 1
+    assert second.status_code == 200
+    assert second.content == first.content
+    assert second.json() == first.json()
+
+
+def test_cache_key_includes_params(server, inventory_url):
+    session = requests.Session()
+    cache = RevalidationCache(maxsize=16)
+
+    first = api_request(session, "GET", inventory_url, params={"count": 5}, revalidation_cache=cache)
+    other = api_request(session, "GET", inventory_url, params={"count": 10}, revalidation_cache=cache)
+
+    assert "If-None-Match" not in other.request.headers
+    assert server.stats[("inventory", 200)] == 2
+    assert server.stats[("inventory", 304)] == 0
+    assert len(other.json()["assets"]) == 10
+    assert len(first.json()["assets"]) == 5
@@ -0,0 +1,36 @@
+import json
+
+import pytest
+
+from benchmarks.market_history_excel import generate_history_jsons, workbook_parts
+from bot.account.summarize_to_excel import SummarizeToExcel
+
+NAMES = ("summarize", "monthly_summarize", "profit_summarize")
+
+
+@pytest.fixture
+def json_paths(tmp_path) -> dict:
+    paths = {name: tmp_path / f"{name}.json" for name in NAMES}
+    for name, saved in zip(NAMES, generate_history_jsons(games=3, items=60, months=14)):
+        paths[name].write_text(json.dumps(saved, ensure_ascii=False), encoding="utf-8")
+    return paths
+
+
+def summarize_all(json_paths: dict, excel_dir, workers: int) -> dict:
+    excel_maker = SummarizeToExcel(workers=workers)
+    # Листы тоже готовятся в пуле процессов, несмотря на небольшой размер сводок
+    excel_maker.PARALLEL_PREPARE_MIN_ROWS = 0
+
+    excel_dir.mkdir()
+    excel_paths = {name: excel_dir / f"{name}.xlsx" for name in NAMES}
+    excel_maker.summarize_all_to_excel(
+        *(str(path) for name in NAMES for path in (json_paths[name], excel_paths[name])), workers=workers)
+    return excel_paths
+
+
+def test_parallel_workbooks_match_sequential(json_paths, tmp_path):
+    sequential = summarize_all(json_paths, tmp_path / "sequential", workers=1)
+    parallel = summarize_all(json_paths, tmp_path / "parallel", workers=3)
+
+    for name in NAMES:
+        assert workbook_parts(parallel[name]) == workbook_parts(sequential[name]), name
@@ -0,0 +1,49 @@
+import logging
+
+import pytest
+import requests
+
+from bot.account.wallet_history_client import WalletHistoryClient
+from utils.exceptions import TooManyRequestsError
+
+PAGE = """
+<table><tr class="wallet_table_row">
+    <td class="wht_date">{date}</td><td class="wht_items">Item</td><td class="wht_type">TransactionWallet</td>
+</tr></table>
+"""
+
+
+def history_page(date_text: str) -> requests.Response:
+    response = requests.Response()
+    response.status_code = 200
+    response._content = PAGE.format(date=date_text).encode()
+    return response
+
+
+@pytest.fixture
+def client() -> WalletHistoryClient:
+    return WalletHistoryClient(logging.getLogger(__name__))
+
+
+def test_dates_are_parsed(client, monkeypatch):
+    monkeypatch.setattr(client, "get_history_page", lambda session: history_page("5 Jan, 2024"))
+
+    assert [str(d) for d in client.iter_wallet_dates(requests.Session())] == ["2024-01-05"]
+
+
+def test_too_many_requests_becomes_runtime_error(client, monkeypatch):
+    def get_history_page(session):
+        raise TooManyRequestsError()
+
+    monkeypatch.setattr(client, "get_history_page", get_history_page)
+
+    # RuntimeError переключает сбор дат на браузер (см. Account._collect_history_dates)
+    with pytest.raises(RuntimeError):
+        list(client.iter_wallet_dates(requests.Session()))
+
+
+def test_unexpected_date_becomes_runtime_error(client, monkeypatch):
+    monkeypatch.setattr(client, "get_history_page", lambda session: history_page("2024-01-05"))
+
+    with pytest.raises(RuntimeError):
+        list(client.iter_wallet_dates(requests.Session()))
@@ -1,10 +1,12 @@
 from .custom_ttl_cache import CustomTTLCache
 from .tools import escape_brackets, rich_auto_text
 from .basic_logger import BasicLogger
+from .ordered_prefetcher import OrderedPrefetcher
 
 __all__ = [
     "CustomTTLCache",
     "escape_brackets",
     "rich_auto_text",
-    "BasicLogger"
+    "BasicLogger",
+    "OrderedPrefetcher"
 ]
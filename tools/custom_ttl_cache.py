@@ -1,11 +1,16 @@
 import os
+import time
 import cachetools
 import dill
-from typing import Optional
+from typing import Callable, Optional
 
 class CustomTTLCache(cachetools.TTLCache):
-    def __init__(self, maxsize: int, ttl: int) -> None:
-        super().__init__(maxsize, ttl)
+    def __init__(self, maxsize: int, ttl: int, timer: Callable[[], float] = time.monotonic) -> None:
+        """
+        :param timer: Источник времени. Для кэша, сохраняемого на диск и загружаемого в другом процессе,
+            следует передавать time.time: отсчёт time.monotonic не сохраняется между перезапусками
+        """
+        super().__init__(maxsize, ttl, timer)
 
     def save_cache(self, filename: str) -> None:
         cache_dir = os.path.dirname(filename)
@@ -14,9 +19,18 @@ class CustomTTLCache(cachetools.TTLCache):
             dill.dump(self, f)
 
     @classmethod
-    def load_cache(cls, filename: str, maxsize: int, ttl: int) -> Optional['CustomTTLCache']:
+    def load_cache(
+            cls, filename: str, maxsize: int, ttl: int, timer: Callable[[], float] = time.monotonic
+    ) -> Optional['CustomTTLCache']:
+        """
+            Если кэш был сохранён с другими maxsize или ttl, он не загружается: срок жизни записей
+            задаётся при добавлении, и старые записи жили бы по прежнему ttl
+        """
         try:
             with open(filename, 'rb') as f:
-                return dill.load(f)
+                cache = dill.load(f)
         except FileNotFoundError:
-            return cls(maxsize, ttl)
+            return cls(maxsize, ttl, timer)
+        if cache.maxsize != maxsize or cache.ttl != ttl:
+            return cls(maxsize, ttl, timer)
+        return cache
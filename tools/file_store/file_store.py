@@ -1,3 +1,4 @@
+import os
 import json
 import pickle
 from pathlib import Path
@@ -44,17 +45,26 @@ class FileStore:
             dir_path.mkdir(parents=True, exist_ok=True)
 
     def save(self, path: str | Path, obj: Any) -> bool:
+        """
+        Файл записывается во временный файл рядом и затем атомарно заменяет исходный,
+        поэтому при сбое во время записи остаётся предыдущая версия файла
+        """
         path = Path(path)
+        tmp_path = path.with_name(f"{path.name}.tmp")
         try:
             self._ensure_dir(path)
             mode = "wb" if self.binary else "w"
             encoding = None if self.binary else "utf-8"
 
-            with open(path, mode, encoding=encoding) as f:
+            with open(tmp_path, mode, encoding=encoding) as f:
                 self.serializer(obj, f)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, path)
             return True
         except Exception as e:
             print(f"File save failed for {path}: {e}")
+            tmp_path.unlink(missing_ok=True)
             return False
 
     def load(self, path: str | Path, default: Optional[Any] = None) -> Any:
@@ -0,0 +1,48 @@
+import contextvars
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Iterable, Iterator
+
+
+class OrderedPrefetcher:
+    """
+        Выполняет func для элементов items в пуле потоков, заранее запуская не более window задач,
+        и выдаёт пары (элемент, результат) в исходном порядке элементов.
+        Исключение из func пробрасывается при получении соответствующего результата.
+        Задачи выполняются в копии контекста вызывающего потока (например, с его request_priority).
+    """
+    def __init__(
+            self, func: Callable[[Any], Any], items: Iterable, max_workers: int = 4, window: int | None = None
+    ) -> None:
+        """
+        :param func: Функция, применяемая к каждому элементу (обычно - обращение к сервису).
+        :param items: Элементы для обработки.
+        :param max_workers: Количество потоков.
+        :param window: Сколько задач может выполняться наперёд (по умолчанию - 2 * max_workers).
+        """
+        self.func = func
+        self.items = items
+        self.max_workers = max_workers
+        self.window = window if window else 2 * max_workers
+
+    def _submit(self, executor: ThreadPoolExecutor, item: Any):
+        return executor.submit(contextvars.copy_context().run, self.func, item)
+
+    def __iter__(self) -> Iterator[tuple[Any, Any]]:
+        items = iter(self.items)
+        executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        pending = deque()
+        try:
+            for item in items:
+                pending.append((item, self._submit(executor, item)))
+                if len(pending) >= self.window:
+                    break
+
+            while pending:
+                item, future = pending.popleft()
+                for next_item in items:
+                    pending.append((next_item, self._submit(executor, next_item)))
+                    break
+                yield item, future.result()
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
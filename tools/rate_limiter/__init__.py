@@ -1,7 +1,18 @@
-from .service_limit import ServiceLimit
+from .token_bucket import TokenBucket
+from .adaptive_token_bucket import AdaptiveTokenBucket
+from .shared_token_bucket import SharedTokenBucket
+from .file_lock import FileLock
+from .rate_limiter_registry import RateLimiterRegistry
+from .request_scheduler import RequestScheduler, request_priority
 from .dec_rate_limited import rate_limited
 
 __all__ = [
-    "ServiceLimit",
+    "TokenBucket",
+    "AdaptiveTokenBucket",
+    "SharedTokenBucket",
+    "FileLock",
+    "RateLimiterRegistry",
+    "RequestScheduler",
+    "request_priority",
     "rate_limited"
 ]
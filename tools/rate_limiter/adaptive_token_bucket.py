@@ -0,0 +1,73 @@
+import time
+from typing import Callable, Optional
+
+from tools.rate_limiter.token_bucket import TokenBucket
+
+
+class AdaptiveTokenBucket(TokenBucket):
+    """
+        Корзина токенов, подстраивающая скорость под ответы сервиса (AIMD):
+        после ответа 429 скорость уменьшается в 1 / decrease_factor раз, а запросы приостанавливаются
+        на cooldown секунд; после каждых probe_interval секунд без ошибок скорость увеличивается на increase_step.
+    """
+    def __init__(
+            self, rate: float, burst: float, min_rate: float, max_rate: float, increase_step: float,
+            decrease_factor: float = 0.5, probe_interval: float = 60, cooldown: float = 20,
+            on_rate_changed: Optional[Callable[[float], None]] = None
+    ):
+        """
+        :param rate: Начальная скорость пополнения корзины (запросов в секунду).
+        :param burst: Ёмкость корзины.
+        :param min_rate: Скорость, ниже которой корзина не замедляется.
+        :param max_rate: Скорость, выше которой корзина не ускоряется.
+        :param increase_step: Прибавка к скорости после probe_interval секунд без ошибок.
+        :param decrease_factor: Множитель скорости после ответа 429.
+        :param probe_interval: Период (в секундах) между попытками увеличить скорость.
+        :param cooldown: Пауза (в секундах) после ответа 429.
+        :param on_rate_changed: Вызывается с новой скоростью после каждого её изменения.
+        """
+        super().__init__(min(max(rate, min_rate), max_rate), burst)
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase_step = increase_step
+        self.decrease_factor = decrease_factor
+        self.probe_interval = probe_interval
+        self.cooldown = cooldown
+        self.on_rate_changed = on_rate_changed
+
+        self.blocked_until = 0
+        self.last_adjustment = time.time()
+
+    def _take(self, now: float) -> float:
+        if now < self.blocked_until:
+            return self.blocked_until - now
+        return super()._take(now)
+
+    def on_success(self) -> None:
+        with self._locked():
+            now = time.time()
+            if self.rate >= self.max_rate or now - self.last_adjustment < self.probe_interval:
+                return
+            self.rate = min(self.max_rate, self.rate + self.increase_step)
+            self.last_adjustment = now
+            rate = self.rate
+        self._notify_rate_changed(rate)
+
+    def on_too_many_requests(self) -> None:
+        with self._locked():
+            now = time.time()
+            # Одновременно выполнявшиеся запросы получают 429 вместе: это одно превышение лимита, а не несколько
+            if now < self.blocked_until:
+                return
+            self._refill(now)
+            self.rate = max(self.min_rate, self.rate * self.decrease_factor)
+            self.tokens = 0
+            self.blocked_until = now + self.cooldown
+            self.last_refill = self.blocked_until
+            self.last_adjustment = self.blocked_until
+            rate = self.rate
+        self._notify_rate_changed(rate)
+
+    def _notify_rate_changed(self, rate: float) -> None:
+        if self.on_rate_changed:
+            self.on_rate_changed(rate)
@@ -1,25 +1,54 @@
-import time
+import inspect
 from functools import wraps
 
-from .service_limit import ServiceLimit
+from .rate_limiter_registry import RateLimiterRegistry
+from .request_scheduler import RequestScheduler
+from utils.exceptions import TooManyRequestsError
+from enums import RequestPriority
 
 
-def rate_limited(min_delay: float):
+def rate_limited(
+        host: str, endpoint_class: str, priority: RequestPriority | None = None, max_429_retries: int = 5):
     """
-        Декоратор для управления задержкой между вызовами метода, обращающегося к сервису.
+        Декоратор для управления частотой вызовов метода, обращающегося к сервису.
+        Все методы с одинаковыми host и endpoint_class делят одну корзину токенов, а очередь
+        к корзинам обслуживается RequestScheduler по приоритету запроса (если priority не задан,
+        используется приоритет из request_priority или приоритет по умолчанию для endpoint_class).
+        При ответе 429 (TooManyRequestsError) корзина замедляется, а вызов повторяется
+        (не более max_429_retries раз), после чего исключение пробрасывается дальше.
+        Поддерживает как обычные функции (в т.ч. из нескольких потоков), так и корутины.
     """
-    service_limit = ServiceLimit(min_delay)
-
     def decorator(func):
+        if inspect.iscoroutinefunction(func):
+            @wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                bucket = RateLimiterRegistry.get().bucket(host, endpoint_class)
+                for attempt in range(max_429_retries + 1):
+                    await RequestScheduler.get().acquire_async(host, endpoint_class, priority)
+                    try:
+                        result = await func(*args, **kwargs)
+                    except TooManyRequestsError:
+                        bucket.on_too_many_requests()
+                        if attempt == max_429_retries:
+                            raise
+                        continue
+                    bucket.on_success()
+                    return result
+            return async_wrapper
+
         @wraps(func)
         def wrapper(*args, **kwargs):
-            elapsed_time = service_limit.time_since_last_request()
-
-            if elapsed_time < service_limit.min_delay:
-                wait_time = service_limit.min_delay - elapsed_time
-                time.sleep(wait_time)
-
-            service_limit.update_last_request_time()
-            return func(*args, **kwargs)
+            bucket = RateLimiterRegistry.get().bucket(host, endpoint_class)
+            for attempt in range(max_429_retries + 1):
+                RequestScheduler.get().acquire(host, endpoint_class, priority)
+                try:
+                    result = func(*args, **kwargs)
+                except TooManyRequestsError:
+                    bucket.on_too_many_requests()
+                    if attempt == max_429_retries:
+                        raise
+                    continue
+                bucket.on_success()
+                return result
         return wrapper
     return decorator
@@ -0,0 +1,129 @@
+import os
+import threading
+from typing import Optional
+
+from tools.file_store import FileStore, FileStoreType
+from tools.rate_limiter.adaptive_token_bucket import AdaptiveTokenBucket
+from tools.rate_limiter.shared_token_bucket import SharedTokenBucket
+from tools.rate_limiter.file_lock import FileLock
+from enums import Host, EndpointClass
+
+from _root import project_root
+
+
+class RateLimiterRegistry:
+    """
+        Общий реестр корзин токенов. Steam ограничивает частоту запросов по хосту и группе
+        эндпоинтов, поэтому все методы, обращающиеся к одной группе, делят одну корзину.
+        Скорость каждой корзины подстраивается под ответы 429 и сохраняется между запусками.
+
+        Переменная окружения RATE_LIMITER_BACKEND выбирает, где хранятся корзины:
+        "memory" (по умолчанию) - в памяти процесса,
+        "file" - в файлах data/rate_limiter/shared/, общих для всех процессов на компьютере.
+    """
+    _instance: Optional['RateLimiterRegistry'] = None
+    _instance_lock = threading.Lock()
+
+    # (хост, класс эндпоинта): (запросов в секунду, ёмкость корзины)
+    DEFAULT_LIMITS: dict[tuple[str, str], tuple[float, float]] = {
+        (Host.COMMUNITY, EndpointClass.HOST): (1.5, 3),
+        (Host.STORE, EndpointClass.HOST): (1, 2),
+        (Host.COMMUNITY, EndpointClass.MARKET_DATA): (1 / 3, 2),
+        (Host.COMMUNITY, EndpointClass.MARKET_LISTINGS): (1 / 6, 1),
+        (Host.COMMUNITY, EndpointClass.MARKET_ACTION): (1, 2),
+        (Host.COMMUNITY, EndpointClass.MARKET_HISTORY): (1 / 3, 1),
+        (Host.COMMUNITY, EndpointClass.INVENTORY): (1 / 2, 1),
+        (Host.STORE, EndpointClass.ACCOUNT): (1, 1),
+    }
+    FALLBACK_LIMIT: tuple[float, float] = (1 / 6, 1)
+
+    # Границы подстройки скорости относительно заданной в лимитах
+    MIN_RATE_MULTIPLIER: float = 1 / 8
+    MAX_RATE_MULTIPLIER: float = 2
+    INCREASE_STEP_MULTIPLIER: float = 0.1
+
+    def __init__(
+            self,
+            settings_file_name: str = "rate_limiter_settings.json",
+            learned_rates_file_name: str = "rate_limiter/learned_rates.json",
+            shared_state_dir_name: str = "rate_limiter/shared"
+    ) -> None:
+        """
+        :param settings_file_name: Имя файла в директории data/ с переопределёнными лимитами вида
+            {"<хост>/<класс эндпоинта>": {"rate": <запросов в секунду>, "burst": <ёмкость корзины>}}
+        :param learned_rates_file_name: Имя файла в директории data/ с подобранными скоростями
+        :param shared_state_dir_name: Директория в data/ с состоянием корзин, общих для нескольких процессов
+        """
+        self.file_store = FileStore.from_type(FileStoreType.JSON)
+
+        self.settings_file_path = project_root / f"data/{settings_file_name}"
+        self.limits = dict(self.DEFAULT_LIMITS)
+        self.load_settings()
+
+        self.learned_rates_file_path = project_root / f"data/{learned_rates_file_name}"
+        self.learned_rates: dict[str, float] = self.file_store.load(self.learned_rates_file_path, default={})
+
+        self.shared_state_dir = project_root / f"data/{shared_state_dir_name}"
+        self.is_shared = os.getenv("RATE_LIMITER_BACKEND", "memory").strip().lower() == "file"
+
+        self.buckets: dict[tuple[str, str], AdaptiveTokenBucket] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def get(cls) -> 'RateLimiterRegistry':
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = cls()
+            return cls._instance
+
+    @staticmethod
+    def _key_to_str(key: tuple[str, str]) -> str:
+        return "/".join(key)
+
+    def load_settings(self) -> None:
+        settings = self.file_store.load(self.settings_file_path, default={})
+        for key, limit in settings.items():
+            host, endpoint_class = key.split("/", maxsplit=1)
+            self.limits[(host, endpoint_class)] = (float(limit["rate"]), float(limit["burst"]))
+
+    def configure(self, host: str, endpoint_class: str, rate: float, burst: float) -> None:
+        with self._lock:
+            self.limits[(host, endpoint_class)] = (rate, burst)
+            if bucket := self.buckets.get((host, endpoint_class)):
+                bucket.min_rate = rate * self.MIN_RATE_MULTIPLIER
+                bucket.max_rate = rate * self.MAX_RATE_MULTIPLIER
+                bucket.increase_step = rate * self.INCREASE_STEP_MULTIPLIER
+                bucket.rate = rate
+                bucket.burst = burst
+
+    def bucket(self, host: str, endpoint_class: str) -> AdaptiveTokenBucket:
+        key = (host, endpoint_class)
+        with self._lock:
+            if key not in self.buckets:
+                self.buckets[key] = self._create_bucket(key)
+            return self.buckets[key]
+
+    def _create_bucket(self, key: tuple[str, str]) -> AdaptiveTokenBucket:
+        rate, burst = self.limits.get(key, self.FALLBACK_LIMIT)
+        bucket_params = {
+            "rate": self.learned_rates.get(self._key_to_str(key), rate),
+            "burst": burst,
+            "min_rate": rate * self.MIN_RATE_MULTIPLIER,
+            "max_rate": rate * self.MAX_RATE_MULTIPLIER,
+            "increase_step": rate * self.INCREASE_STEP_MULTIPLIER,
+            "on_rate_changed": lambda new_rate: self._save_learned_rate(key, new_rate)
+        }
+        if self.is_shared:
+            host, endpoint_class = key
+            return SharedTokenBucket(self.shared_state_dir / f"{host}_{endpoint_class}.json", **bucket_params)
+        return AdaptiveTokenBucket(**bucket_params)
+
+    def _save_learned_rate(self, key: tuple[str, str], rate: float) -> None:
+        """
+            Файл подобранных скоростей общий для всех процессов: он перечитывается под межпроцессной
+            блокировкой, и в нём меняется только скорость этой корзины
+        """
+        with self._lock, FileLock(self.learned_rates_file_path.with_suffix(".lock")):
+            self.learned_rates.update(self.file_store.load(self.learned_rates_file_path, default={}))
+            self.learned_rates[self._key_to_str(key)] = rate
+            self.file_store.save(self.learned_rates_file_path, self.learned_rates)
@@ -0,0 +1,113 @@
+import heapq
+import asyncio
+import itertools
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+
+from tools.rate_limiter.rate_limiter_registry import RateLimiterRegistry
+from tools.rate_limiter.token_bucket import TokenBucket
+from enums import EndpointClass, RequestPriority
+
+_request_priority: ContextVar[Optional[RequestPriority]] = ContextVar("request_priority", default=None)
+
+
+@contextmanager
+def request_priority(priority: RequestPriority):
+    """
+        Задать приоритет всех запросов внутри блока (для текущего потока или задачи asyncio)
+    """
+    token = _request_priority.set(priority)
+    try:
+        yield
+    finally:
+        _request_priority.reset(token)
+
+
+class RequestScheduler:
+    """
+        Центральный планировщик запросов. Каждый запрос получает токен сначала из корзины
+        своего класса эндпоинтов, затем из общей корзины хоста. Когда токенов не хватает,
+        ожидающие запросы обслуживаются по приоритету (RequestPriority), а при равном приоритете - по очереди,
+        поэтому выставление ордеров не простаивает за массовым чтением данных.
+    """
+    _instance: Optional['RequestScheduler'] = None
+    _instance_lock = threading.Lock()
+
+    ASYNC_POLL_INTERVAL: float = 0.05
+
+    def __init__(self, registry: RateLimiterRegistry | None = None) -> None:
+        self.registry = registry if registry else RateLimiterRegistry.get()
+        self._condition = threading.Condition()
+        self._queues: dict[int, list[tuple[int, int]]] = defaultdict(list)
+        self._counter = itertools.count()
+
+    @classmethod
+    def get(cls) -> 'RequestScheduler':
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = cls()
+            return cls._instance
+
+    @staticmethod
+    def resolve_priority(endpoint_class: str, priority: RequestPriority | None = None) -> RequestPriority:
+        if priority is not None:
+            return priority
+        if (context_priority := _request_priority.get()) is not None:
+            return context_priority
+        if endpoint_class == EndpointClass.MARKET_ACTION:
+            return RequestPriority.MUTATION
+        return RequestPriority.ACTIVE_READ
+
+    def _buckets(self, host: str, endpoint_class: str) -> tuple[TokenBucket, TokenBucket]:
+        return self.registry.bucket(host, endpoint_class), self.registry.bucket(host, EndpointClass.HOST)
+
+    def acquire(self, host: str, endpoint_class: str, priority: RequestPriority | None = None) -> None:
+        priority = self.resolve_priority(endpoint_class, priority)
+        for bucket in self._buckets(host, endpoint_class):
+            self._acquire_bucket(bucket, priority)
+
+    async def acquire_async(self, host: str, endpoint_class: str, priority: RequestPriority | None = None) -> None:
+        priority = self.resolve_priority(endpoint_class, priority)
+        for bucket in self._buckets(host, endpoint_class):
+            await self._acquire_bucket_async(bucket, priority)
+
+    def _remove_ticket(self, queue: list[tuple[int, int]], ticket: tuple[int, int]) -> None:
+        if ticket in queue:
+            queue.remove(ticket)
+            heapq.heapify(queue)
+        self._condition.notify_all()
+
+    def _acquire_bucket(self, bucket: TokenBucket, priority: RequestPriority) -> None:
+        ticket = (int(priority), next(self._counter))
+        with self._condition:
+            queue = self._queues[id(bucket)]
+            heapq.heappush(queue, ticket)
+            try:
+                while True:
+                    if queue[0] != ticket:
+                        self._condition.wait()
+                    elif (wait_time := bucket.try_acquire()) > 0:
+                        self._condition.wait(wait_time)
+                    else:
+                        return
+            finally:
+                self._remove_ticket(queue, ticket)
+
+    async def _acquire_bucket_async(self, bucket: TokenBucket, priority: RequestPriority) -> None:
+        ticket = (int(priority), next(self._counter))
+        with self._condition:
+            queue = self._queues[id(bucket)]
+            heapq.heappush(queue, ticket)
+        try:
+            while True:
+                with self._condition:
+                    wait_time = self.ASYNC_POLL_INTERVAL
+                    if queue[0] == ticket and (wait_time := bucket.try_acquire()) == 0:
+                        return
+                await asyncio.sleep(min(wait_time, self.ASYNC_POLL_INTERVAL))
+        finally:
+            with self._condition:
+                self._remove_ticket(queue, ticket)
@@ -0,0 +1,89 @@
+import os
+import json
+import time
+from pathlib import Path
+from contextlib import contextmanager
+
+from tools.rate_limiter.adaptive_token_bucket import AdaptiveTokenBucket
+from tools.rate_limiter.file_lock import FileLock
+
+
+class SharedTokenBucket(AdaptiveTokenBucket):
+    """
+        Адаптивная корзина токенов, состояние которой хранится в файле и разделяется
+        всеми процессами на одном компьютере (например, несколькими запущенными ботами с одного IP).
+        Каждая операция выполняется под межпроцессной блокировкой файла. Файл перечитывается,
+        только если его изменил другой процесс, и перезаписывается, только если операция изменила состояние.
+    """
+    STATE_FIELDS = ("tokens", "last_refill", "rate", "blocked_until", "last_adjustment")
+
+    def __init__(self, state_file_path: str | Path, *args, **kwargs):
+        """
+        :param state_file_path: Путь к файлу состояния корзины (рядом создаётся файл блокировки .lock).
+        Остальные параметры совпадают с AdaptiveTokenBucket.
+        """
+        super().__init__(*args, **kwargs)
+        self.state_file_path = Path(state_file_path)
+        self.lock_file_path = self.state_file_path.with_suffix(".lock")
+        # (inode, время изменения, размер) файла состояния на момент последнего чтения или записи
+        self._file_stamp: tuple[int, int, int] | None = None
+
+    @contextmanager
+    def _locked(self):
+        with self._lock, FileLock(self.lock_file_path):
+            self._load_state()
+            state = self._state()
+            yield
+            if self._state() != state:
+                self._save_state()
+
+    def _take(self, now: float) -> float:
+        tokens, last_refill = self.tokens, self.last_refill
+        wait_time = super()._take(now)
+        if wait_time > 0:
+            # Пополнение без взятого токена не сохраняется: при следующей попытке оно будет посчитано заново
+            self.tokens, self.last_refill = tokens, last_refill
+        return wait_time
+
+    def on_success(self) -> None:
+        # До следующей попытки ускорения скорость не меняется, поэтому файл не нужен.
+        # Другие процессы только сдвигают last_adjustment вперёд, так что проверка по памяти не пропустит попытку
+        if time.time() - self.last_adjustment < self.probe_interval:
+            return
+        super().on_success()
+
+    def _state(self) -> dict[str, float]:
+        return {field: getattr(self, field) for field in self.STATE_FIELDS}
+
+    def _stat_file(self) -> tuple[int, int, int] | None:
+        try:
+            stat = os.stat(self.state_file_path)
+        except FileNotFoundError:
+            return None
+        return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+    def _load_state(self) -> None:
+        file_stamp = self._stat_file()
+        if file_stamp is None or file_stamp == self._file_stamp:
+            return
+        try:
+            with open(self.state_file_path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return
+        self._file_stamp = file_stamp
+
+        for field in self.STATE_FIELDS:
+            if field in state:
+                setattr(self, field, float(state[field]))
+        self.rate = min(max(self.rate, self.min_rate), self.max_rate)
+        self.tokens = min(self.tokens, self.burst)
+
+    def _save_state(self) -> None:
+        # Запись через временный файл и замену: у нового файла другой inode, и чужая запись не пройдёт незамеченной
+        self.state_file_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.state_file_path.with_name(f"{self.state_file_path.name}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self._state(), f)
+        os.replace(tmp_path, self.state_file_path)
+        self._file_stamp = self._stat_file()
@@ -0,0 +1,53 @@
+import time
+import asyncio
+import threading
+from contextlib import contextmanager
+
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: float):
+        """
+        :param rate: Скорость пополнения корзины (токенов, т.е. запросов, в секунду).
+        :param burst: Ёмкость корзины (сколько запросов можно выполнить подряд без ожидания).
+        """
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.last_refill = time.time()
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def _locked(self):
+        """
+            Защищает состояние корзины на время одной операции
+        """
+        with self._lock:
+            yield
+
+    def _refill(self, now: float) -> None:
+        if now > self.last_refill:
+            self.tokens = min(self.burst, self.tokens + (now - self.last_refill) * self.rate)
+            self.last_refill = now
+
+    def try_acquire(self) -> float:
+        """
+            Попытаться взять токен.
+            :return: 0, если токен получен, иначе время (в секундах) до появления токена
+        """
+        with self._locked():
+            return self._take(time.time())
+
+    def _take(self, now: float) -> float:
+        self._refill(now)
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0
+        return (1 - self.tokens) / self.rate
+
+    def acquire(self) -> None:
+        while (wait_time := self.try_acquire()) > 0:
+            time.sleep(wait_time)
+
+    async def acquire_async(self) -> None:
+        while (wait_time := self.try_acquire()) > 0:
+            await asyncio.sleep(wait_time)
@@ -1,7 +1,8 @@
-from .utils import is_str_int
+from .utils import is_str_int, parse_steam_date
 from .web_utils import handle_429_status_code
 
 __all__ = {
     "is_str_int",
+    "parse_steam_date",
     "handle_429_status_code"
 }
@@ -0,0 +1,225 @@
+import os
+import ssl
+import atexit
+import asyncio
+import threading
+from http.client import HTTPMessage
+from typing import Any, Coroutine, Optional
+from urllib.parse import urljoin, urlparse
+
+import aiohttp
+import requests
+from requests.cookies import MockRequest, MockResponse
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers, select_proxy
+
+# Ошибки транспорта, после которых запрос имеет смысл повторить
+TRANSPORT_ERRORS = (aiohttp.ClientConnectionError, aiohttp.ClientPayloadError, asyncio.TimeoutError)
+
+
+class AsyncWebClient:
+    """
+        Асинхронный HTTP-клиент: один aiohttp.ClientSession с пулами keep-alive соединений
+        для каждого хоста (steamcommunity.com, store.steampowered.com и т.д.),
+        работающий в отдельном потоке со своим event loop.
+
+        Куки берутся из requests.Session и записываются обратно, а ответ приводится
+        к requests.Response, поэтому клиент взаимозаменяем с requests.Session.request.
+        Перенаправления обрабатываются клиентом, а не aiohttp: каждый переход собирается заново
+        через сессию, поэтому куки, выставленные на промежуточном ответе, уходят со следующим запросом.
+        Прокси, verify и cert сессии (и переменные окружения, как у requests) тоже учитываются.
+    """
+    # Прокси, с которыми умеет работать aiohttp
+    PROXY_SCHEMES = ("http", "https")
+    _instance: Optional['AsyncWebClient'] = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self, limit_per_host: int = 8, keepalive_timeout: float = 60) -> None:
+        """
+        :param limit_per_host: Максимальное количество одновременных соединений с одним хостом.
+        :param keepalive_timeout: Время (в секундах), в течение которого простаивающее соединение остаётся открытым.
+        """
+        self.limit_per_host = limit_per_host
+        self.keepalive_timeout = keepalive_timeout
+
+        self.loop = asyncio.new_event_loop()
+        self._client: aiohttp.ClientSession | None = None
+        self._ssl_contexts: dict[tuple, ssl.SSLContext] = {}
+        self._thread = threading.Thread(target=self.loop.run_forever, name=self.__class__.__name__, daemon=True)
+        self._thread.start()
+
+    @classmethod
+    def get(cls) -> 'AsyncWebClient':
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = cls()
+                atexit.register(cls._instance.close)
+            return cls._instance
+
+    def run(self, coro: Coroutine) -> Any:
+        """
+            Синхронно выполнить корутину в event loop клиента (для синхронных вызовов)
+        """
+        if threading.current_thread() is self._thread:
+            coro.close()
+            raise RuntimeError("Синхронный вызов из event loop клиента приведёт к взаимной блокировке")
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result()
+
+    async def run_async(self, coro: Coroutine) -> Any:
+        """
+            Выполнить корутину в event loop клиента из любого event loop (в том числе из самого клиента)
+        """
+        if asyncio.get_running_loop() is self.loop:
+            return await coro
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, self.loop))
+
+    def close(self) -> None:
+        if self.loop.is_closed():
+            return
+        if self._client is not None and not self._client.closed:
+            asyncio.run_coroutine_threadsafe(self._client.close(), self.loop).result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join()
+        self.loop.close()
+
+    def _get_client(self) -> aiohttp.ClientSession:
+        if self._client is None or self._client.closed:
+            connector = aiohttp.TCPConnector(
+                limit_per_host=self.limit_per_host,
+                keepalive_timeout=self.keepalive_timeout,
+                ttl_dns_cache=300
+            )
+            # Куки хранятся только в requests.Session, поэтому собственный cookie jar отключён
+            self._client = aiohttp.ClientSession(connector=connector, cookie_jar=aiohttp.DummyCookieJar())
+        return self._client
+
+    async def request(
+            self,
+            session: requests.Session,
+            method: str,
+            url: str,
+            *,
+            headers: dict = None,
+            params: dict = None,
+            data: dict = None,
+            json: dict = None,
+            timeout: float = 15
+    ) -> requests.Response:
+        """
+            Аналог requests.Session.request, выполняемый через общий пул соединений.
+            Должен выполняться в event loop клиента (см. run и run_async)
+        """
+        headers = dict(headers or {})
+        prepared = session.prepare_request(requests.Request(
+            method, url, headers=headers, params=params, data=data, json=json
+        ))
+
+        history = []
+        while True:
+            result = await self._send(session, prepared, timeout)
+            target = session.get_redirect_target(result)
+            if not target:
+                break
+            if len(history) >= session.max_redirects:
+                raise requests.TooManyRedirects(f"Превышено {session.max_redirects} перенаправлений", response=result)
+            history.append(result)
+
+            # Как у requests: метод меняется на GET для 303 и для 301/302 после POST, тело остаётся только для 307/308
+            next_url = urljoin(result.url, target)
+            next_request = prepared.copy()
+            session.rebuild_method(next_request, result)
+            keep_body = result.status_code in (307, 308)
+            if session.should_strip_auth(prepared.url, next_url):
+                headers.pop("Authorization", None)
+
+            prepared = session.prepare_request(requests.Request(
+                next_request.method, next_url, headers=headers,
+                data=data if keep_body else None, json=json if keep_body else None
+            ))
+
+        result.history = history
+        return result
+
+    async def _send(
+            self, session: requests.Session, prepared: requests.PreparedRequest, timeout: float
+    ) -> requests.Response:
+        """
+            Один HTTP-запрос без перенаправлений; куки из ответа сохраняются в сессию
+        """
+        settings = session.merge_environment_settings(prepared.url, {}, False, None, None)
+        proxy = select_proxy(prepared.url, settings["proxies"])
+        if proxy and urlparse(proxy).scheme not in self.PROXY_SCHEMES:
+            raise ValueError(f"Прокси {urlparse(proxy).scheme} не поддерживается асинхронным движком (ASYNC_HTTP)")
+
+        request_headers = {
+            key: value for key, value in prepared.headers.items() if key.lower() != "content-length"
+        }
+
+        async with self._get_client().request(
+                prepared.method,
+                prepared.url,
+                headers=request_headers,
+                data=prepared.body,
+                allow_redirects=False,
+                proxy=proxy,
+                ssl=self._ssl_context(settings["verify"], settings["cert"]),
+                timeout=aiohttp.ClientTimeout(total=timeout)
+        ) as response:
+            content = await response.read()
+            self._extract_cookies(session, prepared, response)
+            return self._to_requests_response(prepared, response, content)
+
+    def _ssl_context(self, verify: bool | str, cert: str | tuple[str, str] | None) -> ssl.SSLContext | bool:
+        """
+            Параметр ssl для aiohttp по verify и cert сессии; контексты кэшируются
+        """
+        if not verify:
+            return False
+        if verify is True and not cert:
+            return True
+
+        key = (verify, cert)
+        if key not in self._ssl_contexts:
+            if verify is True:
+                context = ssl.create_default_context()
+            elif os.path.isdir(verify):
+                context = ssl.create_default_context(capath=verify)
+            else:
+                context = ssl.create_default_context(cafile=verify)
+            if cert:
+                if isinstance(cert, str):
+                    context.load_cert_chain(cert)
+                else:
+                    context.load_cert_chain(*cert)
+            self._ssl_contexts[key] = context
+        return self._ssl_contexts[key]
+
+    @staticmethod
+    def _extract_cookies(
+            session: requests.Session, prepared: requests.PreparedRequest, response: aiohttp.ClientResponse
+    ) -> None:
+        set_cookie_headers = response.headers.getall("Set-Cookie", [])
+        if not set_cookie_headers:
+            return
+
+        message = HTTPMessage()
+        for value in set_cookie_headers:
+            message["Set-Cookie"] = value
+
+        hop_request = prepared.copy()
+        hop_request.url = str(response.url)
+        session.cookies.extract_cookies(MockResponse(message), MockRequest(hop_request))
+
+    @staticmethod
+    def _to_requests_response(
+            prepared: requests.PreparedRequest, response: aiohttp.ClientResponse, content: bytes
+    ) -> requests.Response:
+        result = requests.Response()
+        result.status_code = response.status
+        result.reason = response.reason
+        result.headers = CaseInsensitiveDict(response.headers)
+        result.url = str(response.url)
+        result.encoding = get_encoding_from_headers(result.headers)
+        result.request = prepared
+        result._content = content
+        return result
@@ -0,0 +1,103 @@
+import asyncio
+
+import logging
+import requests
+from utils.exceptions import TooManyRequestsError
+from utils.async_web_client import AsyncWebClient, TRANSPORT_ERRORS
+from utils.revalidation_cache import RevalidationCache
+
+
+base_headers = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:143.0) Gecko/20100101 Firefox/143.0",
+    "Accept": "*/*",
+    "Accept-Language": "en-US,en;q=0.9"
+}
+
+def build_request_headers(
+        method: str,
+        url: str,
+        headers: dict | None,
+        params: dict | None,
+        revalidation_cache: RevalidationCache | None
+) -> (dict, RevalidationCache | None):
+    """
+    :return: Заголовки запроса (с условными заголовками кэша) и кэш, если он применим к запросу
+    """
+    final_headers = base_headers.copy()
+    if headers:
+        final_headers.update(headers)
+
+    # Условные запросы имеют смысл только для GET
+    if revalidation_cache and method.upper() != "GET":
+        revalidation_cache = None
+    if revalidation_cache:
+        final_headers.update(revalidation_cache.conditional_headers(url, params))
+    return final_headers, revalidation_cache
+
+def process_response(
+        response: requests.Response,
+        url: str,
+        params: dict | None,
+        check_status: bool,
+        logger: logging.Logger | None,
+        revalidation_cache: RevalidationCache | None
+) -> requests.Response:
+    """
+        Подставить тело из кэша для 304 и проверить статус ответа
+    :raises TooManyRequestsError: Ответ 429
+    """
+    if revalidation_cache:
+        if response.status_code == 304:
+            response = revalidation_cache.restore(url, params, response)
+        else:
+            revalidation_cache.store(url, params, response)
+
+    if check_status and response.status_code != 200:
+        logger.error(f"Ошибка при обращении к {url}:"
+                     f"{response.status_code} {response.reason}")
+        if response.status_code == 429:
+            raise TooManyRequestsError()
+    return response
+
+async def api_request(
+        session: requests.Session,
+        method: str,
+        url: str,
+        *,
+        headers: dict = None,
+        params: dict = None,
+        data: dict = None,
+        json_data: dict = None,
+        max_retries: int = 3,
+        backoff: float = 2.0,
+        check_status: bool = True,
+        logger: logging.Logger = None,
+        revalidation_cache: RevalidationCache = None
+) -> requests.Response:
+    """
+        Асинхронный аналог utils.web_utils.api_request. Запросы выполняются через общий
+        пул keep-alive соединений AsyncWebClient, поэтому несколько запросов могут
+        выполняться одновременно (например, через asyncio.gather)
+    """
+    final_headers, revalidation_cache = build_request_headers(method, url, headers, params, revalidation_cache)
+    client = AsyncWebClient.get()
+
+    attempt = 0
+    while attempt < max_retries:
+        try:
+            response = await client.run_async(client.request(
+                session,
+                method,
+                url,
+                headers=final_headers,
+                params=params,
+                data=data,
+                json=json_data,
+                timeout=15
+            ))
+            return process_response(response, url, params, check_status, logger, revalidation_cache)
+        except TRANSPORT_ERRORS:
+            attempt += 1
+            await asyncio.sleep(backoff)
+
+    raise RuntimeError(f"Не удалось выполнить запрос к {url} после {max_retries} попыток")
@@ -0,0 +1,97 @@
+import copy
+import threading
+from dataclasses import dataclass
+
+import cachetools
+import requests
+from requests.structures import CaseInsensitiveDict
+
+
+@dataclass
+class _CachedResponse:
+    etag: str | None
+    last_modified: str | None
+    content: bytes
+    encoding: str | None
+    headers: CaseInsensitiveDict
+
+
+class RevalidationCache:
+    """
+        Кэш ответов для условных GET-запросов. Для каждого URL и набора параметров хранится тело ответа
+        вместе с его ETag и Last-Modified; при следующем запросе отправляются If-None-Match и If-Modified-Since,
+        а на ответ 304 (Not Modified) возвращается сохранённое тело со статусом 200.
+    """
+    def __init__(self, maxsize: int = 256) -> None:
+        """
+        :param maxsize: Максимальное количество хранимых ответов (вытесняются давно не использованные)
+        """
+        self._entries: cachetools.LRUCache = cachetools.LRUCache(maxsize=maxsize)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(url: str, params: dict | None) -> tuple:
+        if not params:
+            return url, ()
+        return url, tuple(sorted((str(k), str(v)) for k, v in params.items() if v is not None))
+
+    def conditional_headers(self, url: str, params: dict | None = None) -> dict[str, str]:
+        with self._lock:
+            entry = self._entries.get(self._key(url, params))
+        if not entry:
+            return {}
+
+        headers = {}
+        if entry.etag:
+            headers["If-None-Match"] = entry.etag
+        if entry.last_modified:
+            headers["If-Modified-Since"] = entry.last_modified
+        return headers
+
+    def store(self, url: str, params: dict | None, response: requests.Response) -> None:
+        if response.status_code != 200:
+            return
+
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        if not etag and not last_modified:
+            return
+
+        entry = _CachedResponse(
+            etag=etag,
+            last_modified=last_modified,
+            content=response.content,
+            encoding=response.encoding,
+            headers=CaseInsensitiveDict(response.headers)
+        )
+        with self._lock:
+            self._entries[self._key(url, params)] = entry
+
+    def restore(self, url: str, params: dict | None, response: requests.Response) -> requests.Response:
+        """
+            Превратить ответ 304 в ответ 200 с сохранённым телом.
+            Если для запроса нет сохранённого ответа, возвращается исходный ответ
+        """
+        with self._lock:
+            entry = self._entries.get(self._key(url, params))
+        if not entry:
+            return response
+
+        restored = copy.copy(response)
+        restored.status_code = 200
+        restored.reason = "OK"
+        restored._content = entry.content
+        restored.encoding = entry.encoding
+        restored.headers = CaseInsensitiveDict(entry.headers)
+
+        # Новые валидаторы из ответа 304 заменяют сохранённые
+        with self._lock:
+            if etag := response.headers.get("ETag"):
+                entry.etag = restored.headers["ETag"] = etag
+            if last_modified := response.headers.get("Last-Modified"):
+                entry.last_modified = restored.headers["Last-Modified"] = last_modified
+        return restored
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
@@ -1,5 +1,12 @@
 import re
+from datetime import datetime, date
 
 def is_str_int(s: str) -> bool:
     pattern = r'^-?\d+$'
     return bool(re.match(pattern, s))
+
+def parse_steam_date(date_str: str) -> date:
+    """
+        Дата вида '5 Jan, 2024' из таблицы истории кошелька Steam
+    """
+    return datetime.strptime(date_str, "%d %b, %Y").date()
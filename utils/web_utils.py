@@ -1,3 +1,4 @@
+import os
 import time
 
 import logging
@@ -6,13 +7,17 @@ from requests.exceptions import ConnectionError, ReadTimeout, Timeout, SSLError
 from rich.console import Console
 from datetime import datetime
 from utils.exceptions import TooManyRequestsError
+from utils.async_web_client import AsyncWebClient
+from utils.async_web_utils import build_request_headers, process_response
+from utils.async_web_utils import api_request as async_api_request
+from utils.revalidation_cache import RevalidationCache
 
 
-base_headers = {
-    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:143.0) Gecko/20100101 Firefox/143.0",
-    "Accept": "*/*",
-    "Accept-Language": "en-US,en;q=0.9"
-}
+def is_async_engine_enabled() -> bool:
+    """
+        Асинхронный движок (общий пул keep-alive соединений) включается переменной окружения ASYNC_HTTP
+    """
+    return os.getenv("ASYNC_HTTP", "").strip().lower() in ("1", "true", "yes")
 
 def api_request(
         session: requests.Session,
@@ -26,11 +31,21 @@ def api_request(
         max_retries: int = 3,
         backoff: float = 2.0,
         check_status: bool = True,
-        logger: logging.Logger = None
+        logger: logging.Logger = None,
+        revalidation_cache: RevalidationCache = None
 ) -> requests.Response:
-    final_headers = base_headers.copy()
-    if headers:
-        final_headers.update(headers)
+    """
+        С ASYNC_HTTP - синхронная обёртка над utils.async_web_utils.api_request,
+        иначе запрос выполняется через requests.Session
+    """
+    if is_async_engine_enabled():
+        return AsyncWebClient.get().run(async_api_request(
+            session, method, url, headers=headers, params=params, data=data, json_data=json_data,
+            max_retries=max_retries, backoff=backoff, check_status=check_status, logger=logger,
+            revalidation_cache=revalidation_cache
+        ))
+
+    final_headers, revalidation_cache = build_request_headers(method, url, headers, params, revalidation_cache)
 
     attempt = 0
     while attempt < max_retries:
@@ -44,13 +59,7 @@ def api_request(
                 json=json_data,
                 timeout=15
             )
-
-            if check_status and response.status_code != 200:
-                logger.error(f"Ошибка при обращении к {url}:"
-                             f"{response.status_code} {response.reason}")
-                if response.status_code == 429:
-                    raise TooManyRequestsError()
-            return response
+            return process_response(response, url, params, check_status, logger, revalidation_cache)
         except (ConnectionError, ReadTimeout, Timeout, SSLError):
             attempt += 1
             time.sleep(backoff)